@@ -0,0 +1,249 @@
+"""
+Offline benchmark of the scraping stages over the saved fixture pages.
+
+Drives get_game_times, process_game_row, get_official_team_name and get_all_urls
+with the network stubbed out, and reports wall time, peak and retained memory
+(tracemalloc) per stage. Use --json to save a run for comparison across commits.
+
+    python TestScripts/benchmark.py
+    python TestScripts/benchmark.py --repeat 20 --json results.json
+    python TestScripts/benchmark.py --capture profiles/<profile id>
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from offline_fixtures import (
+    ESPN_FIXTURES, STREAM_FIXTURES, REPO_DIR, load_page, load_capture, capture_date,
+    pinned_clock, offline_network, espn_fixture
+)
+from bs4 import BeautifulSoup
+from modules import config
+from modules.scraper import get_all_urls, get_game_times
+from modules.scraper.section_cache import clear_section_cache
+from modules.scraper.url_cache import clear_url_cache
+from modules.scraper.game_processors import process_game_row
+from modules.utils.team_utils import SPORTS_TEAMS, ESPN_ABBREVIATIONS, get_official_team_name
+from modules.utils.metrics import histogram_totals, reset_metrics
+
+def measure(run, repeat, setup=None, stages=None):
+    """Time `run` over several repeats, then run it once more under tracemalloc.
+
+    `stages` is called after the timed runs to collect a per-stage breakdown.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    breakdown = stages() if stages else None
+
+    # Memory is measured on a separate run, since tracing slows everything down
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    run()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        'repeat': repeat,
+        'min_ms': round(min(timings) * 1000, 3),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+        'peak_kb': round((peak - before) / 1024, 1),
+        'retained_kb': round((after - before) / 1024, 1)
+    }
+    if breakdown is not None:
+        result['stages_ms'] = breakdown
+    return result
+
+def stage_breakdown(metric, repeat, **match):
+    """Average time per stage and run from a /metrics histogram, for the series matching the labels."""
+    breakdown = {}
+    for labels, total, count in histogram_totals(metric):
+        if count and all(labels.get(k) == v for k, v in match.items()):
+            breakdown[labels['stage']] = round(total / repeat * 1000, 3)
+    return breakdown
+
+def bench_get_game_times(repeat):
+    """Full schedule scrape per fixture, with and without the parsed-section cache."""
+    results = []
+    for name, sport, path in ESPN_FIXTURES:
+        html = load_page(path)
+        with espn_fixture(sport, html):
+            # Cold - every row is parsed from scratch
+            reset_metrics()
+            cold = measure(lambda: get_game_times(sport), repeat, setup=clear_section_cache,
+                           stages=lambda: stage_breakdown('ssa_stage_seconds', repeat, sport=sport))
+            cold['games'] = get_game_times(sport)['_meta']['game_count']
+            results.append(dict(stage='get_game_times', fixture=name, cache='cold', **cold))
+
+            # Warm - the page is unchanged since the last refresh, so every section is reused
+            get_game_times(sport)
+            reset_metrics()
+            warm = measure(lambda: get_game_times(sport), repeat,
+                           stages=lambda: stage_breakdown('ssa_stage_seconds', repeat, sport=sport))
+            results.append(dict(stage='get_game_times', fixture=name, cache='warm', **warm))
+    return results
+
+def _fixture_rows(html):
+    """Collect (row, cells) for every game row of a schedule page."""
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = []
+    for table in soup.find_all('div', class_='ResponsiveTable'):
+        for row in table.find_all('tr'):
+            if row.find('th'):
+                continue
+            cells = row.find_all('td', class_='Table__TD') or row.find_all('td')
+            if len(cells) >= 2:
+                rows.append((row, cells))
+    return rows
+
+def bench_process_game_row(repeat):
+    """Row extraction and processing alone, over every row of each fixture."""
+    results = []
+    for name, sport, path in ESPN_FIXTURES:
+        html = load_page(path)
+        rows = _fixture_rows(html)
+        today = capture_date(html)
+
+        def run():
+            game_times = {}
+            teams_with_games_today = set()
+            processed_game_ids = set()
+            for game_id, (row, cells) in enumerate(rows, start=1):
+                game_times = process_game_row(
+                    sport, row, cells, game_id, game_id, 0, today,
+                    teams_with_games_today, processed_game_ids, game_times
+                )
+
+        with pinned_clock(today):
+            result = measure(run, repeat)
+        result['rows'] = len(rows)
+        results.append(dict(stage='process_game_row', fixture=name, **result))
+    return results
+
+def _team_name_variants(sport):
+    """Names the way they show up on schedule and stream pages - full, nickname, city, abbreviation."""
+    names = []
+    for team in sorted(SPORTS_TEAMS[sport]):
+        parts = team.split()
+        names += [team, team.lower(), parts[-1], ' '.join(parts[:-1]), f"  {team.upper()} "]
+    names += sorted(ESPN_ABBREVIATIONS.get(sport, {}))
+    names += ['Unknown Team', 'TBD']
+    return names
+
+def bench_team_resolution(repeat):
+    """get_official_team_name over name variants for every sport."""
+    results = []
+    for sport in sorted(SPORTS_TEAMS):
+        names = _team_name_variants(sport)
+
+        def run():
+            for team_name in names:
+                get_official_team_name(sport, team_name)
+
+        result = measure(run, repeat)
+        result['names'] = len(names)
+        results.append(dict(stage='get_official_team_name', fixture=sport, **result))
+    return results
+
+def bench_get_all_urls(repeat):
+    """URL extraction from each stream-site fixture: uncached (full scan and site profile), unchanged page after the TTL, and within the TTL."""
+    results = []
+    variants = [
+        ('scan', clear_url_cache),
+        ('cold', clear_url_cache),
+        ('content', lambda: clear_url_cache(keep_extractions=True)),
+        ('ttl', None)
+    ]
+    for name, url, path in STREAM_FIXTURES:
+        with offline_network({url: load_page(path)}):
+            for cache, setup in variants:
+                # `scan` ignores the fixture's site profile and matches every li and a
+                config.SITE_PROFILES = cache != 'scan'
+                get_all_urls(url)
+                reset_metrics()
+                result = measure(lambda: get_all_urls(url), repeat, setup=setup,
+                                 stages=lambda: stage_breakdown('ssa_url_scrape_seconds', repeat))
+                result['urls'] = len(get_all_urls(url))
+                results.append(dict(stage='get_all_urls', fixture=name, cache=cache, **result))
+            config.SITE_PROFILES = True
+    return results
+
+BENCHMARKS = {
+    'get_game_times': bench_get_game_times,
+    'process_game_row': bench_process_game_row,
+    'get_official_team_name': bench_team_resolution,
+    'get_all_urls': bench_get_all_urls
+}
+
+def _git_commit():
+    """Current commit of the checkout, so saved runs can be told apart."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, text=True).strip()
+    except Exception:
+        return None
+
+def print_results(results):
+    """Print one line per benchmark."""
+    print(f"{'stage':<24}{'fixture':<16}{'cache':<7}{'min ms':>10}{'median ms':>11}{'peak KB':>10}{'kept KB':>10}")
+    print('-' * 88)
+    for result in results:
+        print(f"{result['stage']:<24}{result['fixture']:<16}{result.get('cache', ''):<7}"
+              f"{result['min_ms']:>10.2f}{result['median_ms']:>11.2f}{result['peak_kb']:>10.1f}{result['retained_kb']:>10.1f}")
+        if result.get('stages_ms'):
+            stages = ', '.join(f"{stage} {ms:.2f}" for stage, ms in sorted(result['stages_ms'].items()))
+            print(f"{'':<24}  stages (ms): {stages}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scrapers offline over the fixture pages.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark (default: 5)')
+    parser.add_argument('--only', choices=sorted(BENCHMARKS), action='append',
+                        help='Run only this benchmark (can be given more than once)')
+    parser.add_argument('--json', metavar='FILE', nargs='?', const='-',
+                        help="Write results as JSON to FILE ('-' or no value for stdout)")
+    parser.add_argument('--capture', metavar='DIR',
+                        help='Benchmark the pages saved by a profiled request instead of the fixtures')
+    args = parser.parse_args()
+
+    if args.capture:
+        global ESPN_FIXTURES, STREAM_FIXTURES
+        ESPN_FIXTURES, STREAM_FIXTURES = load_capture(args.capture)
+
+    results = []
+    for name, bench in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        results += bench(args.repeat)
+
+    if args.json:
+        report = {
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': results
+        }
+        if args.json == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Saved {len(results)} results to {args.json}")
+    else:
+        print_results(results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Golden-output harness for the schedule parser, team matcher, URL matcher and link-to-game matcher.
+
+`record` runs the current implementation over the fixture pages and saves
+canonical JSON outputs to TestScripts/golden/. `verify` runs them again - with
+the default engine or any alternative one - and prints a diff for every output
+that changed. Run `verify` before merging any optimization of process_game_row,
+get_official_team_name or get_all_urls.
+
+    python TestScripts/golden_outputs.py record
+    python TestScripts/golden_outputs.py verify --engine all
+"""
+import argparse
+import difflib
+import json
+import os
+import sys
+
+# Team matching iterates over sets, so outputs depend on string hashing - pin the seed
+# and re-run ourselves if it isn't set, otherwise goldens would differ from run to run
+HASH_SEED = '0'
+if __name__ == '__main__' and os.environ.get('PYTHONHASHSEED') != HASH_SEED:
+    os.environ['PYTHONHASHSEED'] = HASH_SEED
+    os.execv(sys.executable, [sys.executable] + sys.argv)
+
+from offline_fixtures import (
+    ESPN_FIXTURES, STREAM_FIXTURES, SCRIPT_DIR, load_page, offline_network, espn_fixture
+)
+from modules import config
+from modules.scraper import get_all_urls, get_game_times
+from modules.scraper.section_cache import clear_section_cache
+from modules.scraper.parse_pool import shutdown_pool
+from modules.scraper.url_cache import clear_url_cache
+from modules.scraper.game_matcher import build_matchup_index, match_titles, clear_title_memo
+from modules.utils.team_utils import SPORTS_TEAMS, ESPN_ABBREVIATIONS, get_official_team_name
+
+GOLDEN_DIR = os.path.join(SCRIPT_DIR, 'golden')
+
+# Alternative engines: config overrides that must not change any output.
+# `warm` runs every scrape twice and checks the second run, which reuses unchanged sections.
+ENGINES = {
+    'default': {},
+    'warm': {},
+    'no-section-cache': {'INCREMENTAL_PARSE': False},
+    'full-cascade': {'TABLE_STRATEGIES': False},
+    # The fixture sites have extraction profiles; this checks the generic scan of every li and a
+    'full-scan': {'SITE_PROFILES': False},
+    # Forked workers inherit the pinned clock, so the pool is restarted for every case
+    'process-pool': {'PROCESS_POOL': True, 'PROCESS_POOL_START_METHOD': 'fork', 'PROCESS_POOL_SIZE': 2}
+}
+
+def canonical(value):
+    """Serialize an output the same way every time."""
+    return json.dumps(value, indent=1, sort_keys=True, ensure_ascii=False, default=str) + '\n'
+
+def _schedule_output(sport, html, engine):
+    """get_game_times for a fixture, without the fields that change on every run."""
+    clear_section_cache()
+    with espn_fixture(sport, html):
+        game_times = get_game_times(sport)
+        if engine == 'warm':
+            game_times = get_game_times(sport)
+        shutdown_pool()
+    meta = game_times.get('_meta')
+    if meta:
+        game_times['_meta'] = {k: v for k, v in meta.items() if k != 'timestamp'}
+    return game_times
+
+def _team_names_output(sport):
+    """get_official_team_name over the ways team names show up on pages."""
+    names = []
+    for team in sorted(SPORTS_TEAMS[sport]):
+        parts = team.split()
+        names += [team, team.lower(), parts[-1], ' '.join(parts[:-1]), parts[0], team.upper()]
+    names += sorted(ESPN_ABBREVIATIONS.get(sport, {}))
+    names += ['Unknown Team', 'TBD', '']
+    return {name: get_official_team_name(sport, name) for name in names}
+
+def collect_outputs(engine):
+    """Run every golden case, returning {case name: output}."""
+    outputs = {}
+    for name, sport, path in ESPN_FIXTURES:
+        outputs[f"schedule_{name}"] = _schedule_output(sport, load_page(path), engine)
+
+    titles = []
+    for name, url, path in STREAM_FIXTURES:
+        clear_url_cache()
+        with offline_network({url: load_page(path)}):
+            outputs[f"urls_{name}"] = get_all_urls(url)
+        titles += [title for href, title in outputs[f"urls_{name}"]]
+
+    # Every stream fixture title resolved against every schedule fixture
+    clear_title_memo()
+    for name, sport, path in ESPN_FIXTURES:
+        outputs[f"matches_{name}"] = match_titles(titles, build_matchup_index(outputs[f"schedule_{name}"]), sport)
+
+    for sport in sorted(SPORTS_TEAMS):
+        outputs[f"team_names_{sport}"] = _team_names_output(sport)
+    return outputs
+
+def run_engine(engine):
+    """Collect the outputs with an engine's config overrides applied."""
+    saved = {setting: getattr(config, setting) for setting in ENGINES[engine]}
+    for setting, value in ENGINES[engine].items():
+        setattr(config, setting, value)
+    try:
+        return collect_outputs(engine)
+    finally:
+        for setting, value in saved.items():
+            setattr(config, setting, value)
+
+def _golden_path(case):
+    return os.path.join(GOLDEN_DIR, f"{case}.json")
+
+def record():
+    """Save the current outputs as the new goldens."""
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    outputs = run_engine('default')
+    for case, output in outputs.items():
+        with open(_golden_path(case), 'w', encoding='utf-8') as f:
+            f.write(canonical(output))
+    print(f"Recorded {len(outputs)} golden outputs in {GOLDEN_DIR}")
+
+def verify(engine, max_diff_lines):
+    """Compare an engine's outputs with the goldens, printing a diff for each mismatch."""
+    outputs = run_engine(engine)
+    failures = 0
+    for case, output in outputs.items():
+        path = _golden_path(case)
+        if not os.path.exists(path):
+            print(f"[{engine}] {case}: no golden output - run `record` first")
+            failures += 1
+            continue
+
+        with open(path, encoding='utf-8') as f:
+            expected = f.read()
+        actual = canonical(output)
+        if actual == expected:
+            continue
+
+        failures += 1
+        print(f"[{engine}] {case}: output differs from golden")
+        diff = list(difflib.unified_diff(
+            expected.splitlines(), actual.splitlines(),
+            fromfile=f"golden/{case}.json", tofile=f"{engine}/{case}.json", lineterm=''
+        ))
+        for line in diff[:max_diff_lines]:
+            print(f"    {line}")
+        if len(diff) > max_diff_lines:
+            print(f"    ... {len(diff) - max_diff_lines} more diff lines")
+
+    status = 'OK' if not failures else f"{failures} of {len(outputs)} outputs differ"
+    print(f"[{engine}] {status}")
+    return failures == 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Record or verify golden outputs over the fixture pages.')
+    parser.add_argument('command', choices=['record', 'verify'])
+    parser.add_argument('--engine', choices=sorted(ENGINES) + ['all'], default='default',
+                        help="Engine to verify, or 'all' (default: default)")
+    parser.add_argument('--max-diff-lines', type=int, default=60, help='Diff lines shown per output (default: 60)')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record()
+        return
+
+    engines = sorted(ENGINES) if args.engine == 'all' else [args.engine]
+    results = [verify(engine, args.max_diff_lines) for engine in engines]
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == '__main__':
+    main()
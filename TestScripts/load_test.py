@@ -0,0 +1,230 @@
+"""
+Load generator for /scrape and the game endpoints.
+
+Drives the running app at a fixed concurrency and reports throughput,
+p50/p95/p99 latency per endpoint and how many requests reached the upstream
+stand-in (TestScripts/upstream_server.py). With --spawn it starts the stand-in
+and an app process pointed at it, so a run needs nothing else:
+
+    python TestScripts/load_test.py --spawn --concurrency 16 --duration 30 --latency 200
+    python TestScripts/load_test.py --app http://127.0.0.1:5000 --mix scrape=3,debug_times=1
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from offline_fixtures import STREAM_FIXTURES, REPO_DIR, SITE_PROFILES_PATH
+import requests
+from upstream_server import start_server, add_behaviour_arguments, behaviour_from_args
+
+SPORTS = ['MLB', 'NBA', 'NFL', 'NHL']
+
+def build_request(endpoint, app_url, stream_url):
+    """Return (method, url, form data) for one request to an endpoint."""
+    sport = random.choice(SPORTS)
+    if endpoint == 'scrape':
+        return 'POST', f"{app_url}/scrape", {'url': stream_url, 'sport': sport}
+    if endpoint == 'debug_times':
+        return 'GET', f"{app_url}/debug_times/{sport}", None
+    if endpoint == 'games':
+        return 'GET', f"{app_url}/games?sports={','.join(SPORTS)}", None
+    if endpoint == 'mlb_scores':
+        return 'GET', f"{app_url}/mlb_scores", None
+    if endpoint == 'ready':
+        return 'GET', f"{app_url}/ready", None
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+def parse_mix(mix):
+    """Parse 'scrape=3,debug_times=1' into a weighted endpoint list."""
+    weighted = []
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        weighted += [name.strip()] * int(weight or 1)
+    return weighted
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def run_load(app_url, stream_url, endpoints, concurrency, duration, total_requests, timeout):
+    """Send requests from `concurrency` workers until the duration or request budget runs out."""
+    results = []
+    results_lock = threading.Lock()
+    deadline = time.monotonic() + duration if duration else None
+    budget = [total_requests]
+
+    def take_ticket():
+        with results_lock:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            if budget[0] is not None:
+                if budget[0] <= 0:
+                    return False
+                budget[0] -= 1
+            return True
+
+    def worker():
+        session = requests.Session()
+        while take_ticket():
+            endpoint = random.choice(endpoints)
+            method, url, data = build_request(endpoint, app_url, stream_url)
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, data=data, timeout=timeout)
+                status = response.status_code
+                # /scrape reports upstream failures in the body with a 200
+                if status == 200 and endpoint == 'scrape' and 'error' in response.json():
+                    status = 'error'
+            except requests.RequestException as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            with results_lock:
+                results.append((endpoint, status, elapsed))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    return results, time.perf_counter() - started
+
+def summarize(results, wall_time):
+    """Throughput and latency percentiles overall and per endpoint."""
+    def describe(rows):
+        latencies = sorted(elapsed for _, _, elapsed in rows)
+        statuses = {}
+        for _, status, _ in rows:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        return {
+            'requests': len(rows),
+            'throughput_rps': round(len(rows) / wall_time, 2) if wall_time else None,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+            'max_ms': round(latencies[-1] * 1000, 1) if latencies else None,
+            'statuses': statuses
+        }
+
+    summary = {'wall_time_s': round(wall_time, 2), 'overall': describe(results), 'endpoints': {}}
+    for endpoint in sorted({endpoint for endpoint, _, _ in results}):
+        summary['endpoints'][endpoint] = describe([r for r in results if r[0] == endpoint])
+    return summary
+
+def upstream_stats(upstream_url):
+    """Fetch the stand-in's request counters, or None if it isn't reachable."""
+    try:
+        return requests.get(f"{upstream_url}/_stats", timeout=5).json()
+    except requests.RequestException:
+        return None
+
+def spawn_app(port, upstream_url):
+    """Start the app in a separate process, pointed at the upstream stand-in."""
+    env = dict(os.environ)
+    env.update({
+        'SSA_ESPN_BASE_URL': upstream_url,
+        'SSA_URL_OVERRIDES': ','.join(
+            f"https://{host}={upstream_url}/site/{host}"
+            for host in {url.split('://', 1)[1].split('/', 1)[0] for _, url, _ in STREAM_FIXTURES}
+        ),
+        'SSA_SITE_PROFILES_FILE': env.get('SSA_SITE_PROFILES_FILE', SITE_PROFILES_PATH),
+        'SSA_SNAPSHOTS': env.get('SSA_SNAPSHOTS', '0'),
+        'SSA_LOG_LEVEL': env.get('SSA_LOG_LEVEL', 'WARNING')
+    })
+    code = f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=REPO_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # Wait for the app to accept requests
+    app_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(app_url + '/', timeout=1)
+            return process, app_url
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('The app did not start')
+
+def print_summary(summary, upstream):
+    """Print the results table."""
+    print(f"{'endpoint':<14}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  statuses")
+    print('-' * 90)
+    rows = list(summary['endpoints'].items()) + [('overall', summary['overall'])]
+    for name, stats in rows:
+        statuses = ', '.join(f"{status}: {count}" for status, count in sorted(stats['statuses'].items()))
+        print(f"{name:<14}{stats['requests']:>9}{stats['throughput_rps']:>9}{stats['p50_ms']:>9}"
+              f"{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['max_ms']:>9}  {statuses}")
+    if upstream:
+        print(f"\nUpstream requests: {upstream['total_requests']} (errors: {upstream['errors']}, "
+              f"max concurrent: {upstream['max_in_flight']})")
+        for path, count in sorted(upstream['requests'].items()):
+            print(f"  {path}: {count}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test /scrape and the game endpoints.')
+    parser.add_argument('--app', default='http://127.0.0.1:5000', help='App base URL (ignored with --spawn)')
+    parser.add_argument('--upstream', default='http://127.0.0.1:8765', help='Upstream stand-in base URL')
+    parser.add_argument('--spawn', action='store_true',
+                        help='Start the upstream stand-in and an app process pointed at it')
+    parser.add_argument('--app-port', type=int, default=5055, help='Port for the spawned app (default: 5055)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run (default: 20)')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests instead of a duration')
+    parser.add_argument('--timeout', type=float, default=30, help='Client timeout per request in seconds')
+    parser.add_argument('--mix', default='scrape=1,debug_times=1',
+                        help="Weighted endpoints: scrape, debug_times, games, mlb_scores, ready (default: 'scrape=1,debug_times=1')")
+    parser.add_argument('--json', metavar='FILE', help='Also write the summary as JSON to FILE')
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+
+    server = app_process = None
+    app_url, upstream_url = args.app.rstrip('/'), args.upstream.rstrip('/')
+    if args.spawn:
+        host, port = upstream_url.split('://', 1)[1].split(':')
+        server, _ = start_server(host, int(port), **behaviour_from_args(args))
+        app_process, app_url = spawn_app(args.app_port, upstream_url)
+
+    try:
+        before = upstream_stats(upstream_url)
+        results, wall_time = run_load(
+            app_url, STREAM_FIXTURES[0][1], parse_mix(args.mix), args.concurrency,
+            None if args.requests else args.duration, args.requests, args.timeout
+        )
+        after = upstream_stats(upstream_url)
+    finally:
+        if app_process:
+            app_process.terminate()
+            app_process.wait()
+        if server:
+            server.shutdown()
+
+    # Only count the upstream requests made during this run
+    upstream = None
+    if before and after:
+        upstream = dict(after)
+        upstream['requests'] = {
+            path: count - before['requests'].get(path, 0)
+            for path, count in after['requests'].items()
+            if count - before['requests'].get(path, 0)
+        }
+        upstream['total_requests'] = after['total_requests'] - before['total_requests']
+        upstream['errors'] = after['errors'] - before['errors']
+
+    summary = summarize(results, wall_time)
+    summary['upstream'] = upstream
+    summary['concurrency'] = args.concurrency
+    print_summary(summary, upstream)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == '__main__':
+    main()
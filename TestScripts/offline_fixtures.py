@@ -0,0 +1,147 @@
+"""
+Helpers for running the scrapers offline against the saved fixture pages.
+
+The ESPN fixtures filter games to a window around "today", so the clock is pinned
+to the date each page was captured (read from its ESPNFITT comment), and
+requests.get is replaced with a stub that serves the fixture pages.
+"""
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+
+# Make the application modules importable when a script is run from anywhere
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+import requests
+from modules.scraper.game_time_scraper import ESPN_SCHEDULE_URLS
+from modules.scraper.site_profiles import load_site_profiles
+
+# (name, sport, path) for every saved ESPN schedule page
+ESPN_FIXTURES = [
+    ('MLB', 'MLB', os.path.join(SCRIPT_DIR, 'espn_MLB_schedule.html')),
+    ('NBA', 'NBA', os.path.join(SCRIPT_DIR, 'espn_NBA_schedule.html')),
+    ('NFL', 'NFL', os.path.join(SCRIPT_DIR, 'espn_NFL_schedule.html')),
+    ('NHL', 'NHL', os.path.join(SCRIPT_DIR, 'espn_NHL_schedule.html')),
+    ('MLB-2025-05-20', 'MLB', os.path.join(REPO_DIR, 'mlb_schedule.html'))
+]
+
+# (name, url the page is served at, path) for stream-site index pages used with get_all_urls
+STREAM_FIXTURES = [
+    ('stream_index', 'https://streams.example.com/schedule', os.path.join(SCRIPT_DIR, 'stream_index.html'))
+]
+
+# Extraction profiles for the stream-site fixtures (SSA_SITE_PROFILES_FILE format), registered on import
+SITE_PROFILES_PATH = os.path.join(SCRIPT_DIR, 'site_profiles.json')
+load_site_profiles(SITE_PROFILES_PATH)
+
+# Modules that read the current time through their own `datetime` import
+CLOCK_MODULES = [
+    'modules.scraper.game_time_scraper',
+    'modules.scraper.game_processors.live_game_processor',
+    'modules.scraper.game_processors.upcoming_game_processor'
+]
+
+def load_capture(capture_dir):
+    """Read the pages saved by a profiled request (SSA_PROFILE_DIR/<id>) as (ESPN fixtures, stream fixtures)."""
+    with open(os.path.join(capture_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    espn_fixtures, stream_fixtures = [], []
+    for page in manifest['pages']:
+        path = os.path.join(capture_dir, page['file'])
+        if page.get('sport'):
+            espn_fixtures.append((f"capture-{page['sport']}", page['sport'], path))
+        else:
+            stream_fixtures.append(('capture-' + page['url'].split('://', 1)[-1].split('/', 1)[0], page['url'], path))
+    return espn_fixtures, stream_fixtures
+
+def load_page(path):
+    """Read a fixture page."""
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+def capture_date(html):
+    """Return when an ESPN page was captured, from its ESPNFITT comment (or None)."""
+    match = re.search(r'ESPNFITT \|.*\| (\w{3}, \d{1,2} \w{3} \d{4} \d\d:\d\d:\d\d) GMT', html)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), '%a, %d %b %Y %H:%M:%S')
+
+@contextmanager
+def pinned_clock(moment):
+    """Make datetime.now() return a fixed moment inside the scraper modules."""
+    if moment is None:
+        yield
+        return
+
+    class PinnedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return moment
+
+    originals = {}
+    for name in CLOCK_MODULES:
+        module = sys.modules.get(name) or __import__(name, fromlist=['datetime'])
+        originals[module] = module.datetime
+        module.datetime = PinnedDatetime
+    try:
+        yield
+    finally:
+        for module, original in originals.items():
+            module.datetime = original
+
+class FixtureResponse:
+    """Just enough of requests.Response for the scrapers."""
+
+    def __init__(self, url, html):
+        self.url = url
+        self.text = html
+        self.content = html.encode('utf-8')
+        self.encoding = 'utf-8'
+        self.status_code = 200
+        self.headers = {'Content-Type': 'text/html; charset=utf-8'}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=65536, decode_unicode=False):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+@contextmanager
+def offline_network(pages):
+    """Serve {url: html} from requests.get; any other URL fails like an unreachable host.
+
+    Yields a dict counting the requests made per URL.
+    """
+    calls = {}
+    original_get = requests.get
+
+    def fake_get(url, *args, **kwargs):
+        calls[url] = calls.get(url, 0) + 1
+        if url not in pages:
+            raise requests.ConnectionError(f"No fixture for {url}")
+        return FixtureResponse(url, pages[url])
+
+    requests.get = fake_get
+    try:
+        yield calls
+    finally:
+        requests.get = original_get
+
+@contextmanager
+def espn_fixture(sport, html):
+    """Serve an ESPN schedule fixture for a sport with the clock pinned to its capture date."""
+    with pinned_clock(capture_date(html)):
+        with offline_network({ESPN_SCHEDULE_URLS[sport]: html}) as calls:
+            yield calls
@@ -0,0 +1,205 @@
+"""
+Local stand-in for a Redis server, for testing the shared cache without installing Redis.
+
+Speaks enough of the Redis protocol (RESP) for modules/utils/shared_store.py: PING, AUTH, SELECT,
+GET, SET (with NX, XX, PX and EX), DEL, EXISTS, PTTL, FLUSHDB, DBSIZE, and EVAL for the Lua
+scripts shared_store sends, which are run as their Python equivalents. Point the app at it with:
+
+    SSA_SHARED_CACHE=redis
+    SSA_REDIS_URL=redis://127.0.0.1:6390/0
+
+    python TestScripts/redis_server.py --port 6390
+"""
+import argparse
+import os
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.utils.shared_store import COMPARE_AND_SET_SCRIPT, COMPARE_AND_DELETE_SCRIPT
+
+class Store:
+    """Keys with optional expiry, one dict per database number."""
+
+    def __init__(self):
+        self.databases = {}
+        self.lock = threading.Lock()
+
+    def db(self, number):
+        return self.databases.setdefault(number, {})
+
+    def get(self, db, key):
+        entry = db.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del db[key]
+            return None
+        return value
+
+def compare_and_set(store, db, keys, args):
+    missing, expected, value, ttl_ms = args[0], args[1], args[2], int(args[3])
+    current = store.get(db, keys[0])
+    if (current is not None) if missing == b'1' else (current != expected):
+        return 0
+    db[keys[0]] = (value, time.monotonic() + ttl_ms / 1000 if ttl_ms > 0 else None)
+    return 1
+
+def compare_and_delete(store, db, keys, args):
+    if store.get(db, keys[0]) == args[0]:
+        del db[keys[0]]
+        return 1
+    return 0
+
+# Lua script text -> Python implementation taking (store, db, keys, args)
+SCRIPTS = {
+    COMPARE_AND_SET_SCRIPT.encode('utf-8'): compare_and_set,
+    COMPARE_AND_DELETE_SCRIPT.encode('utf-8'): compare_and_delete
+}
+
+class Error(Exception):
+    pass
+
+def encode(reply):
+    """Encode a Python value as a RESP reply."""
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, Error):
+        return b'-ERR ' + str(reply).encode('utf-8') + b'\r\n'
+    if isinstance(reply, str):
+        return b'+' + reply.encode('utf-8') + b'\r\n'
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, bytes):
+        return b'$%d\r\n%s\r\n' % (len(reply), reply)
+    if isinstance(reply, list):
+        return b'*%d\r\n' % len(reply) + b''.join(encode(item) for item in reply)
+    raise TypeError(f"Can't encode {type(reply).__name__}")
+
+class Handler(socketserver.StreamRequestHandler):
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command, as typed into telnet
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        self.db_number = 0
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            try:
+                reply = self.run(args[0].upper().decode('ascii'), args[1:])
+            except Error as e:
+                reply = e
+            except (ValueError, IndexError) as e:
+                reply = Error(f"syntax error ({e})")
+            self.wfile.write(encode(reply))
+            self.wfile.flush()
+
+    def run(self, name, args):
+        store = self.server.store
+        if self.server.password and name not in ('AUTH', 'PING') and not getattr(self, 'authenticated', False):
+            raise Error("NOAUTH Authentication required")
+        with store.lock:
+            db = store.db(self.db_number)
+            if name == 'PING':
+                return 'PONG'
+            if name == 'AUTH':
+                if args[-1].decode('utf-8') != self.server.password:
+                    raise Error("invalid password")
+                self.authenticated = True
+                return 'OK'
+            if name == 'SELECT':
+                self.db_number = int(args[0])
+                return 'OK'
+            if name == 'GET':
+                return store.get(db, args[0])
+            if name == 'SET':
+                return self.set(store, db, args)
+            if name == 'DEL':
+                removed = 0
+                for key in args:
+                    if store.get(db, key) is not None:
+                        del db[key]
+                        removed += 1
+                return removed
+            if name == 'EXISTS':
+                return sum(1 for key in args if store.get(db, key) is not None)
+            if name == 'PTTL':
+                if store.get(db, args[0]) is None:
+                    return -2
+                expires_at = db[args[0]][1]
+                return -1 if expires_at is None else int((expires_at - time.monotonic()) * 1000)
+            if name == 'EVAL':
+                script = SCRIPTS.get(args[0])
+                if script is None:
+                    raise Error("unknown script (the stand-in only runs shared_store's scripts)")
+                count = int(args[1])
+                return script(store, db, args[2:2 + count], args[2 + count:])
+            if name == 'FLUSHDB':
+                db.clear()
+                return 'OK'
+            if name == 'DBSIZE':
+                return sum(1 for key in list(db) if store.get(db, key) is not None)
+        raise Error(f"unknown command '{name}'")
+
+    def set(self, store, db, args):
+        key, value = args[0], args[1]
+        options = [arg.upper() for arg in args[2:]]
+        expires_at = None
+        if b'PX' in options:
+            expires_at = time.monotonic() + int(options[options.index(b'PX') + 1]) / 1000
+        elif b'EX' in options:
+            expires_at = time.monotonic() + int(options[options.index(b'EX') + 1])
+        exists = store.get(db, key) is not None
+        if (b'NX' in options and exists) or (b'XX' in options and not exists):
+            return None
+        db[key] = (value, expires_at)
+        return 'OK'
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, password=None):
+        super().__init__(address, Handler)
+        self.store = Store()
+        self.password = password
+
+def start_in_thread(host='127.0.0.1', port=0, password=None):
+    """Start a stand-in on a background thread, returning the server (its port is server.server_address[1])."""
+    server = RedisStandIn((host, port), password)
+    threading.Thread(target=server.serve_forever, name='redis-stand-in', daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a minimal Redis-protocol stand-in for the shared cache.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    parser.add_argument('--password', default=None)
+    args = parser.parse_args()
+
+    server = RedisStandIn((args.host, args.port), args.password)
+    print(f"Redis stand-in listening on redis://{args.host}:{args.port}/0")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Checks the JSON and compression layer of the routes (modules/routes/responses.py) offline.
+
+Every JSON endpoint that includes a schedule is requested twice, once with the app in
+debug mode (indented output through the standard library) and once without (compact
+output, with the schedule spliced in from its cached encoding), and both must return
+200 with the same data. Compressed responses must decode to the uncompressed body.
+
+    python TestScripts/test_responses.py
+"""
+import gzip
+import os
+import sys
+
+os.environ.setdefault('SSA_SNAPSHOTS', '0')
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from offline_fixtures import ESPN_FIXTURES, STREAM_FIXTURES, load_page, offline_network, pinned_clock, capture_date, ESPN_SCHEDULE_URLS
+from modules.utils.serialization import clear_serialization_caches, available_encodings
+from app import app
+
+def fetch_all(client):
+    """Request every endpoint that returns a schedule, returning {name: response}."""
+    name, page_url, path = STREAM_FIXTURES[0]
+    job = client.post('/scrape', data={'url': page_url, 'sport': 'MLB', 'async': '1'}).get_json()
+    return {
+        'debug_times': client.get('/debug_times/MLB'),
+        'scrape': client.post('/scrape', data={'url': page_url, 'sport': 'MLB'}),
+        'scrape_sources': client.post('/scrape_sources', data={'url': [page_url], 'sport': 'MLB'}),
+        'games': client.get('/games?sports=MLB'),
+        'job': client.get(f"{job['status_url']}?wait=10")
+    }
+
+def without_timings(name, data):
+    """Drop the fields that legitimately differ between two requests."""
+    if name == 'games':
+        for sport in data['sports'].values():
+            sport.pop('elapsed_seconds', None)
+            sport.pop('age_seconds', None)
+        data.pop('elapsed_seconds', None)
+    if name == 'job':
+        data = data['result']
+    return data
+
+def test_responses():
+    """Compare debug and non-debug responses, and check gzip negotiation."""
+    html = load_page(ESPN_FIXTURES[0][2])
+    name, page_url, path = STREAM_FIXTURES[0]
+    pages = {ESPN_SCHEDULE_URLS['MLB']: html, page_url: load_page(path)}
+    client = app.test_client()
+    failures = 0
+
+    with pinned_clock(capture_date(html)), offline_network(pages):
+        results = {}
+        for debug in (False, True):
+            app.debug = debug
+            clear_serialization_caches()
+            # Twice, so the second round is served from the cached encodings
+            fetch_all(client)
+            results[debug] = fetch_all(client)
+        app.debug = False
+
+        for name, response in results[False].items():
+            debug_response = results[True][name]
+            if response.status_code != 200 or debug_response.status_code != 200:
+                print(f"FAIL {name}: status {response.status_code} (debug: {debug_response.status_code})")
+                failures += 1
+                continue
+            if without_timings(name, response.get_json()) != without_timings(name, debug_response.get_json()):
+                print(f"FAIL {name}: debug and compact responses differ")
+                failures += 1
+                continue
+            print(f"OK   {name}: {len(response.data)} bytes compact, {len(debug_response.data)} bytes indented")
+
+        for encoding in available_encodings():
+            plain = client.get('/debug_times/MLB')
+            compressed = client.get('/debug_times/MLB', headers={'Accept-Encoding': encoding})
+            body = gzip.decompress(compressed.data) if encoding == 'gzip' else brotli.decompress(compressed.data)
+            if compressed.headers.get('Content-Encoding') != encoding or body != plain.data or 'Accept-Encoding' not in compressed.headers.get('Vary', ''):
+                print(f"FAIL {encoding}: compressed response doesn't match")
+                failures += 1
+                continue
+            print(f"OK   {encoding}: {len(plain.data)} -> {len(compressed.data)} bytes")
+
+    print(f"\n{'All checks passed' if not failures else f'{failures} check(s) failed'}")
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if test_responses() else 0)
@@ -0,0 +1,244 @@
+"""
+Local stand-in for ESPN and the stream sites, for load testing without touching them.
+
+Replays the fixture pages with configurable latency, jitter, error rate and
+slow-drip bodies, and counts the requests it receives. Point the app at it with:
+
+    SSA_ESPN_BASE_URL=http://127.0.0.1:8765
+    SSA_URL_OVERRIDES=https://streams.example.com=http://127.0.0.1:8765/site/streams.example.com
+
+Routes:
+    /<sport>/schedule        ESPN schedule fixture for nba, nfl, mlb or nhl
+    /site/<host>/<path>      stream-site fixture registered for https://<host>/<path>
+    /_stats                  request counts as JSON (POST /_stats/reset to clear)
+
+    python TestScripts/upstream_server.py --latency 150 --jitter 50 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from offline_fixtures import ESPN_FIXTURES, STREAM_FIXTURES, load_page, capture_date
+
+DATE_HEADER = re.compile(r'(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday), (\w+) (\d{1,2}), (\d{4})')
+
+CAPTURE_STAMP = re.compile(r'(ESPNFITT \|.*\| )(\w{3}, \d{1,2} \w{3} \d{4})( \d\d:\d\d:\d\d GMT)')
+
+def shift_dates(html, days):
+    """Move every schedule date header on a page, and its capture stamp, by a number of days."""
+    if not days:
+        return html
+
+    def shift(match):
+        try:
+            date = datetime.strptime(match.group(0), '%A, %B %d, %Y')
+        except ValueError:
+            return match.group(0)
+        shifted = date + timedelta(days=days)
+        return f"{shifted.strftime('%A, %B')} {shifted.day}, {shifted.year}"
+
+    def shift_stamp(match):
+        shifted = datetime.strptime(match.group(2), '%a, %d %b %Y') + timedelta(days=days)
+        return f"{match.group(1)}{shifted.strftime('%a, %d %b %Y')}{match.group(3)}"
+
+    return CAPTURE_STAMP.sub(shift_stamp, DATE_HEADER.sub(shift, html))
+
+def load_pages(replay_as_today=True):
+    """Map request paths to page bytes for every fixture."""
+    pages = {}
+    for name, sport, path in ESPN_FIXTURES:
+        route = f"/{sport.lower()}/schedule"
+        if route in pages:
+            # Only the first fixture of a sport is served
+            continue
+        html = load_page(path)
+        captured = capture_date(html)
+        if replay_as_today and captured:
+            # The app filters games to a window around today, so replay the page as if captured today
+            html = shift_dates(html, (datetime.now().date() - captured.date()).days)
+        pages[route] = html.encode('utf-8')
+
+    for name, url, path in STREAM_FIXTURES:
+        route = '/site/' + url.split('://', 1)[1]
+        pages[route] = load_page(path).encode('utf-8')
+    return pages
+
+class UpstreamStats:
+    """Thread-safe request counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.errors = 0
+            self.bytes_sent = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def started(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finished(self, sent, error=False):
+        with self._lock:
+            self.in_flight -= 1
+            self.bytes_sent += sent
+            if error:
+                self.errors += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'total_requests': sum(self.requests.values()),
+                'errors': self.errors,
+                'bytes_sent': self.bytes_sent,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight
+            }
+
+def make_handler(pages, stats, latency=0.0, jitter=0.0, error_rate=0.0, drip_rate=0, drip_chunk=4096):
+    """Build a request handler class with the given upstream behaviour (times in seconds)."""
+
+    class UpstreamHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            # Keep the console quiet under load
+            pass
+
+        def handle(self):
+            try:
+                super().handle()
+            except (BrokenPipeError, ConnectionResetError):
+                # The client closed the connection, e.g. after stopping a download early
+                pass
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path == '/_stats/reset':
+                stats.reset()
+                self._send_json({'reset': True})
+            else:
+                self.send_error(404)
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/_stats':
+                self._send_json(stats.as_dict())
+                return
+
+            stats.started(path)
+            sent = 0
+            error = False
+            try:
+                delay = latency + random.uniform(-jitter, jitter)
+                if delay > 0:
+                    time.sleep(delay)
+
+                body = pages.get(path)
+                if body is None:
+                    error = True
+                    self.send_error(404)
+                    return
+                if error_rate and random.random() < error_rate:
+                    error = True
+                    self.send_error(503, 'Injected upstream error')
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+
+                if not drip_rate:
+                    self.wfile.write(body)
+                    sent = len(body)
+                    return
+
+                # Slow-drip the body at roughly drip_rate bytes per second
+                for start in range(0, len(body), drip_chunk):
+                    chunk = body[start:start + drip_chunk]
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+                    sent += len(chunk)
+                    time.sleep(len(chunk) / drip_rate)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up (e.g. its timeout fired mid-body)
+                error = True
+            finally:
+                stats.finished(sent, error)
+
+    return UpstreamHandler
+
+def start_server(host='127.0.0.1', port=8765, replay_as_today=True, **behaviour):
+    """Start the stand-in server in a background thread, returning (server, stats)."""
+    stats = UpstreamStats()
+    handler = make_handler(load_pages(replay_as_today), stats, **behaviour)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='upstream-server', daemon=True)
+    thread.start()
+    return server, stats
+
+def add_behaviour_arguments(parser):
+    """Command-line options for the upstream behaviour, shared with load_test.py."""
+    parser.add_argument('--latency', type=float, default=0, help='Added latency per request in ms (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0, help='Random +/- jitter on the latency in ms (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0, help='Share of requests answered with a 503 (0-1)')
+    parser.add_argument('--drip-rate', type=int, default=0,
+                        help='Send bodies at this many bytes per second (default: 0, no slow drip)')
+    parser.add_argument('--drip-chunk', type=int, default=4096, help='Bytes per slow-drip write (default: 4096)')
+    parser.add_argument('--original-dates', action='store_true',
+                        help="Serve the ESPN pages with their captured dates instead of shifting them to today")
+
+def behaviour_from_args(args):
+    """Turn the parsed command-line options into start_server keyword arguments."""
+    return {
+        'latency': args.latency / 1000,
+        'jitter': args.jitter / 1000,
+        'error_rate': args.error_rate,
+        'drip_rate': args.drip_rate,
+        'drip_chunk': args.drip_chunk,
+        'replay_as_today': not args.original_dates
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the fixture pages as a stand-in for ESPN and stream sites.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+
+    server, stats = start_server(args.host, args.port, **behaviour_from_args(args))
+    print(f"Upstream stand-in listening on http://{args.host}:{args.port}")
+    print(f"  SSA_ESPN_BASE_URL=http://{args.host}:{args.port}")
+    for name, url, path in STREAM_FIXTURES:
+        host = url.split('://', 1)[1].split('/', 1)[0]
+        print(f"  SSA_URL_OVERRIDES=https://{host}=http://{args.host}:{args.port}/site/{host}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(json.dumps(stats.as_dict(), indent=2))
+
+if __name__ == '__main__':
+    main()
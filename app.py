@@ -1,5 +1,16 @@
 from flask import Flask
 from modules.routes.main_routes import configure_routes
+from modules.routes.responses import configure_responses
+from modules.utils.logging_utils import configure_logging
+from modules.utils.memory import start_tracking
+from modules.scraper.parse_pool import start_pool
+
+# Set up logging and memory tracking before anything starts scraping
+configure_logging()
+start_tracking()
+
+# Start the parse workers now rather than on the first request (only with SSA_PROCESS_POOL)
+start_pool()
 
 # Create the Flask application
 app = Flask(__name__)
@@ -7,5 +18,8 @@ app = Flask(__name__)
 # Configure routes
 configure_routes(app)
 
+# Fast JSON encoding and compressed responses
+configure_responses(app)
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
@@ -0,0 +1 @@
+from .schedule_cache import get_schedule, get_schedules, refresh_schedule, get_matchup_index, get_schedule_version, peek_schedule, schedule_status, readiness, save_all_snapshots, cache_sizes
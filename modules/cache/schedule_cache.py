@@ -0,0 +1,374 @@
+import logging
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from .. import config
+from ..scraper import get_game_times
+from ..scraper.game_matcher import build_matchup_index
+from ..utils.metrics import inc
+from ..utils.memory import deep_size
+from ..utils.priority import priority
+from ..utils.shared_store import shared_get, shared_set, shared_delete, compare_and_set, acquire_lock, renew_lock, release_lock, wait_for
+from .snapshot_store import save_snapshot, load_snapshot, encode_schedule, decode_schedule
+
+logger = logging.getLogger(__name__)
+
+# In-memory schedule cache: sport -> entry dict
+# Each entry holds the game_times, their team-pair index for matching links (see game_matcher.py),
+# when they were fetched, whether they came from a snapshot, whether they are stale, and whether
+# they have been written to disk yet
+_entries = {}
+_lock = threading.Lock()
+
+# Sports with a refresh currently running, so concurrent callers don't fetch twice
+_refreshing = set()
+
+# Sports whose snapshot we already tried to load
+_snapshot_checked = set()
+
+# Threads for fetching several sports at once (get_schedules), one per supported sport
+_fetch_pool = ThreadPoolExecutor(max_workers=len(config.SUPPORTED_SPORTS), thread_name_prefix='schedule')
+
+def _load_snapshot_entry(sport):
+    """Lazily load the on-disk snapshot for a sport the first time it is needed."""
+    with _lock:
+        if sport in _snapshot_checked:
+            return _entries.get(sport)
+        _snapshot_checked.add(sport)
+
+    snapshot = load_snapshot(sport)
+    if snapshot is None:
+        return None
+
+    game_times, fetched_at = snapshot
+    entry = {
+        'game_times': game_times,
+        'matchups': build_matchup_index(game_times),
+        'fetched_at': fetched_at or 0,
+        'source': 'snapshot',
+        # Snapshot data is the last known schedule - serve it but always revalidate
+        'stale': True,
+        'saved': True
+    }
+
+    with _lock:
+        # A live fetch may have landed while we were reading the file
+        if sport not in _entries:
+            _entries[sport] = entry
+        entry = _entries[sport]
+
+    logger.info("Loaded %s schedule snapshot (age: %ss)", sport, int(time.time() - entry['fetched_at']))
+    return entry
+
+def _get_entry(sport):
+    """Return the cached entry for a sport, falling back to its snapshot."""
+    with _lock:
+        entry = _entries.get(sport)
+    if entry is None:
+        entry = _load_snapshot_entry(sport)
+    return entry
+
+def _is_expired(entry):
+    """Check whether an entry should be revalidated."""
+    return entry['stale'] or time.time() - entry['fetched_at'] > config.SCHEDULE_TTL_SECONDS
+
+def _shared_version(sport):
+    """Return (version key value, fetched_at) of a sport's schedule in the shared cache, or (None, None)."""
+    version = shared_get(f"schedule-version:{sport}")
+    try:
+        return version, float(version) if version else None
+    except ValueError:
+        return version, None
+
+def _publish(sport, entry, seen):
+    """Publish a freshly fetched schedule to the other workers and nodes, unless a newer one got there first.
+
+    The data is written under a key of its own version, then the version key is moved to it with
+    compare-and-set from `seen`, the version when this fetch started, so a slow fetch never
+    replaces a newer schedule and readers never see a version without its data.
+    """
+    version = repr(entry['fetched_at'])
+    data_key = f"schedule:{sport}:{version}"
+    if not shared_set(data_key, encode_schedule(sport, entry['game_times'], entry['fetched_at']),
+                      config.SHARED_CACHE_TTL_SECONDS):
+        return False
+    if not compare_and_set(f"schedule-version:{sport}", seen, version.encode('ascii'), config.SHARED_CACHE_TTL_SECONDS):
+        logger.info("A newer %s schedule was published during this fetch, keeping it", sport)
+        shared_delete(data_key)
+        return False
+    if seen:
+        shared_delete(f"schedule:{sport}:{seen.decode('ascii')}")
+    return True
+
+def _adopt_shared(sport, entry):
+    """Install the shared cache's schedule for a sport if it is newer than entry, returning it, or None."""
+    if not config.SHARED_CACHE:
+        return None
+    version, fetched_at = _shared_version(sport)
+    if fetched_at is None or (entry is not None and fetched_at <= entry['fetched_at']):
+        return None
+
+    data = shared_get(f"schedule:{sport}:{version.decode('ascii')}")
+    decoded = decode_schedule(sport, data) if data else None
+    if decoded is None:
+        return None
+
+    game_times, fetched_at = decoded
+    shared = {
+        'game_times': game_times,
+        'matchups': build_matchup_index(game_times),
+        'fetched_at': fetched_at or 0,
+        'source': 'shared',
+        'stale': False,
+        # The worker that fetched it writes the snapshot
+        'saved': True
+    }
+    with _lock:
+        current = _entries.get(sport)
+        if current is not None and current['fetched_at'] >= shared['fetched_at']:
+            return current
+        _entries[sport] = shared
+    return shared
+
+def refresh_schedule(sport, force=True):
+    """Fetch a sport's schedule from ESPN, store it in the cache and write its snapshot.
+
+    With a shared cache one worker or node at a time holds the sport's refresh lease and fetches;
+    the others wait for its result, then serve what they have (or, on a cold start, fetch it
+    themselves). A fetch that finished elsewhere while waiting for the lease is used instead of
+    fetching again: one newer than this call for forced refreshes, or with `force=False` (the
+    revalidation path) one still within SSA_SCHEDULE_TTL, so a cluster fetches once per interval.
+    """
+    if not config.SHARED_CACHE:
+        return _fetch_schedule(sport)
+
+    requested_at = time.time()
+    lock_name = f"schedule:{sport}"
+    token = acquire_lock(lock_name)
+    if token is None:
+        entry = _get_entry(sport)
+        shared = wait_for(lambda: _adopt_shared(sport, entry), config.SHARED_LOCK_WAIT_SECONDS)
+        if shared is not None:
+            return shared['game_times']
+        if entry is not None:
+            return entry['game_times']
+        logger.warning("No shared %s schedule after %.1fs, fetching it here", sport, config.SHARED_LOCK_WAIT_SECONDS)
+        return _fetch_schedule(sport)
+
+    try:
+        seen, fetched_at = _shared_version(sport)
+        newest_needed = requested_at if force else time.time() - config.SCHEDULE_TTL_SECONDS
+        if fetched_at is not None and fetched_at >= newest_needed:
+            entry = _adopt_shared(sport, _get_entry(sport)) or _get_entry(sport)
+            if entry is not None and entry['fetched_at'] >= fetched_at:
+                return entry['game_times']
+        return _fetch_schedule(sport, (lock_name, token, seen))
+    finally:
+        release_lock(lock_name, token)
+
+def _fetch_schedule(sport, lease=None):
+    """Fetch a sport's schedule and install it locally and, given the refresh lease, in the shared cache."""
+    game_times = get_game_times(sport)
+
+    # get_game_times returns an empty dict on failure - keep serving what we have
+    if not game_times:
+        logger.warning("Refresh failed for %s, keeping cached schedule", sport)
+        entry = _get_entry(sport)
+        return entry['game_times'] if entry else game_times
+
+    entry = {
+        'game_times': game_times,
+        'matchups': build_matchup_index(game_times),
+        'fetched_at': time.time(),
+        'source': 'live',
+        'stale': False,
+        'saved': False
+    }
+    with _lock:
+        _entries[sport] = entry
+
+    if lease is not None:
+        lock_name, token, seen = lease
+        # A lease that ran out means another process may be fetching too; compare-and-set still
+        # keeps the newer of the two
+        if not renew_lock(lock_name, token):
+            logger.warning("Refresh lease for %s expired during the fetch", sport)
+        _publish(sport, entry, seen)
+
+    if save_snapshot(sport, game_times, entry['fetched_at']):
+        entry['saved'] = True
+
+    return game_times
+
+def _refresh_worker(sport):
+    """Run a refresh and clear the in-progress marker."""
+    try:
+        # Revalidation nobody is waiting on - it yields upstream and parse slots to user requests
+        with priority('refresh'):
+            refresh_schedule(sport, force=False)
+    except Exception as e:
+        logger.warning("Error refreshing %s schedule in background: %s", sport, e)
+    finally:
+        with _lock:
+            _refreshing.discard(sport)
+
+def refresh_in_background(sport):
+    """Start a background refresh for a sport unless one is already running."""
+    with _lock:
+        if sport in _refreshing:
+            return False
+        _refreshing.add(sport)
+
+    thread = threading.Thread(target=_refresh_worker, args=(sport,), name=f"refresh-{sport}", daemon=True)
+    thread.start()
+    return True
+
+def get_schedule(sport):
+    """Return game times for a sport, serving cached or snapshot data and revalidating in the background."""
+    if sport not in config.SUPPORTED_SPORTS:
+        return get_game_times(sport)
+
+    entry = _get_entry(sport)
+    if entry is None or _is_expired(entry):
+        # Another worker process may have refreshed this sport already
+        entry = _adopt_shared(sport, entry) or entry
+
+    # Cold start with no snapshot - the first caller has to wait for ESPN
+    if entry is None:
+        inc('ssa_schedule_cache_total', sport=sport, source='none', result='miss')
+        return refresh_schedule(sport, force=False)
+
+    if _is_expired(entry):
+        inc('ssa_schedule_cache_total', sport=sport, source=entry['source'], result='stale')
+        refresh_in_background(sport)
+    else:
+        inc('ssa_schedule_cache_total', sport=sport, source=entry['source'], result='hit')
+
+    return entry['game_times']
+
+def peek_schedule(sport):
+    """Return the cached or snapshot game times for a sport without fetching anything, or None."""
+    if sport not in config.SUPPORTED_SPORTS:
+        return None
+    entry = _get_entry(sport)
+    return entry['game_times'] if entry else None
+
+def get_matchup_index(sport, game_times):
+    """Return the team-pair index for game_times, reusing the one built with the cached schedule."""
+    with _lock:
+        entry = _entries.get(sport)
+    # The schedule may have been refreshed since the caller got game_times - only reuse a matching index
+    if entry is not None and entry['game_times'] is game_times:
+        return entry['matchups']
+    return build_matchup_index(game_times)
+
+def get_schedule_version(sport, game_times):
+    """Return the fetch time of the cached schedule game_times is, or None if it isn't the cached one.
+
+    Anything derived from a schedule (e.g. its encoded JSON) can be cached under this version.
+    """
+    with _lock:
+        entry = _entries.get(sport)
+    if entry is not None and entry['game_times'] is game_times:
+        return entry['fetched_at']
+    return None
+
+def _timed_schedule(sport, fresh):
+    """Fetch one sport's schedule for get_schedules, returning (game_times, seconds taken)."""
+    started = time.perf_counter()
+    game_times = refresh_schedule(sport) if fresh else get_schedule(sport)
+    return game_times, time.perf_counter() - started
+
+def get_schedules(sports, fresh=False, timeout=None):
+    """Fetch several sports' schedules concurrently, waiting at most timeout seconds for all of them.
+
+    Returns sport -> {'game_times', 'status', 'elapsed_seconds'} plus the cache freshness fields of
+    schedule_status(). A sport still loading when the timeout expires gets status 'timeout' and
+    whatever the cache holds for it, while its fetch carries on and fills the cache for later calls.
+    """
+    timeout = config.GAMES_TIMEOUT_SECONDS if timeout is None else timeout
+    started = time.perf_counter()
+    futures = {sport: _fetch_pool.submit(_timed_schedule, sport, fresh) for sport in sports}
+    wait(futures.values(), timeout=timeout)
+
+    results = {}
+    for sport, future in futures.items():
+        if not future.done():
+            logger.warning("%s schedule not ready after %.1fs, answering without waiting for it", sport, timeout)
+            entry = _get_entry(sport)
+            result = {
+                'game_times': entry['game_times'] if entry else {},
+                'status': 'timeout',
+                'elapsed_seconds': round(time.perf_counter() - started, 4)
+            }
+        elif future.exception() is not None:
+            logger.warning("Error fetching %s schedule: %s", sport, future.exception())
+            result = {'game_times': {}, 'status': 'error', 'elapsed_seconds': None}
+        else:
+            game_times, elapsed = future.result()
+            result = {
+                # get_game_times returns an empty dict when the fetch fails and nothing is cached
+                'game_times': game_times,
+                'status': 'ok' if game_times else 'error',
+                'elapsed_seconds': round(elapsed, 4)
+            }
+        result.update(schedule_status(sport))
+        results[sport] = result
+    return results
+
+def schedule_status(sport):
+    """Describe the cache state for a sport, loading its snapshot if needed."""
+    entry = _get_entry(sport)
+    if entry is None:
+        return {'warm': False, 'source': None, 'stale': None, 'age_seconds': None}
+
+    return {
+        'warm': True,
+        'source': entry['source'],
+        'stale': _is_expired(entry),
+        'age_seconds': int(time.time() - entry['fetched_at'])
+    }
+
+def readiness():
+    """Report whether every supported sport can be served from cache, warming up the cold ones."""
+    sports = {}
+    for sport in config.SUPPORTED_SPORTS:
+        status = schedule_status(sport)
+        if not status['warm']:
+            # Kick off the cold fetch so the next probe can succeed
+            refresh_in_background(sport)
+        sports[sport] = status
+
+    return {
+        'ready': all(status['warm'] for status in sports.values()),
+        'sports': sports
+    }
+
+def cache_sizes():
+    """Report the number of keys, games and approximate bytes held per cached sport."""
+    with _lock:
+        entries = list(_entries.items())
+
+    sizes = {}
+    for sport, entry in entries:
+        game_times = entry['game_times']
+        sizes[sport] = {
+            'keys': len(game_times),
+            'games': game_times.get('_meta', {}).get('game_count'),
+            'team_index_keys': len(game_times.get('team_games', {})),
+            'matchup_index_keys': len(entry['matchups']),
+            'approx_bytes': deep_size(game_times)
+        }
+    return sizes
+
+def save_all_snapshots():
+    """Write snapshots for any cached schedules not yet on disk (called on shutdown)."""
+    with _lock:
+        pending = [(sport, entry) for sport, entry in _entries.items() if not entry['saved']]
+
+    for sport, entry in pending:
+        if save_snapshot(sport, entry['game_times'], entry['fetched_at']):
+            entry['saved'] = True
+
+atexit.register(save_all_snapshots)
@@ -0,0 +1,88 @@
+import logging
+import gzip
+import json
+import os
+import tempfile
+import time
+from .. import config
+from ..scraper.game_records import compact_game_times, expand_game_times
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout changes; older files are ignored on load
+SNAPSHOT_FORMAT_VERSION = 1
+
+def _snapshot_path(sport):
+    """Return the snapshot file path for a sport."""
+    return os.path.join(config.SNAPSHOT_DIR, f"{sport.lower()}_schedule.json.gz")
+
+def encode_schedule(sport, game_times, fetched_at):
+    """Serialize a sport's game times in the compact snapshot layout, as JSON bytes."""
+    payload = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'sport': sport,
+        'fetched_at': fetched_at,
+        'saved_at': time.time(),
+        'schedule': compact_game_times(game_times)
+    }
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+def decode_schedule(sport, data):
+    """Parse bytes written by encode_schedule, returning (game_times, fetched_at) or None."""
+    try:
+        payload = json.loads(data.decode('utf-8'))
+    except Exception as e:
+        logger.warning("Error decoding %s schedule: %s", sport, e)
+        return None
+
+    # Ignore data written in another format or for another sport
+    if payload.get('format_version') != SNAPSHOT_FORMAT_VERSION or payload.get('sport') != sport:
+        logger.debug("Ignoring %s schedule with format version %s", sport, payload.get('format_version'))
+        return None
+
+    return expand_game_times(payload['schedule']), payload.get('fetched_at')
+
+def save_snapshot(sport, game_times, fetched_at):
+    """Atomically write a compact snapshot of a sport's game times to disk."""
+    if not config.SNAPSHOTS_ENABLED:
+        return False
+
+    try:
+        os.makedirs(config.SNAPSHOT_DIR, exist_ok=True)
+        path = _snapshot_path(sport)
+
+        # Write to a temp file in the same directory, then swap it in so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=config.SNAPSHOT_DIR, prefix=f".{sport.lower()}_", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw_file:
+                with gzip.GzipFile(fileobj=raw_file, mode='wb') as gz_file:
+                    gz_file.write(encode_schedule(sport, game_times, fetched_at))
+                raw_file.flush()
+                os.fsync(raw_file.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return True
+    except Exception as e:
+        logger.warning("Error saving %s schedule snapshot: %s", sport, e)
+        return False
+
+def load_snapshot(sport):
+    """Load a sport's snapshot from disk, returning (game_times, fetched_at) or None."""
+    if not config.SNAPSHOTS_ENABLED:
+        return None
+
+    path = _snapshot_path(sport)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with gzip.open(path, 'rb') as gz_file:
+            data = gz_file.read()
+    except Exception as e:
+        logger.warning("Error reading %s schedule snapshot: %s", sport, e)
+        return None
+
+    return decode_schedule(sport, data)
@@ -0,0 +1,185 @@
+import os
+
+# Application settings, overridable through environment variables
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env_bool(name, default):
+    """Read a boolean flag from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _env_int(name, default):
+    """Read an integer setting from the environment, falling back to the default on bad input."""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def _env_float(name, default):
+    """Read a float setting from the environment, falling back to the default on bad input."""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def _env_log_levels(name):
+    """Read per-module log levels, e.g. 'modules.scraper=DEBUG,modules.utils.team_utils=WARNING'."""
+    levels = {}
+    for item in os.environ.get(name, '').split(','):
+        if '=' in item:
+            module, level = item.split('=', 1)
+            levels[module.strip()] = level.strip().upper()
+    return levels
+
+def _env_url_overrides(name):
+    """Read URL prefix rewrites, e.g. 'https://example.com=http://127.0.0.1:8765/site/example.com'."""
+    overrides = []
+    for item in os.environ.get(name, '').split(','):
+        if '=' in item:
+            prefix, replacement = item.split('=', 1)
+            overrides.append((prefix.strip(), replacement.strip()))
+    return overrides
+
+# Leagues we fetch ESPN schedules for
+SUPPORTED_SPORTS = ('NBA', 'NFL', 'MLB', 'NHL')
+
+# How long a fetched schedule is served before it is revalidated in the background
+SCHEDULE_TTL_SECONDS = _env_int('SSA_SCHEDULE_TTL', 300)
+
+# Warm-start snapshots of the schedule cache
+SNAPSHOTS_ENABLED = _env_bool('SSA_SNAPSHOTS', True)
+SNAPSHOT_DIR = os.environ.get('SSA_SNAPSHOT_DIR', os.path.join(BASE_DIR, 'snapshots'))
+
+# Reuse parsed rows for schedule sections whose HTML hasn't changed since the last refresh
+INCREMENTAL_PARSE = _env_bool('SSA_INCREMENTAL_PARSE', True)
+PARSE_CACHE_MAX_ENTRIES = _env_int('SSA_PARSE_CACHE_MAX_ENTRIES', 5000)
+
+# Detect how to read each schedule table from its first rows instead of trying every approach on every row
+TABLE_STRATEGIES = _env_bool('SSA_TABLE_STRATEGIES', True)
+STRATEGY_PROBE_ROWS = _env_int('SSA_STRATEGY_PROBE_ROWS', 3)
+
+# Logging - default level, per-module overrides and the share of schedule rows whose debug output is kept
+LOG_LEVEL = os.environ.get('SSA_LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = _env_log_levels('SSA_LOG_LEVELS')
+LOG_ROW_SAMPLE_RATE = _env_float('SSA_LOG_ROW_SAMPLE_RATE', 1.0)
+
+# Per-stage timings and counters exported on /metrics
+METRICS_ENABLED = _env_bool('SSA_METRICS', True)
+
+# Where upstream pages are fetched from - point these at TestScripts/upstream_server.py to load test offline
+ESPN_BASE_URL = os.environ.get('SSA_ESPN_BASE_URL', 'https://www.espn.com').rstrip('/')
+URL_OVERRIDES = _env_url_overrides('SSA_URL_OVERRIDES')
+
+# On-demand profiling of single requests - off unless a token is set
+PROFILE_TOKEN = os.environ.get('SSA_PROFILE_TOKEN') or None
+PROFILE_DIR = os.environ.get('SSA_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+
+# Per-stage tracemalloc accounting (adds noticeable overhead, so off by default)
+MEMORY_TRACKING = _env_bool('SSA_MEMORY_TRACKING', False)
+MEMORY_TRACE_FRAMES = _env_int('SSA_MEMORY_TRACE_FRAMES', 1)
+
+# Parse pages in a pool of worker processes so CPU-bound HTML work doesn't hold the GIL (off by default)
+PROCESS_POOL = _env_bool('SSA_PROCESS_POOL', False)
+PROCESS_POOL_SIZE = _env_int('SSA_PROCESS_POOL_SIZE', os.cpu_count() or 2)
+PROCESS_POOL_WARMUP = _env_bool('SSA_PROCESS_POOL_WARMUP', True)
+PROCESS_POOL_START_METHOD = os.environ.get('SSA_PROCESS_POOL_START_METHOD', 'spawn')
+
+# How long /games waits for the sports it fetches before answering with the ones that are ready
+GAMES_TIMEOUT_SECONDS = _env_float('SSA_GAMES_TIMEOUT', 12.0)
+
+# Download limits - total seconds to read a page and its maximum size, for stream sites and ESPN
+FETCH_DEADLINE_SECONDS = _env_float('SSA_FETCH_DEADLINE', 15.0)
+PAGE_MAX_BYTES = _env_int('SSA_PAGE_MAX_BYTES', 2 * 1024 * 1024)
+ESPN_MAX_BYTES = _env_int('SSA_ESPN_MAX_BYTES', 4 * 1024 * 1024)
+
+# Stop reading ESPN schedule pages once the schedule tables are in, skipping the trailing JSON blob
+ESPN_EARLY_STOP = _env_bool('SSA_ESPN_EARLY_STOP', True)
+
+# Per-host health in the fetch layer: the default timeout, when a host's circuit opens, how long
+# it stays open before a probe, and how per-host timeouts are derived from the observed p99
+FETCH_TIMEOUT_SECONDS = _env_float('SSA_FETCH_TIMEOUT', 10.0)
+HOST_BREAKER = _env_bool('SSA_HOST_BREAKER', True)
+HOST_FAILURE_THRESHOLD = _env_int('SSA_HOST_FAILURE_THRESHOLD', 3)
+HOST_OPEN_SECONDS = _env_float('SSA_HOST_OPEN_SECONDS', 30.0)
+HOST_PROBE_TIMEOUT = _env_float('SSA_HOST_PROBE_TIMEOUT', 3.0)
+HOST_TIMEOUT_MIN = _env_float('SSA_HOST_TIMEOUT_MIN', 2.0)
+HOST_TIMEOUT_MULTIPLIER = _env_float('SSA_HOST_TIMEOUT_MULTIPLIER', 3.0)
+HOST_TIMEOUT_MIN_SAMPLES = _env_int('SSA_HOST_TIMEOUT_MIN_SAMPLES', 20)
+HOST_LATENCY_WINDOW = _env_int('SSA_HOST_LATENCY_WINDOW', 100)
+HOST_HEALTH_MAX_HOSTS = _env_int('SSA_HOST_HEALTH_MAX_HOSTS', 256)
+
+# get_all_urls result caching - per page URL for a short TTL, and by page content
+URL_CACHE = _env_bool('SSA_URL_CACHE', True)
+URL_CACHE_TTL_SECONDS = _env_float('SSA_URL_CACHE_TTL', 30.0)
+URL_CACHE_MAX_ENTRIES = _env_int('SSA_URL_CACHE_MAX_ENTRIES', 256)
+
+# Site-specific extraction profiles for stream index pages (see modules/scraper/site_profiles.py),
+# loaded from site_profiles.json in the project root unless another file is given ('' loads none)
+SITE_PROFILES = _env_bool('SSA_SITE_PROFILES', True)
+SITE_PROFILES_FILE = os.environ.get('SSA_SITE_PROFILES_FILE', os.path.join(BASE_DIR, 'site_profiles.json')) or None
+
+# /scrape_sources - threads fetching stream sources concurrently, and the most sources per request
+SOURCE_FETCH_WORKERS = _env_int('SSA_SOURCE_FETCH_WORKERS', 4)
+MAX_SOURCES = _env_int('SSA_MAX_SOURCES', 8)
+
+# Link titles whose parsed team pair is remembered between requests (see modules/scraper/game_matcher.py)
+MATCH_MEMO_MAX_ENTRIES = _env_int('SSA_MATCH_MEMO_MAX_ENTRIES', 2048)
+
+# Background jobs (?async=1 on /scrape and /scrape_sources) - worker threads, how many jobs may wait,
+# how long finished results are kept, and the longest a /jobs/<id>?wait= request blocks
+JOB_WORKERS = _env_int('SSA_JOB_WORKERS', 4)
+JOB_QUEUE_SIZE = _env_int('SSA_JOB_QUEUE_SIZE', 64)
+JOB_RESULT_TTL_SECONDS = _env_float('SSA_JOB_RESULT_TTL', 120.0)
+JOB_MAX_WAIT_SECONDS = _env_float('SSA_JOB_MAX_WAIT', 25.0)
+
+# Priority classes (see modules/utils/priority.py): how many upstream downloads and page parses
+# each class may run at once. Interactive requests go first, background refreshes wait while
+# interactive work is queued, and backfill only runs when nothing else is
+FETCH_LIMIT_INTERACTIVE = _env_int('SSA_FETCH_LIMIT_INTERACTIVE', 16)
+FETCH_LIMIT_REFRESH = _env_int('SSA_FETCH_LIMIT_REFRESH', 4)
+FETCH_LIMIT_BACKFILL = _env_int('SSA_FETCH_LIMIT_BACKFILL', 1)
+PARSE_LIMIT_INTERACTIVE = _env_int('SSA_PARSE_LIMIT_INTERACTIVE', 8)
+PARSE_LIMIT_REFRESH = _env_int('SSA_PARSE_LIMIT_REFRESH', 1)
+PARSE_LIMIT_BACKFILL = _env_int('SSA_PARSE_LIMIT_BACKFILL', 1)
+
+# Admission control for upstream-bound requests (see modules/utils/admission.py): requests in flight
+# per sport and source host, and how long an extra request waits for one before it is shed
+ADMISSION_CONTROL = _env_bool('SSA_ADMISSION_CONTROL', True)
+ADMISSION_MAX_CONCURRENT = _env_int('SSA_ADMISSION_MAX_CONCURRENT', 4)
+ADMISSION_WAIT_SECONDS = _env_float('SSA_ADMISSION_WAIT', 0.5)
+
+# Retry-After sent with 503 responses from shed requests and a full job queue
+RETRY_AFTER_SECONDS = _env_int('SSA_RETRY_AFTER', 5)
+
+# Cache shared between worker processes and nodes (see modules/utils/shared_store.py): '' keeps every
+# cache in-process, 'memory' uses the shared-cache code paths within one process (for tests), 'sqlite'
+# shares a database file on this machine and 'redis' a Redis-protocol server for several nodes.
+# serve.py turns on 'sqlite' when it starts more than one worker and nothing else is set
+SHARED_CACHE = (os.environ.get('SSA_SHARED_CACHE') or '').strip().lower()
+SHARED_CACHE_PATH = os.environ.get('SSA_SHARED_CACHE_PATH') or os.path.join(SNAPSHOT_DIR, 'shared_cache.sqlite3')
+REDIS_URL = os.environ.get('SSA_REDIS_URL') or 'redis://127.0.0.1:6379/0'
+SHARED_CACHE_TIMEOUT_SECONDS = _env_float('SSA_SHARED_CACHE_TIMEOUT', 2.0)
+SHARED_CACHE_TTL_SECONDS = _env_float('SSA_SHARED_CACHE_TTL', 86400.0)
+# How often the SQLite backend deletes expired rows (checked on writes)
+SHARED_CACHE_PURGE_INTERVAL_SECONDS = _env_float('SSA_SHARED_CACHE_PURGE_INTERVAL', 300.0)
+
+# Refresh leases (cross-process locks): how long a lease lasts if its holder dies, and how long another
+# worker waits for the holder's result before serving what it has
+SHARED_LOCK_TTL_SECONDS = _env_float('SSA_SHARED_LOCK_TTL', 30.0)
+SHARED_LOCK_WAIT_SECONDS = _env_float('SSA_SHARED_LOCK_WAIT', 10.0)
+
+# JSON responses (see modules/utils/serialization.py): use orjson when it is installed, and how many
+# encoded schedules to keep for reuse across responses
+FAST_JSON = _env_bool('SSA_FAST_JSON', True)
+JSON_FRAGMENT_CACHE_MAX_ENTRIES = _env_int('SSA_JSON_FRAGMENT_CACHE_MAX_ENTRIES', 32)
+
+# Response compression negotiated through Accept-Encoding (brotli when installed, else gzip): the
+# smallest body worth compressing, the compression levels, and how many compressed bodies to keep
+COMPRESSION = _env_bool('SSA_COMPRESSION', True)
+COMPRESS_MIN_BYTES = _env_int('SSA_COMPRESS_MIN_BYTES', 1024)
+GZIP_LEVEL = _env_int('SSA_GZIP_LEVEL', 6)
+BROTLI_QUALITY = _env_int('SSA_BROTLI_QUALITY', 5)
+COMPRESS_CACHE_MAX_ENTRIES = _env_int('SSA_COMPRESS_CACHE_MAX_ENTRIES', 128)
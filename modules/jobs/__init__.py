@@ -0,0 +1 @@
+from .job_queue import submit_job, get_job, job_queue_info, JobQueueFull
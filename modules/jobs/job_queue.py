@@ -0,0 +1,169 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from .. import config
+from ..utils.metrics import inc, observe
+
+logger = logging.getLogger(__name__)
+
+# Background jobs for scrapes that may wait on slow upstream sites.
+# A request submits the work and returns a job ID at once; a fixed pool of worker threads takes
+# jobs off a bounded queue, and clients poll /jobs/<id> for the result. Request threads never
+# wait on upstream I/O, and the number of concurrent upstream scrapes is capped by the pool.
+#
+# Job states: 'queued', 'running', 'done' (result holds the response payload) and 'error'
+# (an exception escaped the job, or it returned an {"error": ...} payload, which is kept as its
+# result). Only queued and running jobs are shared by identical submissions; finished jobs are
+# kept for /jobs/<id> for SSA_JOB_RESULT_TTL seconds, but new submissions start fresh work.
+
+# job ID -> job dict, oldest first
+_jobs = OrderedDict()
+
+# job ID -> Event set when the job finishes, for callers waiting on completion
+_done_events = {}
+
+# (kind, params) -> ID of the queued or running job for that work, so identical submissions
+# share one job; the entry is removed when the job finishes
+_by_key = {}
+
+_lock = threading.Lock()
+_queue = queue.Queue(maxsize=config.JOB_QUEUE_SIZE)
+_workers = []
+
+class JobQueueFull(Exception):
+    """Every worker is busy and the queue already holds SSA_JOB_QUEUE_SIZE jobs."""
+
+def _start_workers():
+    """Start the worker threads on first use; call with the lock held."""
+    while len(_workers) < config.JOB_WORKERS:
+        thread = threading.Thread(target=_worker, name=f"job-{len(_workers)}", daemon=True)
+        thread.start()
+        _workers.append(thread)
+
+def _prune(now):
+    """Drop finished jobs past their TTL; call with the lock held."""
+    expired = [job_id for job_id, job in _jobs.items()
+               if job['finished_at'] is not None and now - job['finished_at'] > config.JOB_RESULT_TTL_SECONDS]
+    for job_id in expired:
+        job = _jobs.pop(job_id)
+        _done_events.pop(job_id, None)
+        _release_key(job, job_id)
+
+def _release_key(job, job_id):
+    """Stop sharing a job with new submissions; call with the lock held."""
+    if _by_key.get(job['key']) == job_id:
+        del _by_key[job['key']]
+
+def _public(job):
+    """Copy of a job for callers, without the internal dedupe key."""
+    return {k: v for k, v in job.items() if k != 'key'}
+
+def submit_job(kind, params, func):
+    """Queue func() as a background job, returning (job, deduplicated).
+
+    `params` identifies the work together with `kind`: while a job for the same (kind, params)
+    is queued or running, that job is returned instead of a new one. Finished jobs are never
+    reused, so a result (possibly stale or shed) isn't served again after the request that
+    produced it. Raises JobQueueFull when the queue has no room.
+    """
+    key = (kind, params)
+    now = time.time()
+    with _lock:
+        _prune(now)
+        existing = _jobs.get(_by_key.get(key))
+        if existing is not None and existing['status'] in ('queued', 'running'):
+            inc('ssa_jobs_total', kind=kind, event='deduplicated')
+            return _public(existing), True
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'key': key,
+            'status': 'queued',
+            'created_at': now,
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+        try:
+            _queue.put_nowait((job['id'], func))
+        except queue.Full:
+            inc('ssa_jobs_total', kind=kind, event='rejected')
+            raise JobQueueFull(f"Job queue is full ({config.JOB_QUEUE_SIZE} jobs waiting)")
+
+        _jobs[job['id']] = job
+        _done_events[job['id']] = threading.Event()
+        _by_key[key] = job['id']
+        _start_workers()
+
+    inc('ssa_jobs_total', kind=kind, event='submitted')
+    return _public(job), False
+
+def get_job(job_id, wait=0):
+    """Return a copy of a job, or None if it is unknown or expired.
+
+    With `wait` (seconds, capped at SSA_JOB_MAX_WAIT) an unfinished job is waited on, so clients
+    can long-poll for completion instead of polling in a loop.
+    """
+    with _lock:
+        _prune(time.time())
+        event = _done_events.get(job_id)
+    if event is None:
+        return None
+
+    wait = min(max(wait, 0), config.JOB_MAX_WAIT_SECONDS)
+    if wait:
+        event.wait(wait)
+
+    with _lock:
+        job = _jobs.get(job_id)
+        return _public(job) if job is not None else None
+
+def _worker():
+    """Run queued jobs forever."""
+    while True:
+        job_id, func = _queue.get()
+        with _lock:
+            job = _jobs.get(job_id)
+            if job is not None:
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+        if job is None:
+            continue
+        observe('ssa_job_seconds', job['started_at'] - job['created_at'], kind=job['kind'], stage='queued')
+
+        try:
+            result = func()
+            # An error payload (e.g. the upstream page failed) is a failure too
+            error = result['error'] if isinstance(result, dict) and 'error' in result else None
+        except Exception as e:
+            logger.warning("Job %s (%s) failed: %s", job_id, job['kind'], e)
+            result = None
+            error = f"An error occurred: {str(e)}"
+
+        with _lock:
+            job.update(status='error' if error else 'done', result=result, error=error, finished_at=time.time())
+            _release_key(job, job_id)
+            event = _done_events.get(job_id)
+        if event is not None:
+            event.set()
+        observe('ssa_job_seconds', job['finished_at'] - job['started_at'], kind=job['kind'], stage='run')
+        inc('ssa_jobs_total', kind=job['kind'], event='error' if error else 'done')
+
+def job_queue_info():
+    """Report the queue depth, workers and jobs held by state."""
+    with _lock:
+        states = {}
+        for job in _jobs.values():
+            states[job['status']] = states.get(job['status'], 0) + 1
+        return {
+            'queued': _queue.qsize(),
+            'queue_size': config.JOB_QUEUE_SIZE,
+            'workers': len(_workers),
+            'jobs': states,
+            'result_ttl_seconds': config.JOB_RESULT_TTL_SECONDS
+        }
@@ -1,15 +1,103 @@
-from flask import render_template, request, jsonify
+import logging
+import time
+from contextlib import ExitStack
+from urllib.parse import urlparse
+from flask import render_template, request, jsonify, g, Response, url_for
 from ..utils import is_valid_url
-from ..scraper import get_all_urls, get_game_times
+from .. import config
+from ..utils.metrics import observe, timed, render_metrics
+from ..utils.profiling import is_profile_token, run_profiled
+from ..utils.memory import memory_report
+from ..utils.priority import priority_info
+from ..utils.admission import admission, Overloaded, record_shed, retry_after, admission_info
+from ..utils.shared_store import shared_cache_info
+from ..utils.serialization import cached_fragment, serialization_info
+from ..scraper import get_all_urls
+from ..scraper.section_cache import section_cache_info
+from ..scraper.host_health import host_health_report
+from ..scraper.url_cache import url_cache_info, peek_urls
+from ..scraper.link_groups import group_links, scrape_sources
+from ..scraper.game_matcher import match_titles
+from ..jobs import submit_job, get_job, job_queue_info, JobQueueFull
+from ..cache import get_schedule, get_schedules, refresh_schedule, get_matchup_index, get_schedule_version, peek_schedule, readiness, cache_sizes
+
+logger = logging.getLogger(__name__)
 
 def configure_routes(app):
     """Configure the routes for the Flask application."""
     
+    @app.before_request
+    def start_request_timer():
+        """Note when the request started for the latency histogram."""
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request_latency(response):
+        """Record the request latency by endpoint and status code."""
+        started = g.get('request_started')
+        if started is not None:
+            # Use the endpoint name rather than the path so unknown URLs don't create new series
+            observe('ssa_http_request_seconds', time.perf_counter() - started,
+                    endpoint=request.endpoint or 'unmatched', status=response.status_code)
+        return response
+    
+    def profiling_requested():
+        """Check whether this request carries the admin profiling token (header or ?profile=)."""
+        # A single attribute check when profiling isn't configured
+        if not config.PROFILE_TOKEN:
+            return False
+        return is_profile_token(request.headers.get('X-Profile-Token') or request.args.get('profile'))
+    
+    def profiled(name, handler, **context):
+        """Run a request handler under the profiler and tag the response with the profile id."""
+        response, profile_id = run_profiled(name, handler, **context)
+        response = app.make_response(response)
+        if profile_id:
+            response.headers['X-Profile-Id'] = profile_id
+        return response
+    
     @app.route('/')
     def home():
         """Render the home page."""
         return render_template('index.html')
     
+    def async_requested():
+        """Check whether the client asked for a background job (?async=1 or an async form field)."""
+        return (request.args.get('async') or request.form.get('async', '')).lower() in ('1', 'true', 'yes')
+    
+    def sport_label(sport):
+        """The metric label for a form-supplied sport - unsupported values share one label so they can't create new series."""
+        return sport if sport in config.SUPPORTED_SPORTS else 'other'
+    
+    def unavailable(message):
+        """A fast 503 telling the client when to retry."""
+        response = jsonify({"error": message})
+        response.headers['Retry-After'] = retry_after()
+        return response, 503
+    
+    def schedule_json(sport, game_times, team_games=True):
+        """game_times for a response, encoded once per schedule version when it is the cached schedule."""
+        def build():
+            return game_times if team_games else {k: v for k, v in game_times.items() if k != 'team_games'}
+        version = get_schedule_version(sport, game_times) if sport else None
+        if version is None:
+            return build()
+        return cached_fragment(('schedule', sport, version, team_games), build)
+    
+    def job_response(kind, params, func):
+        """Queue a background job and answer with its ID, or 503 when the queue is full."""
+        try:
+            job, deduplicated = submit_job(kind, params, func)
+        except JobQueueFull as e:
+            return unavailable(str(e))
+        
+        return jsonify({
+            "job_id": job['id'],
+            "status": job['status'],
+            "deduplicated": deduplicated,
+            "status_url": url_for('job_status', job_id=job['id'])
+        }), 202
+    
     @app.route('/scrape', methods=['POST'])
     def scrape():
         """Scrape URLs from a given website."""
@@ -21,36 +109,234 @@ def configure_routes(app):
             
         if not is_valid_url(url):
             return jsonify({"error": "Invalid URL provided"})
-            
+        
+        if async_requested():
+            # Jobs go through admission control too, when they run
+            return job_response('scrape', (url, sport), lambda: admitted_scrape_payload(url, sport)[0])
+        
+        if profiling_requested():
+            # Profiled requests always fetch the schedule live, so the upstream page is captured
+            return profiled('scrape', lambda: scrape_response(url, sport, fresh=True), url=url, sport=sport)
+        
+        payload, shed = admitted_scrape_payload(url, sport)
+        if shed and "error" in payload:
+            return unavailable(payload["error"])
+        return scrape_json(payload, sport)
+    
+    def admitted_scrape_payload(url, sport):
+        """Build the /scrape response body under admission control, returning (payload, shed) (also run as a background job).
+
+        A shed request is answered from the last cached links for the page, or with an error payload.
+        """
+        cached = peek_urls(url)
+        if cached is not None and cached[1] <= config.URL_CACHE_TTL_SECONDS and (not sport or peek_schedule(sport) is not None):
+            # Served from cache without going upstream, so there is nothing to admit
+            return scrape_payload(url, sport), False
+        
+        try:
+            with admission('scrape', sport, urlparse(url).hostname):
+                return scrape_payload(url, sport), False
+        except Overloaded:
+            return shed_scrape_payload(url, sport, cached), True
+    
+    def scrape_payload(url, sport, fresh=False):
+        """Build the /scrape response body for a validated URL."""
         # Get Game Times from ESPN for this sport - for countdown timers
-        game_times = get_game_times(sport) if sport else {}
+        if not sport:
+            game_times = {}
+        elif fresh:
+            game_times = refresh_schedule(sport)
+        else:
+            game_times = get_schedule(sport)
         
         # Get URLs from the provided page
         result = get_all_urls(url)
         
         if isinstance(result, dict) and "error" in result:
-            return jsonify(result)
-            
-        return jsonify({"urls": result, "game_times": game_times})
+            return result
+        
+        # The schedule entry each title names, so the page doesn't search game_times for every link
+        matches = match_titles((title for url, title in result), get_matchup_index(sport, game_times), sport) if sport else {}
+        return {"urls": result, "game_times": game_times, "matches": matches}
+    
+    def shed_scrape_payload(url, sport, cached):
+        """The /scrape body for a request turned away by admission control: the last cached result, or an error."""
+        if cached is None:
+            record_shed('scrape', 'rejected')
+            return {"error": "Too many requests for this source, try again shortly"}
+        
+        record_shed('scrape', 'stale')
+        urls, age = cached
+        game_times = (peek_schedule(sport) or {}) if sport else {}
+        matches = match_titles((title for href, title in urls), get_matchup_index(sport, game_times), sport) if sport else {}
+        return {
+            "urls": urls,
+            "game_times": game_times,
+            "matches": matches,
+            "stale": True,
+            "age_seconds": round(age, 1)
+        }
+    
+    def scrape_response(url, sport, fresh=False):
+        """Build the /scrape response for a validated URL."""
+        return scrape_json(scrape_payload(url, sport, fresh), sport)
+    
+    def scrape_json(payload, sport):
+        """Encode a /scrape response body, splicing in the encoded schedule."""
+        if "error" in payload:
+            return jsonify(payload)
+        
+        with timed('ssa_stage_seconds', stage='serialize', sport=sport_label(sport)):
+            return jsonify(dict(payload, game_times=schedule_json(sport, payload['game_times'])))
+
+    @app.route('/scrape_sources', methods=['POST'])
+    def scrape_sources_route():
+        """Scrape several stream sources at once and return their links merged into one group per game."""
+        # Keep the given order (it decides which source's link wins a duplicate) but scrape each page once
+        urls = list(dict.fromkeys(u.strip() for u in request.form.getlist('url') if u.strip()))
+        sport = request.form.get('sport', '')
+
+        if not urls:
+            return jsonify({"error": "No URL provided"})
+
+        if len(urls) > config.MAX_SOURCES:
+            return jsonify({"error": f"Too many URLs provided (at most {config.MAX_SOURCES})"})
+
+        invalid = [u for u in urls if not is_valid_url(u)]
+        if invalid:
+            return jsonify({"error": f"Invalid URL provided: {invalid[0]}"})
+
+        if sport and sport not in config.SUPPORTED_SPORTS:
+            return jsonify({"error": "Invalid sport. Choose from NBA, NFL, MLB, or NHL."})
+
+        if async_requested():
+            # Jobs go through admission control too, when they run
+            return job_response('scrape_sources', (tuple(urls), sport), lambda: admitted_sources_payload(urls, sport)[0])
+
+        # (not profiled: the sources are scraped on other threads, as /games fetches are)
+        payload, shed = admitted_sources_payload(urls, sport)
+        
+        if "error" in payload:
+            if len(shed) == len(urls):
+                return unavailable("Too many requests for these sources, try again shortly")
+            return jsonify(payload)
+
+        with timed('ssa_stage_seconds', stage='serialize', sport=sport_label(sport)):
+            return jsonify(payload)
+
+    def admitted_sources_payload(urls, sport):
+        """Build the /scrape_sources response body under admission control, returning (payload, shed sources) (also run as a background job).
+
+        Sources over their admission cap are answered from their last cached links.
+        """
+        with ExitStack() as admitted:
+            shed = []
+            for url in urls:
+                try:
+                    admitted.enter_context(admission('scrape_sources', sport, urlparse(url).hostname))
+                except Overloaded:
+                    shed.append(url)
+            return scrape_sources_payload(urls, sport, shed), shed
+
+    def scrape_sources_payload(urls, sport, shed=()):
+        """Build the /scrape_sources response body for validated URLs.
+
+        Sources in `shed` are not scraped; their last cached links are used, marked stale.
+        """
+        game_times = get_schedule(sport) if sport else {}
+        results = dict(scrape_sources([url for url in urls if url not in shed]))
+
+        sources = {}
+        scraped = []
+        for source in urls:
+            if source in shed:
+                cached = peek_urls(source)
+                record_shed('scrape_sources', 'rejected' if cached is None else 'stale')
+                if cached is None:
+                    sources[source] = {"error": "Too many requests for this source, try again shortly"}
+                    continue
+                result = cached[0]
+                sources[source] = {"links": len(result), "stale": True, "age_seconds": round(cached[1], 1)}
+            else:
+                result = results[source]
+                if isinstance(result, dict) and "error" in result:
+                    sources[source] = result
+                    continue
+                sources[source] = {"links": len(result)}
+            scraped.append((source, result))
+
+        if not scraped:
+            return {"error": "No source could be scraped", "sources": sources}
+
+        matchups = get_matchup_index(sport, game_times) if sport else {}
+        games = group_links(scraped, matchups, sport or None)
+        return {
+            "games": games,
+            "sources": sources,
+            "total_links": sum(len(game['links']) for game in games),
+            "stale": any(source.get('stale', False) for source in sources.values()),
+            # Games come matched, so the team_games lookup index isn't sent
+            "game_times": schedule_json(sport, game_times, team_games=False)
+        }
+    
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    def job_status(job_id):
+        """Status of a background job, with its result once done (?wait=<seconds> long-polls for completion)."""
+        try:
+            wait = float(request.args.get('wait', 0))
+        except ValueError:
+            return jsonify({"error": "Invalid wait value"}), 400
+        
+        job = get_job(job_id, wait)
+        if job is None:
+            return jsonify({"error": "Unknown or expired job"}), 404
+        return jsonify(job)
     
     @app.route('/debug_times/<sport>', methods=['GET'])
     def debug_times(sport):
         """Debug endpoint to view game times for a specific sport."""
         if sport not in ['NBA', 'NFL', 'MLB', 'NHL']:
             return jsonify({"error": "Invalid sport. Choose from NBA, NFL, MLB, or NHL."})
-            
-        game_times = get_game_times(sport)
         
-        # Remove the team_games index for cleaner output
-        if 'team_games' in game_times:
-            del game_times['team_games']
+        if profiling_requested():
+            return profiled('debug_times', lambda: debug_times_response(sport, fresh=True), sport=sport)
+        return debug_times_response(sport)
+    
+    def debug_times_response(sport, fresh=False):
+        """Build the /debug_times response for a supported sport."""
+        game_times = refresh_schedule(sport) if fresh else get_schedule(sport)
         
-        return jsonify({"game_times": game_times})
+        # Without the team_games index for cleaner output
+        return jsonify({"game_times": schedule_json(sport, game_times, team_games=False)})
+    
+    @app.route('/games', methods=['GET'])
+    def games():
+        """Game times for several sports at once (?sports=NBA,NFL), fetched concurrently."""
+        requested = request.args.get('sports')
+        sports = [s.strip().upper() for s in requested.split(',') if s.strip()] if requested else list(config.SUPPORTED_SPORTS)
+        invalid = [sport for sport in sports if sport not in config.SUPPORTED_SPORTS]
+        if invalid or not sports:
+            return jsonify({"error": f"Invalid sports: {', '.join(invalid)}. Choose from NBA, NFL, MLB, or NHL."})
+        
+        # Keep the requested order but fetch each sport once
+        # (not profiled: the fetches run on other threads, which cProfile wouldn't see)
+        started = time.perf_counter()
+        results = get_schedules(list(dict.fromkeys(sports)))
+        
+        for sport, result in results.items():
+            # Without the team_games index, as /debug_times does
+            result['game_times'] = schedule_json(sport, result['game_times'], team_games=False)
+        
+        return jsonify({
+            "sports": results,
+            "complete": all(result['status'] == 'ok' for result in results.values()),
+            "elapsed_seconds": round(time.perf_counter() - started, 4)
+        })
     
     @app.route('/debug_mlb_completed', methods=['GET'])
     def debug_mlb_completed():
         """Debug endpoint specifically for MLB completed games."""
-        game_times = get_game_times("MLB")
+        game_times = get_schedule("MLB")
         
         # Filter to only include completed MLB games
         completed_games = {}
@@ -61,7 +347,7 @@ def configure_routes(app):
         
         # Add metadata
         if '_meta' in game_times:
-            completed_games['_meta'] = game_times['_meta']
+            completed_games['_meta'] = dict(game_times['_meta'])
             completed_games['_meta']['completed_count'] = len(completed_games) - 1  # Subtract 1 for _meta
         
         return jsonify({
@@ -72,8 +358,8 @@ def configure_routes(app):
     @app.route('/mlb_scores', methods=['GET'])
     def mlb_scores():
         """Simplified endpoint that displays MLB completed games in a clean format."""
-        print("Fetching MLB scores...")
-        game_times = get_game_times("MLB")
+        logger.debug("Fetching MLB scores...")
+        game_times = get_schedule("MLB")
         
         # Format the results specifically for display
         completed_games = []
@@ -89,7 +375,7 @@ def configure_routes(app):
                 result = value.get('result', 'No Score')
                 
                 # Log for debugging
-                print(f"Found completed MLB game: {team1} vs {team2}, Result: {result}")
+                logger.debug("Found completed MLB game: %s vs %s, Result: %s", team1, team2, result)
                 
                 # Add to our formatted results
                 completed_games.append({
@@ -98,11 +384,11 @@ def configure_routes(app):
                     'game_date': value.get('game_date', 'Unknown Date')
                 })
         
-        print(f"Total MLB completed games found: {len(completed_games)}")
+        logger.info("Total MLB completed games found: %s", len(completed_games))
         
         # For additional debugging, log all keys in the game_times dictionary
         all_keys = list(game_times.keys())
-        print(f"All keys in game_times: {all_keys[:10]}...")  # Show first 10 keys
+        logger.debug("All keys in game_times: %s...", all_keys[:10])  # Show first 10 keys
         
         # Look for postponed game entries specifically
         postponed_games = []
@@ -111,7 +397,7 @@ def configure_routes(app):
                 teams = value.get('teams', {})
                 team1 = teams.get('team1', 'Unknown Team')
                 team2 = teams.get('team2', 'Unknown Team')
-                print(f"Found postponed game: {team1} vs {team2}")
+                logger.debug("Found postponed game: %s vs %s", team1, team2)
                 postponed_games.append({
                     'matchup': f"{team1} vs {team2}",
                     'status': value.get('result', 'Postponed'),
@@ -122,4 +408,38 @@ def configure_routes(app):
             "postponed_games": postponed_games,
             "count": len(completed_games),
             "postponed_count": len(postponed_games)
-        }) 
\ No newline at end of file
+        })
+    
+    @app.route('/ready', methods=['GET'])
+    def ready():
+        """Readiness probe - reports whether schedules can be served warm from cache or snapshot."""
+        status = readiness()
+        return jsonify(status), (200 if status['ready'] else 503)
+    
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Per-stage timings and counters in the Prometheus text format."""
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+    
+    @app.route('/debug/memory', methods=['GET'])
+    def debug_memory():
+        """Debug endpoint reporting process memory, cache sizes and live object counts."""
+        return jsonify(memory_report(caches={
+            'schedules': cache_sizes(),
+            'sections': section_cache_info(),
+            'stream_pages': url_cache_info(),
+            'jobs': job_queue_info(),
+            'admission': admission_info(),
+            'shared': shared_cache_info(),
+            'responses': serialization_info()
+        }))
+    
+    @app.route('/debug/hosts', methods=['GET'])
+    def debug_hosts():
+        """Debug endpoint reporting circuit state, failures, latency percentiles and timeout per upstream host."""
+        return jsonify(host_health_report())
+    
+    @app.route('/debug/priority', methods=['GET'])
+    def debug_priority():
+        """Debug endpoint reporting active and waiting work per priority class for the fetch and parse gates."""
+        return jsonify(priority_info())
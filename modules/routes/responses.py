@@ -0,0 +1,49 @@
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from .. import config
+from ..utils.serialization import dumps, fragment_default, compress, choose_encoding
+
+# Response types worth compressing
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() through serialization.dumps(): orjson when installed, and pre-encoded fragments spliced in."""
+
+    def dumps(self, obj, **kwargs):
+        # Indented output (debug mode) keeps the standard library path, with fragments decoded back
+        if kwargs.get('indent') is not None:
+            kwargs['default'] = fragment_default(kwargs.get('default', self.default))
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, default=self.default).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj)
+        # Bytes straight into the response, skipping a decode and re-encode
+        return self._app.response_class(dumps(obj, default=self.default) + b'\n', mimetype=self.mimetype)
+
+def compress_response(response):
+    """Compress a response body with the best encoding the client accepts (an after_request hook)."""
+    if not config.COMPRESSION:
+        return response
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    body = response.get_data()
+    if len(body) < config.COMPRESS_MIN_BYTES:
+        return response
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def configure_responses(app):
+    """Use the fast JSON provider for jsonify() and compress responses."""
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
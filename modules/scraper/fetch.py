@@ -0,0 +1,233 @@
+import codecs
+import logging
+import re
+import socket
+import threading
+import time
+import requests
+from requests.compat import chardet
+from urllib3.exceptions import ReadTimeoutError, ProtocolError, DecodeError
+from urllib.parse import urlparse
+from .. import config
+from ..utils.metrics import inc
+from ..utils.priority import fetch_gate
+from .host_health import check_host, host_timeout, record_success, record_failure
+
+logger = logging.getLogger(__name__)
+
+# Shared download path for the scrapers: returns the raw page bytes and the encoding to decode them with,
+# so pages are decoded once with a known codec instead of through requests' response.text
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Most bytes per streamed read - a read returns whatever has arrived, up to this
+CHUNK_BYTES = 64 * 1024
+
+# Bytes per read where reads can't return early (older urllib3), so a trickling server
+# can't keep one read going long past the deadline
+SLOW_READ_BYTES = 1024
+
+# Browsers look for <meta charset> in the first 1024 bytes; allow for long <head> preambles
+META_SNIFF_BYTES = 4096
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_:.-]+)', re.IGNORECASE)
+HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?\s*([A-Za-z0-9_:.-]+)', re.IGNORECASE)
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+)
+
+# host -> encoding detected from a page body, so detection runs once per site rather than per fetch
+_detected_encodings = {}
+_detected_lock = threading.Lock()
+
+class PageTooLarge(requests.RequestException):
+    """The page is bigger than the download limit for its source."""
+
+class FetchDeadlineExceeded(requests.Timeout):
+    """The page didn't finish downloading within SSA_FETCH_DEADLINE."""
+
+def _known_encoding(name):
+    """Normalize an encoding name, or None if Python has no codec for it."""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+
+def declared_encoding(content_type, content):
+    """The encoding a page declares in its Content-Type charset, a BOM or a <meta> tag, with where it came from."""
+    # requests falls back to ISO-8859-1 for any text/* response without a charset, which misreads
+    # UTF-8 pages - only an explicit charset parameter counts as declared here
+    match = HEADER_CHARSET.search(content_type or '')
+    encoding = _known_encoding(match.group(1)) if match else None
+    if encoding:
+        return encoding, 'header'
+
+    for bom, name in BOMS:
+        if content.startswith(bom):
+            return name, 'bom'
+
+    match = META_CHARSET.search(content[:META_SNIFF_BYTES])
+    encoding = _known_encoding(match.group(1).decode('ascii', 'ignore')) if match else None
+    if encoding:
+        return encoding, 'meta'
+    return None, None
+
+def _detect_encoding(content):
+    """Guess an encoding from the body with the detector requests uses for apparent_encoding."""
+    if chardet is None:
+        return None
+    return _known_encoding(chardet.detect(content).get('encoding'))
+
+def page_encoding(content_type, content, url):
+    """Pick the encoding for a downloaded page, running full-body detection at most once per host."""
+    encoding, source = declared_encoding(content_type, content)
+    if encoding is None:
+        host = urlparse(url).netloc
+        with _detected_lock:
+            encoding = _detected_encodings.get(host)
+        source = 'host_cache'
+        if encoding is None:
+            # Nothing declared and the host is new - fall back to charset detection over the body
+            encoding = _detect_encoding(content) or 'utf-8'
+            source = 'detected'
+            with _detected_lock:
+                _detected_encodings[host] = encoding
+            logger.info("Detected %s encoding for %s", encoding, host)
+    inc('ssa_page_encoding_total', source=source)
+    return encoding
+
+def decode_page(content, encoding):
+    """Decode page bytes, replacing invalid sequences like response.text does."""
+    try:
+        return str(content, encoding or 'utf-8', errors='replace')
+    except (LookupError, TypeError):
+        return str(content, 'utf-8', errors='replace')
+
+def _deadline_exceeded(url):
+    """Count a download stopped at the deadline and build its exception."""
+    inc('ssa_fetch_aborted_total', reason='deadline')
+    return FetchDeadlineExceeded(f"{url} was still sending after {config.FETCH_DEADLINE_SECONDS}s")
+
+def _body_chunks(response, url, deadline, read_timeout):
+    """Yield a streamed body as it arrives, with every socket read bounded by the time left before the deadline.
+
+    The requests timeout restarts with each byte received, so on its own it lets a server that
+    trickles bytes hold a download open indefinitely.
+    """
+    raw = getattr(response, 'raw', None)
+    sock = getattr(getattr(raw, 'connection', None), 'sock', None)
+    if sock is None or not hasattr(raw, 'read1'):
+        # No socket to bound (older urllib3, test stubs) - small reads keep the overrun short
+        yield from response.iter_content(chunk_size=SLOW_READ_BYTES)
+        return
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise _deadline_exceeded(url)
+        sock.settimeout(min(read_timeout, remaining))
+        try:
+            # read1() returns after at most one socket read, with whatever has arrived
+            chunk = raw.read1(CHUNK_BYTES, decode_content=True)
+        except (ReadTimeoutError, socket.timeout) as e:
+            if time.monotonic() >= deadline:
+                raise _deadline_exceeded(url)
+            raise requests.ReadTimeout(e)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e)
+        if not chunk:
+            return
+        yield chunk
+
+def _read_body(response, url, max_bytes, deadline, read_timeout, stop_marker):
+    """Read a streamed body within the size cap and deadline, stopping early at stop_marker."""
+    chunks = []
+    received = 0
+    tail = b''
+    for chunk in _body_chunks(response, url, deadline, read_timeout):
+        if not chunk:
+            continue
+        received += len(chunk)
+        if received > max_bytes:
+            inc('ssa_fetch_aborted_total', reason='too_large')
+            raise PageTooLarge(f"{url} sent more than {max_bytes} bytes")
+        chunks.append(chunk)
+
+        if stop_marker:
+            # Search the new chunk plus the end of the previous one, in case the marker straddles them
+            window = tail + chunk
+            found = window.find(stop_marker)
+            if found != -1:
+                body = b''.join(chunks)
+                cut = received - len(window) + found
+                # Cut at the start of the tag holding the marker so the page ends on a clean boundary
+                tag_start = body.rfind(b'<', 0, cut)
+                inc('ssa_fetch_early_stops_total')
+                return body[:tag_start if tag_start != -1 else cut]
+            tail = window[-(len(stop_marker) - 1):] if len(stop_marker) > 1 else b''
+
+        if time.monotonic() > deadline:
+            raise _deadline_exceeded(url)
+    return b''.join(chunks)
+
+def fetch_page(url, timeout=None, max_bytes=None, stop_marker=None):
+    """Download a page, returning (bytes, encoding); raises requests exceptions on failure.
+
+    The body is streamed: reading stops with PageTooLarge past max_bytes (default SSA_PAGE_MAX_BYTES),
+    with FetchDeadlineExceeded after SSA_FETCH_DEADLINE seconds in total, and early, without error,
+    once stop_marker has arrived - the page is then returned up to the tag containing the marker.
+    Hosts that keep failing are skipped with HostUnavailable (see host_health.py). Downloads take
+    a slot of the current priority class first (see priority.py).
+    """
+    host = urlparse(url).netloc
+    check_host(host, url)
+    # Wait on each host only as long as its recent responses suggest, never longer than the configured timeout
+    timeout = host_timeout(host, timeout or config.FETCH_TIMEOUT_SECONDS)
+    max_bytes = max_bytes or config.PAGE_MAX_BYTES
+    with fetch_gate.slot():
+        content, content_type = _download(url, host, timeout, max_bytes, stop_marker)
+    return content, page_encoding(content_type, content, url)
+
+def _download(url, host, timeout, max_bytes, stop_marker):
+    """Stream a page within the limits, recording the outcome for the host; returns (bytes, Content-Type)."""
+    # Latency and deadline start once the slot is held, so queueing doesn't count against the host
+    started = time.perf_counter()
+    deadline = time.monotonic() + config.FETCH_DEADLINE_SECONDS
+    try:
+        # The requests timeout applies per socket read; while the body streams, each read is also cut to the deadline
+        read_timeout = min(timeout, config.FETCH_DEADLINE_SECONDS)
+        response = requests.get(url, headers=DEFAULT_HEADERS, timeout=(timeout, read_timeout), stream=True)
+        try:
+            response.raise_for_status()
+            declared_length = response.headers.get('Content-Length')
+            if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+                inc('ssa_fetch_aborted_total', reason='too_large')
+                raise PageTooLarge(f"{url} declares {declared_length} bytes, over the {max_bytes} byte limit")
+            content = _read_body(response, url, max_bytes, deadline, read_timeout, stop_marker)
+        finally:
+            response.close()
+    except (requests.ConnectionError, requests.Timeout) as e:
+        record_failure(host, e)
+        raise
+    except requests.HTTPError as e:
+        # Server errors count against the host; a 404 means it is up
+        if e.response is not None and e.response.status_code >= 500:
+            record_failure(host, e)
+        else:
+            record_success(host, time.perf_counter() - started)
+        raise
+    record_success(host, time.perf_counter() - started)
+    return content, response.headers.get('Content-Type')
+
+def clear_detected_encodings():
+    """Forget the per-host detection results."""
+    with _detected_lock:
+        _detected_encodings.clear()
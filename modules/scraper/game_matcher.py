@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+from .. import config
+from ..utils.metrics import inc
+
+# Resolves extracted link titles ('MLB: Team A vs Team B') to the key of their game in game_times
+# through a dict keyed by the sorted team pair, built once per schedule, instead of the browser
+# scanning every schedule key and the team_games index for each link.
+
+# Schedule statuses in the order a link should be attached to them when a pair plays more than once
+STATUS_PRIORITY = {'live': 0, 'upcoming': 1, 'completed': 2}
+
+# title -> (sport, pair key) or None, for titles seen in earlier requests (the same few hundred
+# titles come back on every scrape of a source)
+_title_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+def normalize_team(name):
+    """Lowercase a team name and drop punctuation, so 'St. Louis' and 'St Louis' compare equal."""
+    return ' '.join(''.join(c for c in name.lower() if c.isalnum() or c.isspace()).split())
+
+def pair_key(team1, team2):
+    """Order-independent key for a matchup."""
+    return ' vs '.join(sorted((normalize_team(team1), normalize_team(team2))))
+
+def build_matchup_index(game_times):
+    """Map each team pair in a schedule to the key of the game a link should point at.
+
+    When a pair plays more than once (doubleheaders, series), the live game wins, then the
+    earliest upcoming game, then a completed one.
+    """
+    candidates = {}
+    for key, value in (game_times or {}).items():
+        if key in ('_meta', 'team_games') or not isinstance(value, dict):
+            continue
+        teams = value.get('teams') or {}
+        if not teams.get('team1') or not teams.get('team2'):
+            continue
+        pair = pair_key(teams['team1'], teams['team2'])
+        rank = (STATUS_PRIORITY.get(value.get('status'), 3), value.get('utc_time') or '', key)
+        current = candidates.get(pair)
+        if current is None or rank < current[0]:
+            candidates[pair] = (rank, key)
+    return {pair: key for pair, (rank, key) in candidates.items()}
+
+def split_title(title):
+    """Split an extracted title ('MLB: Team A vs Team B') into (sport, [team, team]), or None when it doesn't name two teams."""
+    sport, sep, matchup = title.partition(': ')
+    teams = matchup.split(' vs ')
+    if not sep or len(teams) != 2:
+        return None
+    return sport, teams
+
+def _parse_title(title):
+    """Split a title into (sport, pair key), or None when it doesn't name two teams."""
+    parsed = split_title(title)
+    if parsed is None:
+        return None
+    return parsed[0], pair_key(*parsed[1])
+
+def title_pair(title):
+    """(sport, pair key) for an extracted title, memoized; None when it doesn't name two teams."""
+    with _memo_lock:
+        if title in _title_memo:
+            _title_memo.move_to_end(title)
+            return _title_memo[title]
+
+    parsed = _parse_title(title)
+    with _memo_lock:
+        _title_memo[title] = parsed
+        while len(_title_memo) > config.MATCH_MEMO_MAX_ENTRIES:
+            _title_memo.popitem(last=False)
+    return parsed
+
+def match_title(title, index, sport=None):
+    """Return the game_times key of the game a title names, or None."""
+    parsed = title_pair(title)
+    if parsed is None or (sport and parsed[0] != sport):
+        return None
+    return index.get(parsed[1])
+
+def match_titles(titles, index, sport=None):
+    """Resolve several titles at once: {title: game_times key or None}, leaving out other sports' titles."""
+    matches = {}
+    for title in titles:
+        if title in matches:
+            continue
+        parsed = title_pair(title)
+        if parsed is None or (sport and parsed[0] != sport):
+            continue
+        matches[title] = index.get(parsed[1])
+    matched = sum(1 for key in matches.values() if key)
+    inc('ssa_game_matches_total', matched, result='matched')
+    inc('ssa_game_matches_total', len(matches) - matched, result='unmatched')
+    return matches
+
+def clear_title_memo():
+    """Forget the memoized titles (used by the test scripts)."""
+    with _memo_lock:
+        _title_memo.clear()
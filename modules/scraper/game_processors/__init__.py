@@ -1,4 +1,4 @@
 from .live_game_processor import process_live_game
 from .completed_game_processor import process_completed_game
 from .upcoming_game_processor import process_upcoming_game
-from .game_row_processor import process_game_row 
\ No newline at end of file
+from .game_row_processor import process_game_row, extract_game_row, emit_game_row, detect_table_strategy 
\ No newline at end of file
@@ -1,5 +1,9 @@
+import logging
 from datetime import datetime
 import pytz
+from .game_index import add_game_to_index
+
+logger = logging.getLogger(__name__)
 
 def process_completed_game(
     sport, team1, team2, team1_official, team2_official,
@@ -21,8 +25,8 @@ def process_completed_game(
     teams_with_games_today.add(team2_key)
     
     # Print successfully parsed completed game
-    print(f"Successfully parsed COMPLETED game: {team1_official} vs {team2_official} with result: {game_result} [ID: {unique_game_id}]")
-    print(f"--- DONE PROCESSING GAME: {team1_official} vs {team2_official} ---\n")
+    logger.debug("Successfully parsed COMPLETED game: %s vs %s with result: %s [ID: %s]", team1_official, team2_official, game_result, unique_game_id)
+    logger.debug("--- DONE PROCESSING GAME: %s vs %s ---", team1_official, team2_official)
     
     # Create various matchup formats for better matching
     # Standard format with official team names - keep order consistent
@@ -31,7 +35,6 @@ def process_completed_game(
     
     # Create an exact matchup key with team order preserved
     exact_matchup = f"{team1_official} vs {team2_official}"
-    exact_matchup_reverse = f"{team2_official} vs {team1_official}"
     
     # Create a consistent matchup key for easier comparison
     matchup_key = f"{sorted_teams[0].lower()} vs {sorted_teams[1].lower()}"
@@ -69,61 +72,8 @@ def process_completed_game(
         }
     }
     
-    # Store both exact matchups with the game ID - this is crucial for accurate lookup
-    # Add "COMPLETED" to key for completed games
-    key_suffix = "_COMPLETED"
-    game_times[f"{exact_matchup}_{unique_game_id}{key_suffix}"] = time_info
-    game_times[f"{exact_matchup_reverse}_{unique_game_id}{key_suffix}"] = time_info
-    
-    # Store individual team information for team-based lookups
-    if 'team_games' not in game_times:
-        game_times['team_games'] = {}
-        
-    # Index by normalized team names for both teams
-    for team_idx, team in enumerate([team1_official, team2_official]):
-        # Store team names in lowercase for easier matching later
-        normalized = team.lower()
-        # Remove common suffixes and special characters
-        normalized = normalized.replace('fc', '').replace('team', '')
-        normalized = ''.join(c for c in normalized if c.isalnum() or c.isspace()).strip()
-        
-        # Create or append to the team's game list
-        if normalized not in game_times['team_games']:
-            game_times['team_games'][normalized] = []
-        
-        # Only add if not already in the list
-        if not any(g['game_id'] == unique_game_id for g in game_times['team_games'][normalized]):
-            # Store which position this team is in the matchup (team1 or team2)
-            team_position = 'team1' if team_idx == 0 else 'team2'
-            
-            # Create a copy of time_info with the team's position
-            team_info = dict(time_info)
-            team_info['is_team1'] = team_position == 'team1'
-            team_info['team_normalized'] = normalized
-            team_info['other_team'] = team2_official.lower() if team_idx == 0 else team1_official.lower()
-            
-            game_times['team_games'][normalized].append(team_info)
-            
-        # Also store single-word variations for teams with multiple words
-        words = normalized.split()
-        if len(words) > 1:
-            for word in words:
-                if len(word) > 3:  # Only use words longer than 3 chars
-                    if word not in game_times['team_games']:
-                        game_times['team_games'][word] = []
-                    
-                    # Only add if not already in the list with same info
-                    if not any(g['game_id'] == unique_game_id for g in game_times['team_games'][word]):
-                        # Store which position this team is in the matchup
-                        team_position = 'team1' if team_idx == 0 else 'team2'
-                        
-                        # Create a copy of time_info with the team's position
-                        team_info = dict(time_info)
-                        team_info['is_team1'] = team_position == 'team1'
-                        team_info['team_normalized'] = normalized
-                        team_info['word_match'] = True
-                        team_info['other_team'] = team2_official.lower() if team_idx == 0 else team1_official.lower()
-                        
-                        game_times['team_games'][word].append(team_info)
+    # Store both exact matchups and the team_games index entries
+    # Add the status suffix to keys to prevent overwriting with stale info
+    add_game_to_index(game_times, time_info, key_suffix="_COMPLETED")
     
     return game_times 
\ No newline at end of file
@@ -0,0 +1,68 @@
+def add_game_to_index(game_times, time_info, key_suffix=""):
+    """Store a processed game in game_times under both matchup keys and in the team_games index."""
+    team1_official = time_info['teams']['team1']
+    team2_official = time_info['teams']['team2']
+    unique_game_id = time_info['game_id']
+
+    # Create an exact matchup key with team order preserved
+    exact_matchup = f"{team1_official} vs {team2_official}"
+    exact_matchup_reverse = f"{team2_official} vs {team1_official}"
+
+    # Store both exact matchups with the game ID - this is crucial for accurate lookup
+    game_times[f"{exact_matchup}_{unique_game_id}{key_suffix}"] = time_info
+    game_times[f"{exact_matchup_reverse}_{unique_game_id}{key_suffix}"] = time_info
+
+    # Store individual team information for team-based lookups
+    # This allows us to match games by any team mentioned in the matchup
+    if 'team_games' not in game_times:
+        game_times['team_games'] = {}
+
+    # Index by normalized team names for both teams
+    for team_idx, team in enumerate([team1_official, team2_official]):
+        # Store team names in lowercase for easier matching later
+        normalized = team.lower()
+        # Remove common suffixes and special characters
+        normalized = normalized.replace('fc', '').replace('team', '')
+        normalized = ''.join(c for c in normalized if c.isalnum() or c.isspace()).strip()
+
+        # Create or append to the team's game list
+        if normalized not in game_times['team_games']:
+            game_times['team_games'][normalized] = []
+
+        # Only add if not already in the list
+        if not any(g['game_id'] == unique_game_id for g in game_times['team_games'][normalized]):
+            # Store which position this team is in the matchup (team1 or team2)
+            # This is crucial for correctly matching teams across sources
+            team_position = 'team1' if team_idx == 0 else 'team2'
+
+            # Create a copy of time_info with the team's position
+            team_info = dict(time_info)
+            team_info['is_team1'] = team_position == 'team1'
+            team_info['team_normalized'] = normalized
+            team_info['other_team'] = team2_official.lower() if team_idx == 0 else team1_official.lower()
+
+            game_times['team_games'][normalized].append(team_info)
+
+        # Also store single-word variations for teams with multiple words
+        words = normalized.split()
+        if len(words) > 1:
+            for word in words:
+                if len(word) > 3:  # Only use words longer than 3 chars
+                    if word not in game_times['team_games']:
+                        game_times['team_games'][word] = []
+
+                    # Only add if not already in the list with same info
+                    if not any(g['game_id'] == unique_game_id for g in game_times['team_games'][word]):
+                        # Store which position this team is in the matchup
+                        team_position = 'team1' if team_idx == 0 else 'team2'
+
+                        # Create a copy of time_info with the team's position
+                        team_info = dict(time_info)
+                        team_info['is_team1'] = team_position == 'team1'
+                        team_info['team_normalized'] = normalized
+                        team_info['word_match'] = True
+                        team_info['other_team'] = team2_official.lower() if team_idx == 0 else team1_official.lower()
+
+                        game_times['team_games'][word].append(team_info)
+
+    return game_times
@@ -1,40 +1,18 @@
+import logging
 import re
+import time
 from datetime import datetime
 import pytz
-from ...utils.team_utils import get_official_team_name
+from ...utils.team_utils import get_official_team_name, get_all_teams_for_sport
+from ...utils.metrics import observe
+from .live_game_processor import process_live_game
+from .completed_game_processor import process_completed_game
+from .upcoming_game_processor import process_upcoming_game
 
-def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, section_date, teams_with_games_today, processed_game_ids, game_times):
-    """Process a single game row and extract game information."""
-    # Try multiple approaches to find teams
-    team1 = None
-    team2 = None
-    
-    # Check for postponed games first - they're usually easy to identify
-    is_postponed = False
-    result_text = None
-    row_text = row.text.strip().upper()
-    if "POSTPONED" in row_text or "PPD" in row_text:
-        is_postponed = True
-        result_text = "Postponed"
-        print(f"Found a POSTPONED game in row: {row_text[:50]}...")
-    
-    # Extra logging for MLB games
-    is_mlb = sport == 'MLB'
-    if is_mlb:
-        print(f"\n=== PROCESSING MLB ROW ===")
-        
-        # For MLB, check if this is a "FINAL" row or "POSTPONED" row
-        row_contains_final = "FINAL" in row_text
-        if row_contains_final:
-            print(f"  Found FINAL indicator in MLB row")
-        if is_postponed:
-            print(f"  Found POSTPONED indicator in MLB row")
-            
-        # Print first few cells to help with debugging
-        first_few_cells = row.find_all('td', class_='Table__TD')[:5]
-        for i, cell in enumerate(first_few_cells):
-            print(f"  MLB Cell {i}: {cell.text.strip()}")
-    
+logger = logging.getLogger(__name__)
+
+def _teams_from_anchor_links(sport, row, team_cells, team1, team2):
+    """Read the teams from AnchorLink team links, fixing same-city teams with their team codes."""
     # First attempt - find all team links across all cells
     all_team_links = row.find_all('a', class_='AnchorLink')
     team_links = [link for link in all_team_links if link.find('abbr') or '/team/' in link.get('href', '') or 'gamecast' not in link.get('href', '')]
@@ -71,38 +49,44 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
             if team1_code.lower() == 'laa' and team2_code.lower() == 'lad':
                 team1 = 'Los Angeles Angels'
                 team2 = 'Los Angeles Dodgers'
-                print(f"Fixed LA teams using codes: {team1} vs {team2}")
+                logger.debug("Fixed LA teams using codes: %s vs %s", team1, team2)
             elif team1_code.lower() == 'lad' and team2_code.lower() == 'laa':
                 team1 = 'Los Angeles Dodgers'
                 team2 = 'Los Angeles Angels'
-                print(f"Fixed LA teams using codes: {team1} vs {team2}")
+                logger.debug("Fixed LA teams using codes: %s vs %s", team1, team2)
                 
         # Special handling for New York teams using team codes
         if team1 == 'New York' and team2 == 'New York' and team1_code and team2_code:
             if team1_code.lower() == 'nym' and team2_code.lower() == 'nyy':
                 team1 = 'New York Mets'
                 team2 = 'New York Yankees'
-                print(f"Fixed NY teams using codes: {team1} vs {team2}")
+                logger.debug("Fixed NY teams using codes: %s vs %s", team1, team2)
             elif team1_code.lower() == 'nyy' and team2_code.lower() == 'nym':
                 team1 = 'New York Yankees'
                 team2 = 'New York Mets'
-                print(f"Fixed NY teams using codes: {team1} vs {team2}")
+                logger.debug("Fixed NY teams using codes: %s vs %s", team1, team2)
                 
         # Special handling for Chicago teams using team codes
         if team1 == 'Chicago' and team2 == 'Chicago' and team1_code and team2_code:
-            print(f"Differentiating Chicago teams with codes: {team1_code} vs {team2_code}")
+            logger.debug("Differentiating Chicago teams with codes: %s vs %s", team1_code, team2_code)
             if (team1_code.lower() == 'chc' or team1_code.lower() == 'chi') and (team2_code.lower() == 'chw' or team2_code.lower() == 'cws'):
                 team1 = 'Chicago Cubs'
                 team2 = 'Chicago White Sox'
-                print(f"Fixed Chicago teams using codes: {team1} vs {team2}")
+                logger.debug("Fixed Chicago teams using codes: %s vs %s", team1, team2)
             elif (team1_code.lower() == 'chw' or team1_code.lower() == 'cws') and (team2_code.lower() == 'chc' or team2_code.lower() == 'chi'):
                 team1 = 'Chicago White Sox'
                 team2 = 'Chicago Cubs'
-                print(f"Fixed Chicago teams using codes: {team1} vs {team2}")
+                logger.debug("Fixed Chicago teams using codes: %s vs %s", team1, team2)
+    
+    return team1, team2
+
+def _teams_from_mlb_markup(sport, row, team_cells, team1, team2):
+    """Read MLB teams from logo alt text or abbreviation cells."""
+    is_mlb = sport == 'MLB'
     
     # Special MLB-specific parsing if we couldn't find teams or this is MLB
     if (not team1 or not team2) and is_mlb:
-        print("  Trying MLB-specific team detection...")
+        logger.debug("Trying MLB-specific team detection...")
         # Try to find team logos which often contain the team name in alt text or class
         team_logos = row.find_all('img', class_=lambda x: x and ('logo' in x.lower() or 'team' in x.lower()))
         
@@ -111,7 +95,7 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
             if team_logos[0].get('alt') and team_logos[1].get('alt'):
                 team1 = team_logos[0].get('alt').strip()
                 team2 = team_logos[1].get('alt').strip()
-                print(f"  Found MLB teams from logos: {team1} vs {team2}")
+                logger.debug("Found MLB teams from logos: %s vs %s", team1, team2)
         
         # If still no team names, look for team abbreviations in cell text
         if not team1 or not team2:
@@ -121,27 +105,27 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
                 # Look for match in first cells - MLB often shows abbreviations
                 if idx == 0 and len(cell_text) <= 3 and cell_text.isupper():
                     team1_abbr = cell_text
-                    print(f"  Found potential MLB team1 abbr: {team1_abbr}")
+                    logger.debug("Found potential MLB team1 abbr: %s", team1_abbr)
                     # Try to find matching team
                     for team in get_all_teams_for_sport("MLB"):
                         if team1_abbr in team:
                             team1 = team
-                            print(f"  Matched MLB team1: {team1}")
+                            logger.debug("Matched MLB team1: %s", team1)
                             break
                 
                 if idx == 1 and len(cell_text) <= 3 and cell_text.isupper():
                     team2_abbr = cell_text
-                    print(f"  Found potential MLB team2 abbr: {team2_abbr}")
+                    logger.debug("Found potential MLB team2 abbr: %s", team2_abbr)
                     # Try to find matching team
                     for team in get_all_teams_for_sport("MLB"):
                         if team2_abbr in team:
                             team2 = team
-                            print(f"  Matched MLB team2: {team2}")
+                            logger.debug("Matched MLB team2: %s", team2)
                             break
                             
         # Try to extract score from cells if this is a completed game
         if team1 and team2 and any("FINAL" in c.text.upper() for c in team_cells):
-            print("  Looking for MLB game score...")
+            logger.debug("Looking for MLB game score...")
             score1 = None
             score2 = None
             
@@ -153,18 +137,22 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
                 if idx >= 2 and idx <= 4 and cell_text.isdigit():
                     if score1 is None:
                         score1 = cell_text
-                        print(f"  Found MLB score1: {score1}")
+                        logger.debug("Found MLB score1: %s", score1)
                     elif score2 is None:
                         score2 = cell_text
-                        print(f"  Found MLB score2: {score2}")
+                        logger.debug("Found MLB score2: %s", score2)
                         break
             
             # If we found both scores, store for later
             if score1 and score2:
                 # Store at function level so other parts can access it
                 game_result = f"{score1}-{score2}"
-                print(f"  MLB GAME RESULT: {game_result}")
+                logger.debug("MLB GAME RESULT: %s", game_result)
     
+    return team1, team2
+
+def _teams_from_team_spans(sport, row, team_cells, team1, team2):
+    """Read the teams from TeamName spans."""
     # Second attempt - look for team name spans
     if not team1 or not team2:
         team_spans = row.find_all('span', class_=lambda x: x and ('TeamName' in x or 'abbr' in x or 'teamName' in x))
@@ -172,6 +160,10 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
             team1 = team_spans[0].text.strip()
             team2 = team_spans[1].text.strip()
     
+    return team1, team2
+
+def _teams_from_cell_text(sport, row, team_cells, team1, team2):
+    """Read the teams from the text of the first two cells."""
     # Third attempt - use the first two cells if they have content
     if (not team1 or not team2) and len(team_cells) >= 2:
         # Some tables have teams in first two cells
@@ -184,6 +176,10 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
         if len(cell2_text) > 2 and not cell2_text[0].isdigit() and not ':' in cell2_text:
             team2 = cell2_text
     
+    return team1, team2
+
+def _teams_from_at_split(sport, row, team_cells, team1, team2):
+    """Read the teams from a single 'Team @ Team' cell."""
     # If we still don't have team names, try one last approach for specific sports
     if (not team1 or not team2) and sport in ['NBA', 'NHL']:
         # These sports often have a single cell with "Team @ Team" format
@@ -195,60 +191,209 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
                 team2 = teams[1].strip()
                 break
     
+    return team1, team2
+
+# Team extraction steps, in the order the cascade tries them
+# Each step only fills in teams the earlier steps couldn't find
+TEAM_STRATEGIES = (
+    ('anchor_links', _teams_from_anchor_links),
+    ('mlb_markup', _teams_from_mlb_markup),
+    ('team_spans', _teams_from_team_spans),
+    ('cell_text', _teams_from_cell_text),
+    ('at_split', _teams_from_at_split)
+)
+TEAM_STRATEGY_STEPS = dict(TEAM_STRATEGIES)
+
+# Marks a column that couldn't be pinned down for a table - rows use the full cascade
+CASCADE = 'cascade'
+
+def find_teams(sport, row, team_cells):
+    """Try every team extraction step in turn and return (team1, team2)."""
+    team1 = None
+    team2 = None
+    for name, step in TEAM_STRATEGIES:
+        team1, team2 = step(sport, row, team_cells, team1, team2)
+    return team1, team2
+
+def _find_result_cells(row, team_cells, strategy=None):
+    """Find the RESULT cell of a row, using the table's detected column when it applies."""
+    result_col = strategy.get('result_col', CASCADE) if strategy else CASCADE
+    
+    # A column of None means the probed rows had no RESULT cell - later rows still get the cascade
+    if result_col not in (CASCADE, None) and result_col < len(team_cells) and team_cells[result_col].get('data-header') == 'RESULT':
+        return [team_cells[result_col]]
+    
+    result_cells = row.find_all('td', class_='Table__TD', attrs={'data-header': 'RESULT'})
+    if not result_cells:
+        # Try direct column name matching as well
+        result_cells = row.find_all('td', string=lambda x: x and 'RESULT' in x)
+        
+        # Check for cells with "RESULT" in header
+        if not result_cells:
+            for cell in team_cells:
+                if cell.get('data-header') == 'RESULT':
+                    result_cells = [cell]
+                    break
+    return result_cells
+
+def _is_time_cell(cell, cell_text):
+    """Check whether a cell looks like it holds the game time or status."""
+    cell_class = cell.get('class', [])
+    # Check for date_col class which often contains time
+    return 'date__col' in cell_class or ':' in cell_text or 'LIVE' in cell_text or 'PM' in cell_text or 'AM' in cell_text
+
+def _find_time_cell_text(team_cells, strategy=None):
+    """Return the text of the time cell, using the table's detected column when it applies."""
+    time_col = strategy.get('time_col', CASCADE) if strategy else CASCADE
+    if time_col != CASCADE and time_col < len(team_cells):
+        cell_text = team_cells[time_col].text.strip()
+        if _is_time_cell(team_cells[time_col], cell_text):
+            return cell_text
+    
+    # Look for game time in different cells - varies by sport
+    for cell in team_cells:
+        cell_text = cell.text.strip()
+        if _is_time_cell(cell, cell_text):
+            logger.debug("Found time cell with text: '%s' (class: %s)", cell_text, cell.get('class', []))
+            return cell_text
+    return None
+
+def detect_table_strategy(sport, probes):
+    """Pick the team extraction step and result/time columns that work for a table, from (row, team_cells) probes."""
+    strategy = {'teams': None, 'result_col': CASCADE, 'time_col': CASCADE}
+    if not probes:
+        return strategy
+    
+    # Use the first step that, on its own, gives the same teams as the full cascade for every probed row
+    expected = [(row, team_cells, find_teams(sport, row, team_cells)) for row, team_cells in probes]
+    expected = [(row, team_cells, teams) for row, team_cells, teams in expected if teams[0] and teams[1]]
+    if expected:
+        for name, step in TEAM_STRATEGIES:
+            if all(step(sport, row, team_cells, None, None) == teams for row, team_cells, teams in expected):
+                strategy['teams'] = name
+                break
+    
+    # Find the column holding the RESULT cell (None if the table has none)
+    result_cols = set()
+    for row, team_cells in probes:
+        result_cells = _find_result_cells(row, team_cells)
+        if not result_cells:
+            result_cols.add(None)
+        else:
+            result_cols.add(next((idx for idx, cell in enumerate(team_cells) if cell is result_cells[0]), CASCADE))
+    if len(result_cols) == 1:
+        strategy['result_col'] = result_cols.pop()
+    
+    # Find the column holding the game time
+    time_cols = set()
+    for row, team_cells in probes:
+        time_cols.add(next((idx for idx, cell in enumerate(team_cells) if _is_time_cell(cell, cell.text.strip())), CASCADE))
+    if len(time_cols) == 1:
+        strategy['time_col'] = time_cols.pop()
+    
+    logger.debug("Detected %s table strategy: %s", sport, strategy)
+    return strategy
+
+def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, section_date, teams_with_games_today, processed_game_ids, game_times):
+    """Process a single game row and extract game information."""
+    game = extract_game_row(sport, row, team_cells)
+    return emit_game_row(sport, game, game_id, row_position, table_idx, section_date, teams_with_games_today, processed_game_ids, game_times)
+
+def extract_game_row(sport, row, team_cells, strategy=None):
+    """Extract teams, status, result and time from a game row, or None if the row should be skipped.
+    
+    strategy is the table's detected extraction strategy (see detect_table_strategy); rows it
+    doesn't work for fall back to the full cascade.
+    """
+    # Everything here depends only on the row's HTML, so the record can be reused for an
+    # unchanged row - checks against other rows happen in emit_game_row
+    # Check for postponed games first - they're usually easy to identify
+    is_postponed = False
+    result_text = None
+    row_text = row.text.strip().upper()
+    if "POSTPONED" in row_text or "PPD" in row_text:
+        is_postponed = True
+        result_text = "Postponed"
+        logger.debug("Found a POSTPONED game in row: %s...", row_text[:50])
+    
+    # Extra logging for MLB games
+    is_mlb = sport == 'MLB'
+    if is_mlb and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=== PROCESSING MLB ROW ===")
+        
+        # For MLB, check if this is a "FINAL" row or "POSTPONED" row
+        row_contains_final = "FINAL" in row_text
+        if row_contains_final:
+            logger.debug("Found FINAL indicator in MLB row")
+        if is_postponed:
+            logger.debug("Found POSTPONED indicator in MLB row")
+            
+        # Log first few cells to help with debugging
+        first_few_cells = row.find_all('td', class_='Table__TD')[:5]
+        for i, cell in enumerate(first_few_cells):
+            logger.debug("MLB Cell %s: %s", i, cell.text.strip())
+    
+    # Find the teams - try the table's detected strategy first, then the full cascade
+    team1 = None
+    team2 = None
+    if strategy and strategy.get('teams'):
+        team1, team2 = TEAM_STRATEGY_STEPS[strategy['teams']](sport, row, team_cells, None, None)
+    if not team1 or not team2:
+        team1, team2 = find_teams(sport, row, team_cells)
+    
     # If we still couldn't find teams, skip this row
     if not team1 or not team2:
-        print(f"Skipping row in {sport} - could not identify teams")
-        print(f"--- SKIPPED PROCESSING: Could not identify teams ---\n")
-        return game_times
+        logger.debug("Skipping row in %s - could not identify teams", sport)
+        logger.debug("--- SKIPPED PROCESSING: Could not identify teams ---")
+        return None
     
     # Clean up team names
     team1 = team1.strip()
     team2 = team2.strip()
     
-    # Print detailed debug info for the Los Angeles teams
+    # Check for the Angels vs Dodgers game ID, logging detailed debug info for the Los Angeles teams
     if 'los angeles' in team1.lower() or 'los angeles' in team2.lower():
-        print(f"DEBUG - Found LA team(s): '{team1}' vs '{team2}'")
-        print(f"  Team1 source: {type(team1)}, length: {len(team1)}")
-        print(f"  Team2 source: {type(team2)}, length: {len(team2)}")
+        logger.debug("DEBUG - Found LA team(s): '%s' vs '%s'", team1, team2)
+        logger.debug("Team1 source: %s, length: %s", type(team1), len(team1))
+        logger.debug("Team2 source: %s, length: %s", type(team2), len(team2))
         
         # Look for evidence of Angels vs Dodgers in the game ID or href
         angels_dodgers_found = False
         for cell in team_cells:
             cell_html = str(cell)
             if 'angels-dodgers' in cell_html:
-                print(f"  Found Angels vs Dodgers in game ID!")
+                logger.debug("Found Angels vs Dodgers in game ID!")
                 team1 = "Los Angeles Angels"
                 team2 = "Los Angeles Dodgers"
                 angels_dodgers_found = True
                 break
         
-        # Print the raw HTML of the cells
-        for i, cell in enumerate(team_cells[:3]):
-            print(f"  Cell {i} HTML: {cell}")
+        # Log the raw HTML of the cells
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, cell in enumerate(team_cells[:3]):
+                logger.debug("Cell %s HTML: %s", i, cell)
         
         # If evidence found, don't continue with regular checks
         if angels_dodgers_found:
-            print(f"Using identified teams: {team1} vs {team2}")
+            logger.debug("Using identified teams: %s vs %s", team1, team2)
 
     # Check if teams are duplicates (like "Los Angeles Angels vs Los Angeles Angels")
     # Special case - if both are "Los Angeles" without specifics, check for more clues
     if team1.lower() == team2.lower():
-        print(f"Skipping duplicate team matchup: {team1} vs {team2}")
-        print(f"--- SKIPPED PROCESSING: Duplicate team names ---\n")
-        return game_times
+        logger.debug("Skipping duplicate team matchup: %s vs %s", team1, team2)
+        logger.debug("--- SKIPPED PROCESSING: Duplicate team names ---")
+        return None
     
     # Get official team names from our dictionary
+    resolve_started = time.perf_counter()
     team1_official = get_official_team_name(sport, team1)
     team2_official = get_official_team_name(sport, team2)
+    observe('ssa_stage_seconds', time.perf_counter() - resolve_started, stage='team_resolution', sport=sport)
     
     # Extra debugging for Chicago teams
     if 'chicago' in team1.lower() or 'chicago' in team2.lower():
-        print(f"DEBUG - Chicago team detection: '{team1}' vs '{team2}'")
-        print(f"  Official names: '{team1_official}' vs '{team2_official}'")
-        if 'team1_code' in locals() and team1_code:
-            print(f"  Team1 code: {team1_code}")
-        if 'team2_code' in locals() and team2_code:
-            print(f"  Team2 code: {team2_code}")
+        logger.debug("DEBUG - Chicago team detection: '%s' vs '%s'", team1, team2)
+        logger.debug("Official names: '%s' vs '%s'", team1_official, team2_official)
     
     # Extract team identifiers from URLs or classes to differentiate same-city teams
     team1_code = None
@@ -271,14 +416,14 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
                         # Check if this is the first or second team's link
                         if link.text.strip().lower() == team1.lower() or team1.lower() in link.text.strip().lower():
                             team1_code = code
-                            print(f"Found code for {team1}: {team1_code}")
+                            logger.debug("Found code for %s: %s", team1, team1_code)
                         elif link.text.strip().lower() == team2.lower() or team2.lower() in link.text.strip().lower():
                             team2_code = code
-                            print(f"Found code for {team2}: {team2_code}")
+                            logger.debug("Found code for %s: %s", team2, team2_code)
     
     # Use team codes (if found) to distinguish between same-city teams
     if team1_official.lower() == team2_official.lower() and team1_code and team2_code and team1_code != team2_code:
-        print(f"Same city teams detected with different codes: {team1_code} vs {team2_code}")
+        logger.debug("Same city teams detected with different codes: %s vs %s", team1_code, team2_code)
         
         # Look for team code mappings in href or row
         team_mapping = {}
@@ -303,11 +448,11 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
         # Update official names if we found mappings
         if team1_code in team_mapping:
             team1_official = team_mapping[team1_code]
-            print(f"Updated {team1} to {team1_official} using code {team1_code}")
+            logger.debug("Updated %s to %s using code %s", team1, team1_official, team1_code)
         
         if team2_code in team_mapping:
             team2_official = team_mapping[team2_code]
-            print(f"Updated {team2} to {team2_official} using code {team2_code}")
+            logger.debug("Updated %s to %s using code %s", team2, team2_official, team2_code)
     
     # If team names are still the same, try to differentiate by looking at team codes
     if team1_official.lower() == team2_official.lower() and team1_code and team2_code and team1_code != team2_code:
@@ -327,11 +472,11 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
             
             if team1_code in suffixes:
                 team1_official = f"{city_part} {suffixes[team1_code]}"
-                print(f"Generated name for {team1}: {team1_official}")
+                logger.debug("Generated name for %s: %s", team1, team1_official)
             
             if team2_code in suffixes:
                 team2_official = f"{city_part} {suffixes[team2_code]}"
-                print(f"Generated name for {team2}: {team2_official}")
+                logger.debug("Generated name for %s: %s", team2, team2_official)
                 
         elif sport_lowercase == 'nhl':
             # NHL codes like nyr/nyi for Rangers/Islanders
@@ -360,9 +505,9 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
     
     # Check again after trying to differentiate
     if team1_official.lower() == team2_official.lower():
-        print(f"Skipping duplicate team matchup (after differentiation): {team1_official} vs {team2_official}")
-        print(f"--- SKIPPED PROCESSING: Duplicate official team names ---\n")
-        return game_times
+        logger.debug("Skipping duplicate team matchup (after differentiation): %s vs %s", team1_official, team2_official)
+        logger.debug("--- SKIPPED PROCESSING: Duplicate official team names ---")
+        return None
     
     # Create team keys based on full team name plus code if available
     team1_key = team1_official.lower()
@@ -373,23 +518,12 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
     if team2_code:
         team2_key += f"_{team2_code}"
     
-    # Create a matchup key for detecting exact duplicate games
-    matchup_key = f"{team1_key}_{team2_key}"
-    matchup_key_reverse = f"{team2_key}_{team1_key}"
-    
     # Check for game ID clues in case of same-city teams - using generic check
     same_city_teams = False
     if team1_code and team2_code and team1_code != team2_code:
-        print(f"Different team codes detected: {team1_code} vs {team2_code} - treating as different teams")
+        logger.debug("Different team codes detected: %s vs %s - treating as different teams", team1_code, team2_code)
         same_city_teams = True
     
-    # Only skip if this exact matchup has already been processed
-    # Skip duplicate detection if we've identified this as a same-city matchup
-    if not same_city_teams and (matchup_key in processed_game_ids or matchup_key_reverse in processed_game_ids):
-        print(f"Skipping duplicate game: {team1_official} vs {team2_official} - already processed")
-        print(f"--- SKIPPED PROCESSING: Duplicate matchup already processed ---\n")
-        return game_times
-    
     # Initialize result data
     game_result = None
     winner = None
@@ -402,39 +536,28 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
     if is_postponed:
         game_status = "completed"
         game_result = "Postponed"
-        print(f"Setting game status to COMPLETED (POSTPONED): {team1_official} vs {team2_official}")
+        logger.debug("Setting game status to COMPLETED (POSTPONED): %s vs %s", team1_official, team2_official)
     
     # Check for result cells if not already marked as postponed
     if not is_postponed:
-        result_cells = row.find_all('td', class_='Table__TD', attrs={'data-header': 'RESULT'})
-        if not result_cells:
-            # Try direct column name matching as well
-            result_cells = row.find_all('td', string=lambda x: x and 'RESULT' in x)
-            
-            # Check for cells with "RESULT" in header
-            if not result_cells:
-                for cell in team_cells:
-                    if cell.get('data-header') == 'RESULT':
-                        result_cells = [cell]
-                        break
-            
+        result_cells = _find_result_cells(row, team_cells, strategy)
         if result_cells:
             result_cell = result_cells[0]
             result_text = result_cell.text.strip()
-            print(f"Found result cell with text: '{result_text}'")
+            logger.debug("Found result cell with text: '%s'", result_text)
             
             # Check for common result formats including postponed
             if result_text.upper() in ["POSTPONED", "PPD"]:
                 game_status = "completed"
                 game_result = "Postponed"
-                print(f"Found POSTPONED game from result cell: {team1_official} vs {team2_official}")
+                logger.debug("Found POSTPONED game from result cell: %s vs %s", team1_official, team2_official)
             else:
                 game_status = "completed"
                 game_result = result_text
             
             if is_mlb:
-                print(f"  MLB GAME COMPLETED: Found result cell for {team1_official} vs {team2_official}")
-                print(f"  Result: {result_text}")
+                logger.debug("MLB GAME COMPLETED: Found result cell for %s vs %s", team1_official, team2_official)
+                logger.debug("Result: %s", result_text)
                 
                 # For MLB, also try to parse the score from the result text if not postponed
                 if result_text.upper() not in ["POSTPONED", "PPD"]:
@@ -442,25 +565,11 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
                     if score_match:
                         score1, score2 = score_match.group(1), score_match.group(2)
                         game_result = f"{score1}-{score2}"
-                        print(f"  Parsed MLB score from result text: {game_result}")
+                        logger.debug("Parsed MLB score from result text: %s", game_result)
         
     # Get game time - look for time in different possible cells
-    time_cell = None
-    time_text = None
-    
-    print(f"\n--- PROCESSING GAME: {team1} vs {team2} ---")
-    
-    # Look for game time in different cells - varies by sport
-    for cell in team_cells:
-        cell_text = cell.text.strip()
-        cell_class = cell.get('class', [])
-        
-        # Check for date_col class which often contains time
-        if 'date__col' in cell_class or ':' in cell_text or 'LIVE' in cell_text or 'PM' in cell_text or 'AM' in cell_text:
-            time_cell = cell
-            time_text = cell_text
-            print(f"Found time cell with text: '{time_text}' (class: {cell_class})")
-            break
+    logger.debug("--- PROCESSING GAME: %s vs %s ---", team1, team2)
+    time_text = _find_time_cell_text(team_cells, strategy)
     
     # If no time cell was found, look for gameStatus cells specifically
     if not time_text:
@@ -484,41 +593,42 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
     # If we still don't have a time, check for game status in the entire row
     if not time_text:
         row_text = row.text.strip().upper()
-        print(f"Checking row text for live indicators: '{row_text}'")
+        logger.debug("Checking row text for live indicators: '%s'", row_text)
         if any(status in row_text for status in ['LIVE', 'IN PROGRESS', 'ONGOING']):
             time_text = 'LIVE'
-            print(f"Found LIVE status in row text")
+            logger.debug("Found LIVE status in row text")
         else:
-            print(f"Skipping {team1} vs {team2} - no time found")
-            print(f"--- SKIPPED PROCESSING: No time information ---\n")
-            return game_times
+            logger.debug("Skipping %s vs %s - no time found", team1, team2)
+            logger.debug("--- SKIPPED PROCESSING: No time information ---")
+            return None
     
     # Skip games with TBD status, but keep Postponed games
     if time_text and any(status in time_text for status in ['TBD']):
-        print(f"Skipping {team1} vs {team2} - time is {time_text}")
-        print(f"--- SKIPPED PROCESSING: Game status is {time_text} ---\n")
-        return game_times
+        logger.debug("Skipping %s vs %s - time is %s", team1, team2, time_text)
+        logger.debug("--- SKIPPED PROCESSING: Game status is %s ---", time_text)
+        return None
     
     # Don't skip Postponed games - they should be treated as completed with a special result
     if time_text and any(status in time_text for status in ['Postponed', 'PPD']):
         game_status = "completed"
         game_result = "Postponed"
-        print(f"Found POSTPONED game from time text: {team1_official} vs {team2_official}")
+        logger.debug("Found POSTPONED game from time text: %s vs %s", team1_official, team2_official)
     
     # Check if game is final, in progress, or scheduled
     if "LIVE" in time_text.upper() or "IN PROGRESS" in time_text.upper():
         game_status = "live"
-        print(f"Setting game status to LIVE: {team1} vs {team2}")
+        logger.debug("Setting game status to LIVE: %s vs %s", team1, team2)
         
-        # Also ensure any content with the word "LIVE" is captured
-        for cell in team_cells:
-            cell_content = cell.text.strip().upper()
-            if "LIVE" in cell_content:
-                print(f"Found additional LIVE indicator in cell text: {cell_content}")
+        # Also log any other cells with the word "LIVE"
+        if logger.isEnabledFor(logging.DEBUG):
+            for cell in team_cells:
+                cell_content = cell.text.strip().upper()
+                if "LIVE" in cell_content:
+                    logger.debug("Found additional LIVE indicator in cell text: %s", cell_content)
     elif "FINAL" in time_text.upper() or "F/" in time_text.upper():
         # Process games that are already finished
         game_status = "completed"
-        print(f"Setting game status to COMPLETED: {team1} vs {team2}")
+        logger.debug("Setting game status to COMPLETED: %s vs %s", team1, team2)
         
         # Extract result if available
         result_text = "Final"
@@ -526,7 +636,7 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
         score_match = re.search(r'F\s+(\d+)[^\d]+(\d+)', time_text)
         if score_match:
             result_text = f"{score_match.group(1)}-{score_match.group(2)}"
-            print(f"Extracted score from time: {result_text}")
+            logger.debug("Extracted score from time: %s", result_text)
         
         # If we don't have a score yet, check all cells for score patterns
         if result_text == "Final":
@@ -536,13 +646,13 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
                 score_match = re.search(r'(?:^|\s)(\d+)[-\s]+(\d+)(?:\s|$)', cell_text)
                 if score_match:
                     result_text = f"{score_match.group(1)}-{score_match.group(2)}"
-                    print(f"Found score in cell: {result_text} from '{cell_text}'")
+                    logger.debug("Found score in cell: %s from '%s'", result_text, cell_text)
                     break
         
         # If we already have a game_result from result column, use that instead
         if game_result:
             result_text = game_result
-            print(f"Using result from column: {result_text}")
+            logger.debug("Using result from column: %s", result_text)
         else:
             game_result = result_text
         
@@ -555,13 +665,13 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
                 win_match = re.search(r'(?:WIN|W):\s*([^,;]+)', cell_text, re.IGNORECASE)
                 if win_match and not winner:
                     winner = win_match.group(1).strip()
-                    print(f"Extracted winner: {winner}")
+                    logger.debug("Extracted winner: %s", winner)
                 
                 # Look for LOSS: Player patterns
                 loss_match = re.search(r'(?:LOSS|L):\s*([^,;]+)', cell_text, re.IGNORECASE)
                 if loss_match and not loser:
                     loser = loss_match.group(1).strip()
-                    print(f"Extracted loser: {loser}")
+                    logger.debug("Extracted loser: %s", loser)
     
     # Also check status columns for FINAL indicators if game is not already marked as completed
     if game_status != "completed" and game_status != "live":
@@ -569,18 +679,18 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
             cell_content = cell.text.strip().upper()
             # Look for FINAL, F, F/OT (Final in Overtime)
             if re.search(r'\b(FINAL|F(/\w+)?)\b', cell_content):
-                print(f"Found FINAL indicator in cell: {cell_content}")
+                logger.debug("Found FINAL indicator in cell: %s", cell_content)
                 game_status = "completed"
                 game_result = "Final"
                 
                 if is_mlb:
-                    print(f"  MLB GAME COMPLETED: Found FINAL indicator for {team1_official} vs {team2_official}")
+                    logger.debug("MLB GAME COMPLETED: Found FINAL indicator for %s vs %s", team1_official, team2_official)
                 
                 # Try to extract score from this cell or surrounding cells
                 score_match = re.search(r'(\d+)[-\s]+(\d+)', cell_content)
                 if score_match:
                     game_result = f"{score_match.group(1)}-{score_match.group(2)}"
-                    print(f"Extracted score from final cell: {game_result}")
+                    logger.debug("Extracted score from final cell: %s", game_result)
                 break
     
     # Add special MLB-specific checks for completed games
@@ -593,7 +703,7 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
             # Check for specific MLB completion indicators
             if any(indicator in cell_text for indicator in ['FINAL', 'F/', 'GAME OVER', 'COMPLETE']) or \
                any(indicator in cell_content for indicator in ['FINAL', 'F/', 'GAME OVER', 'COMPLETE']):
-                print(f"  MLB SPECIFIC: Found completion indicator in cell: {cell_text}")
+                logger.debug("MLB SPECIFIC: Found completion indicator in cell: %s", cell_text)
                 game_status = "completed"
                 game_result = "Final"
                 break
@@ -603,20 +713,20 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
         row_text = row.text.strip().upper()
         if "FINAL" in row_text and game_status != "completed":
             game_status = "completed"
-            print(f"  Forcing MLB game to COMPLETED status due to FINAL indicator")
+            logger.debug("Forcing MLB game to COMPLETED status due to FINAL indicator")
             
             # Look for a score pattern in the row text (common for MLB)
             score_pattern = re.search(r'(\d+)\s*[-]\s*(\d+)', row_text)
             if score_pattern:
                 score1, score2 = score_pattern.group(1), score_pattern.group(2)
                 game_result = f"{score1}-{score2}"
-                print(f"  Extracted MLB score from row: {game_result}")
+                logger.debug("Extracted MLB score from row: %s", game_result)
                 
         # Additional check for the "FINAL" indicator in any cell
         for cell in team_cells:
             if "FINAL" in cell.text.strip().upper():
                 game_status = "completed"
-                print(f"  Found MLB FINAL indicator in a cell")
+                logger.debug("Found MLB FINAL indicator in a cell")
     
     # Also check for RESULT column with postponed games
     if game_status != "completed":
@@ -626,9 +736,51 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
                 if "POSTPONED" in cell_content or "PPD" in cell_content:
                     game_status = "completed"
                     game_result = "Postponed"
-                    print(f"Found POSTPONED in RESULT column: {cell_content}")
+                    logger.debug("Found POSTPONED in RESULT column: %s", cell_content)
                     break
     
+    # Only regular time formats can be scheduled as upcoming games
+    if game_status == "upcoming" and not (time_text and ":" in time_text and ("ET" in time_text or "PM" in time_text or "AM" in time_text)):
+        logger.debug("Skipping %s vs %s - time format not recognized: %s", team1, team2, time_text)
+        logger.debug("--- SKIPPED PROCESSING: Unrecognized time format ---")
+        return None
+    
+    return {
+        'team1': team1,
+        'team2': team2,
+        'team1_official': team1_official,
+        'team2_official': team2_official,
+        'team1_key': team1_key,
+        'team2_key': team2_key,
+        'same_city_teams': same_city_teams,
+        'status': game_status,
+        'result': game_result,
+        'winner': winner,
+        'loser': loser,
+        'time_text': time_text
+    }
+
+def emit_game_row(sport, game, game_id, row_position, table_idx, section_date, teams_with_games_today, processed_game_ids, game_times):
+    """Add an extracted game row to game_times unless it duplicates a matchup already processed."""
+    if game is None:
+        return game_times
+    
+    team1, team2 = game['team1'], game['team2']
+    team1_official, team2_official = game['team1_official'], game['team2_official']
+    team1_key, team2_key = game['team1_key'], game['team2_key']
+    game_status = game['status']
+    
+    # Create a matchup key for detecting exact duplicate games
+    matchup_key = f"{team1_key}_{team2_key}"
+    matchup_key_reverse = f"{team2_key}_{team1_key}"
+    
+    # Only skip if this exact matchup has already been processed
+    # Skip duplicate detection if we've identified this as a same-city matchup
+    if not game['same_city_teams'] and (matchup_key in processed_game_ids or matchup_key_reverse in processed_game_ids):
+        logger.debug("Skipping duplicate game: %s vs %s - already processed", team1_official, team2_official)
+        logger.debug("--- SKIPPED PROCESSING: Duplicate matchup already processed ---")
+        return game_times
+    
     # Process based on game status
     if game_status == "live":
         # Game is live, add to game_times
@@ -640,26 +792,22 @@ def process_game_row(sport, row, team_cells, game_id, row_position, table_idx, s
         )
     elif game_status == "completed":
         # Game is completed, add to game_times
-        if is_mlb:
-            print(f"  SENDING MLB GAME TO COMPLETED PROCESSOR: {team1_official} vs {team2_official}")
-            print(f"  Result: {game_result}")
+        if sport == 'MLB':
+            logger.debug("SENDING MLB GAME TO COMPLETED PROCESSOR: %s vs %s", team1_official, team2_official)
+            logger.debug("Result: %s", game['result'])
             
         return process_completed_game(
             sport, team1, team2, team1_official, team2_official,
             game_id, row_position, table_idx, section_date,
             team1_key, team2_key, teams_with_games_today, processed_game_ids,
-            game_result, winner, loser,
+            game['result'], game['winner'], game['loser'],
             game_times
         )
-    elif time_text and ":" in time_text and ("ET" in time_text or "PM" in time_text or "AM" in time_text):
+    else:
         # Regular time format, add to game_times
         return process_upcoming_game(
             sport, team1, team2, team1_official, team2_official,
             game_id, row_position, table_idx, section_date,
             team1_key, team2_key, teams_with_games_today, processed_game_ids,
-            time_text, game_times
+            game['time_text'], game_times
         )
-    else:
-        print(f"Skipping {team1} vs {team2} - time format not recognized: {time_text}")
-        print(f"--- SKIPPED PROCESSING: Unrecognized time format ---\n")
-        return game_times 
\ No newline at end of file
@@ -0,0 +1,42 @@
+from .game_processors.game_index import add_game_to_index
+
+# Key suffix each processor appends to its game_times keys, by game status
+STATUS_KEY_SUFFIXES = {
+    'live': '_LIVE',
+    'completed': '_COMPLETED',
+    'upcoming': ''
+}
+
+def compact_game_times(game_times):
+    """Reduce game_times to one record per game plus metadata, dropping the duplicated keys and team_games copies."""
+    games = []
+    seen_game_ids = set()
+
+    for key, value in game_times.items():
+        if key in ('_meta', 'team_games') or not isinstance(value, dict):
+            continue
+
+        # Each game is stored under two matchup keys - keep it once
+        game_id = value.get('game_id')
+        if game_id in seen_game_ids:
+            continue
+        seen_game_ids.add(game_id)
+        games.append(value)
+
+    return {
+        'games': games,
+        'meta': game_times.get('_meta')
+    }
+
+def expand_game_times(compact):
+    """Rebuild the full game_times structure (matchup keys and team_games index) from compact records."""
+    game_times = {}
+
+    for time_info in compact.get('games', []):
+        key_suffix = STATUS_KEY_SUFFIXES.get(time_info.get('status'), '')
+        add_game_to_index(game_times, time_info, key_suffix=key_suffix)
+
+    if compact.get('meta') is not None:
+        game_times['_meta'] = compact['meta']
+
+    return game_times
@@ -1,286 +1,411 @@
-import requests
+import logging
 from bs4 import BeautifulSoup
 import re
+import time
 from datetime import datetime, timezone, timedelta
 import pytz
 from ..utils.team_utils import get_official_team_name, get_all_teams_for_sport
-from .game_processors import process_game_row
+from .game_processors import extract_game_row, emit_game_row, detect_table_strategy
+from .. import config
+from .section_cache import line_offsets, fingerprint, get_cached_rows, store_rows
+from ..utils.logging_utils import sample_row
+from ..utils.metrics import inc, observe, timed
+from ..utils.memory import tracked, stage_started, stage_finished, release_soup
+from ..utils.profiling import is_capturing, record_upstream_page
+from ..utils.priority import parse_gate
+from .parse_pool import parse_schedule_in_pool
+from .fetch import fetch_page, decode_page
+
+logger = logging.getLogger(__name__)
+
+# Map sport to ESPN URL
+ESPN_SCHEDULE_URLS = {
+    'NBA': f"{config.ESPN_BASE_URL}/nba/schedule",
+    'NFL': f"{config.ESPN_BASE_URL}/nfl/schedule",
+    'MLB': f"{config.ESPN_BASE_URL}/mlb/schedule",
+    'NHL': f"{config.ESPN_BASE_URL}/nhl/schedule"
+}
+
+# ESPN renders the schedule tables first, then ships the app state as ~450 KB of inline JSON
+# starting with this script - nothing after it is used, so downloads stop here
+ESPN_SCHEDULE_END_MARKER = b"window['__CONFIG__']"
 
 def get_game_times(sport):
     """Fetches game times from ESPN's schedule for specified sport."""
     try:
-        # Map sport to ESPN URL
-        sport_urls = {
-            'NBA': 'https://www.espn.com/nba/schedule',
-            'NFL': 'https://www.espn.com/nfl/schedule',
-            'MLB': 'https://www.espn.com/mlb/schedule',
-            'NHL': 'https://www.espn.com/nhl/schedule'
-        }
-        
-        if sport not in sport_urls:
-            print(f"Unsupported sport: {sport}")
+        if sport not in ESPN_SCHEDULE_URLS:
+            logger.warning("Unsupported sport: %s", sport)
             return {}
             
-        url = sport_urls[sport]
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        url = ESPN_SCHEDULE_URLS[sport]
+        logger.info("Fetching schedule from %s", url)
+        try:
+            with timed('ssa_stage_seconds', stage='download', sport=sport), tracked('download', sport):
+                content, encoding = fetch_page(
+                    url, max_bytes=config.ESPN_MAX_BYTES,
+                    stop_marker=ESPN_SCHEDULE_END_MARKER if config.ESPN_EARLY_STOP else None
+                )
+        except Exception:
+            inc('ssa_schedule_fetches_total', sport=sport, result='error')
+            raise
+        inc('ssa_schedule_fetches_total', sport=sport, result='ok')
+        # Background refreshes parse one page at a time, so they don't crowd out request threads
+        with parse_gate.slot():
+            if config.PROCESS_POOL and not is_capturing():
+                # Parse in a worker process, sending it the raw bytes rather than decoded text
+                return parse_schedule_in_pool(sport, content, encoding)
+            html = decode_page(content, encoding)
+            record_upstream_page(url, html, sport)
+            return parse_game_times(sport, html)
+    except Exception as e:
+        logger.warning("Error fetching %s schedule: %s", sport, e)
+        return {}
+
+def _lazy_table_strategy(sport, rows, get_cells):
+    """Return a function that detects a table's extraction strategy from its first rows on first use."""
+    detected = []
+    
+    def get_strategy():
+        if not config.TABLE_STRATEGIES:
+            return None
+        if not detected:
+            probes = [(row, get_cells(row)) for row in rows[:config.STRATEGY_PROBE_ROWS]]
+            detected.append(detect_table_strategy(sport, probes))
+        return detected[0]
+    
+    return get_strategy
+
+def _extract_row(sport, kind, row, html, offsets, get_cells, get_strategy, min_cells=2):
+    """Extract one row, reusing the record from an earlier refresh if the row's HTML and table strategy are unchanged."""
+    # A record depends on how its table is read as well as on the row itself
+    strategy = get_strategy()
+    strategy_key = tuple(sorted(strategy.items())) if strategy else None
+    row_key = (sport, kind, strategy_key, fingerprint(row, html, offsets))
+    cached = get_cached_rows(row_key)
+    if cached is not None:
+        inc('ssa_section_cache_total', sport=sport, kind=kind, result='hit')
+        return cached[0]
+    inc('ssa_section_cache_total', sport=sport, kind=kind, result='miss')
+    
+    sample_row()
+    try:
+        cells = get_cells(row)
+        game = extract_game_row(sport, row, cells, strategy) if len(cells) >= min_cells else None
+    except Exception as e:
+        logger.warning("Error parsing game row: %s", e)
+        logger.debug("--- SKIPPED PROCESSING: General processing error ---")
+        game = None
+    
+    store_rows(row_key, [game])
+    return game
+
+def _schedule_row_cells(row):
+    """Get the cells of a schedule row."""
+    team_cells = row.find_all('td', class_='Table__TD')
+    
+    # If no cells with that class, try any td
+    if len(team_cells) < 2:
+        team_cells = row.find_all('td')
+        logger.debug("Found %s regular td elements", len(team_cells))
+    return team_cells
+
+def _results_row_cells(row):
+    """Get the cells of a row in an MLB results table."""
+    # Check if this is likely a POSTPONED game
+    if "POSTPONED" in row.text.strip().upper():
+        logger.debug("Processing likely POSTPONED game in results section")
+    return row.find_all('td')
+
+def _extract_schedule_table(sport, table, html, offsets):
+    """Extract a record (or None for skipped rows) for every game row in a schedule table."""
+    # Get all game rows
+    game_rows = table.find_all('tr', class_=lambda x: x and 'Table__TR' in x)
+    
+    # If no rows found with that class, try any tr
+    if not game_rows:
+        game_rows = table.find_all('tr')
+        logger.debug("No rows with Table__TR class, found %s regular tr elements", len(game_rows))
+    
+    # Skip header rows
+    game_rows = [row for row in game_rows if not row.find('th')]
+    
+    # All rows of a table share one layout - work out how to read it once, from the first rows
+    get_strategy = _lazy_table_strategy(sport, game_rows, _schedule_row_cells)
+    
+    return [
+        _extract_row(sport, 'schedule_row', row, html, offsets, _schedule_row_cells, get_strategy)
+        for row in game_rows
+    ]
+
+def _extract_results_table(sport, table, html, offsets):
+    """Extract a record (or None for skipped rows) for every row of an MLB MATCHUP/RESULT table."""
+    # Get all rows from the table, skipping the header row
+    rows = table.find_all('tr')[1:]
+    get_strategy = _lazy_table_strategy(sport, rows, lambda row: row.find_all('td'))
+    return [
+        _extract_row(sport, 'results_row', row, html, offsets, _results_row_cells, get_strategy, min_cells=0)
+        for row in rows
+    ]
+
+def _table_records(sport, kind, table, html, offsets, extract_table):
+    """Get the row records for a table, reusing the whole section when its HTML is unchanged."""
+    section_key = (sport, kind, fingerprint(table, html, offsets))
+    records = get_cached_rows(section_key)
+    if records is not None:
+        inc('ssa_section_cache_total', sport=sport, kind=kind, result='hit')
+        return records, True
+    inc('ssa_section_cache_total', sport=sport, kind=kind, result='miss')
+    
+    records = extract_table(sport, table, html, offsets)
+    store_rows(section_key, records)
+    return records, False
+
+def parse_game_times(sport, html):
+    """Parses an ESPN schedule page into game times for the specified sport."""
+    with timed('ssa_stage_seconds', stage='parse', sport=sport), tracked('parse', sport):
+        soup = BeautifulSoup(html, 'html.parser')
+        offsets = line_offsets(html)
+    
+    # Everything after building the tree counts as row processing
+    rows_started = time.perf_counter()
+    rows_memory = stage_started()
+    
+    # If MLB, log the page's result sections - a full scan of the page, so only when debugging
+    if sport == 'MLB' and logger.isEnabledFor(logging.DEBUG):
+        # Check if the page has a RESULT section which indicates completed games
+        result_sections = soup.find_all('div', string=lambda s: s and 'RESULT' in s)
+        if result_sections:
+            logger.debug("Found RESULT sections: %s", len(result_sections))
+        
+        # Look for MATCHUP/RESULT headers
+        matchup_headers = soup.find_all(['th', 'div'], string=lambda s: s and 'MATCHUP' in s)
+        result_headers = soup.find_all(['th', 'div'], string=lambda s: s and 'RESULT' in s)
+        logger.debug("Found MATCHUP headers: %s", len(matchup_headers))
+        logger.debug("Found RESULT headers: %s", len(result_headers))
         
-        print(f"Fetching schedule from {url}")
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Check for table structure at a high level
+        tables = soup.find_all('table')
+        logger.debug("Found %s tables", len(tables))
         
-        # If MLB, look for specific data sections including the "RESULT" column
-        if sport == 'MLB':
-            # Check if the page has a RESULT section which indicates completed games
-            result_sections = soup.find_all('div', string=lambda s: s and 'RESULT' in s)
-            if result_sections:
-                print(f"Found RESULT sections: {len(result_sections)}")
+        # Examine each table to see if it might contain results
+        for i, table in enumerate(tables):
+            headers = table.find_all('th')
+            header_texts = [h.text.strip() for h in headers]
+            logger.debug("Table %s headers: %s", i, header_texts)
             
-            # Look for MATCHUP/RESULT headers
-            matchup_headers = soup.find_all(['th', 'div'], string=lambda s: s and 'MATCHUP' in s)
-            result_headers = soup.find_all(['th', 'div'], string=lambda s: s and 'RESULT' in s)
-            print(f"Found MATCHUP headers: {len(matchup_headers)}")
-            print(f"Found RESULT headers: {len(result_headers)}")
+            # Check each row for POSTPONED games
+            rows = table.find_all('tr')
+            for row in rows:
+                row_text = row.text.strip().upper()
+                if "POSTPONED" in row_text:
+                    logger.debug("Found POSTPONED in row: %s...", row_text[:50])
+    
+    game_times = {}
+    
+    # Track which teams are already scheduled to prevent duplicates
+    teams_with_games_today = set()
+    
+    # Track unique game IDs to prevent duplicates across sections
+    processed_game_ids = set()
+    
+    # Get today's date
+    today_date = datetime.now().strftime('%Y-%m-%d')
+    today = datetime.now().date()
+    logger.debug("Current date: %s", today_date)
+    
+    # Find all date headers - can be either h2 or div with class Table__Title
+    date_headers = soup.find_all(['h2', 'div'], class_='Table__Title')
+    logger.debug("Found %s date headers:", len(date_headers))
+    
+    # Maps to store date headers and their associated table elements
+    date_to_tables = {}
+    
+    # First pass: find all date headers and associated tables
+    for header in date_headers:
+        date_text = header.text.strip()
+        try:
+            # ESPN date format is like: "Sunday, May 19, 2024"
+            parsed_date = datetime.strptime(date_text, '%A, %B %d, %Y')
+            logger.debug("Found date header: %s - %s", parsed_date.strftime('%Y-%m-%d'), date_text)
             
-            # Check for table structure at a high level
-            tables = soup.find_all('table')
-            print(f"Found {len(tables)} tables")
+            # Find the parent ScheduleTables container
+            schedule_table = header.find_parent(class_=lambda c: c and 'ScheduleTables' in c)
             
-            # Examine each table to see if it might contain results
-            for i, table in enumerate(tables):
-                headers = table.find_all('th')
-                header_texts = [h.text.strip() for h in headers]
-                print(f"Table {i} headers: {header_texts}")
-                
-                # Check each row for POSTPONED games
-                rows = table.find_all('tr')
-                for row in rows:
-                    row_text = row.text.strip().upper()
-                    if "POSTPONED" in row_text:
-                        print(f"Found POSTPONED in row: {row_text[:50]}...")
-        
-        game_times = {}
-        
-        # Track which teams are already scheduled to prevent duplicates
-        teams_with_games_today = set()
-        
-        # Track unique game IDs to prevent duplicates across sections
-        processed_game_ids = set()
+            # If no direct parent found, look for the next sibling that contains the table
+            if not schedule_table:
+                schedule_table = header.find_next_sibling()
+            
+            # Find the ResponsiveTable in this section
+            responsive_table = None
+            if schedule_table:
+                responsive_table = schedule_table.find('div', class_='ResponsiveTable')
+            
+            # If no table found yet, try another approach - find the next ResponsiveTable
+            if not responsive_table:
+                responsive_table = header.find_next('div', class_='ResponsiveTable')
+            
+            if responsive_table:
+                if parsed_date not in date_to_tables:
+                    date_to_tables[parsed_date] = []
+                date_to_tables[parsed_date].append(responsive_table)
+                logger.debug("Added table to date %s", parsed_date.strftime('%Y-%m-%d'))
+        except ValueError:
+            logger.debug("Invalid date format: %s", date_text)
+    
+    # Debug: Log all dates and their table counts
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Dates found with tables:")
+        for date, tables in date_to_tables.items():
+            logger.debug("Date: %s - Tables: %s", date.strftime('%Y-%m-%d'), len(tables))
+            logger.debug("Is today: %s", date.date() == today)
+    
+    # If no date headers found or no tables for any date, fall back to all tables
+    if not date_to_tables:
+        logger.debug("No date sections found, using all tables as fallback with today's date")
+        all_tables = soup.find_all('div', class_='ResponsiveTable')
+        fallback_date = datetime.now()
+        date_to_tables[fallback_date] = all_tables
         
-        # Get today's date
-        today_date = datetime.now().strftime('%Y-%m-%d')
-        today = datetime.now().date()
-        print(f"Current date: {today_date}")
+        # Also try to find any tables with result columns
+        result_tables = []
+        tables = soup.find_all('table')
+        for table in tables:
+            headers = table.find_all('th')
+            for header in headers:
+                if header.text.strip().upper() == "RESULT":
+                    result_tables.append(table)
+                    logger.debug("Found a table with RESULT header")
+                    break
         
-        # Find all date headers - can be either h2 or div with class Table__Title
-        date_headers = soup.find_all(['h2', 'div'], class_='Table__Title')
-        print(f"Found {len(date_headers)} date headers:")
+        if result_tables:
+            fallback_date_result = datetime.now()
+            date_to_tables[fallback_date_result] = result_tables
+    
+    # Track games processed
+    processed_games = 0
+    skipped_rows = 0
+    game_id = 0
+    reused_sections = 0
+    
+    # Get date range: look at recent dates for completed games and upcoming dates for future games
+    # We'll look at dates from 7 days ago to 2 days in the future
+    date_range_start = today - timedelta(days=7)
+    date_range_end = today + timedelta(days=2)
+    
+    # Additional MLB-specific section to look for completed games with postponed results
+    if sport == 'MLB':
+        # Look for the "MATCHUP" and "RESULT" sections which usually contain completed games
+        matchup_result_sections = []
         
-        # Maps to store date headers and their associated table elements
-        date_to_tables = {}
+        # Try to find tables with both MATCHUP and RESULT headers
+        for table in soup.find_all('table'):
+            headers = [h.text.strip().upper() for h in table.find_all('th')]
+            if 'MATCHUP' in headers and 'RESULT' in headers:
+                matchup_result_sections.append(table)
+                logger.debug("Found table with MATCHUP and RESULT headers: %s", headers)
         
-        # First pass: find all date headers and associated tables
-        for header in date_headers:
-            date_text = header.text.strip()
-            try:
-                # ESPN date format is like: "Sunday, May 19, 2024"
-                parsed_date = datetime.strptime(date_text, '%A, %B %d, %Y')
-                print(f"Found date header: {parsed_date.strftime('%Y-%m-%d')} - {date_text}")
-                
-                # Find the parent ScheduleTables container
-                schedule_table = header.find_parent(class_=lambda c: c and 'ScheduleTables' in c)
-                
-                # If no direct parent found, look for the next sibling that contains the table
-                if not schedule_table:
-                    schedule_table = header.find_next_sibling()
-                
-                # Find the ResponsiveTable in this section
-                responsive_table = None
-                if schedule_table:
-                    responsive_table = schedule_table.find('div', class_='ResponsiveTable')
-                
-                # If no table found yet, try another approach - find the next ResponsiveTable
-                if not responsive_table:
-                    responsive_table = header.find_next('div', class_='ResponsiveTable')
+        # Process each table with result information
+        for table_idx, table in enumerate(matchup_result_sections):
+            records, reused = _table_records(sport, 'results_table', table, html, offsets, _extract_results_table)
+            if reused:
+                reused_sections += 1
+            
+            for row_idx, game in enumerate(records, start=1):
+                processed_games += 1
+                game_id += 1
+                if game is None:
+                    skipped_rows += 1
                 
-                if responsive_table:
-                    if parsed_date not in date_to_tables:
-                        date_to_tables[parsed_date] = []
-                    date_to_tables[parsed_date].append(responsive_table)
-                    print(f"Added table to date {parsed_date.strftime('%Y-%m-%d')}")
-            except ValueError:
-                print(f"Invalid date format: {date_text}")
-        
-        # Debug: Print all dates and their table counts
-        print(f"Dates found with tables:")
-        for date, tables in date_to_tables.items():
-            print(f"  Date: {date.strftime('%Y-%m-%d')} - Tables: {len(tables)}")
-            print(f"  Is today: {date.date() == today}")
+                sample_row()
+                try:
+                    # Add this game to game_times if valid
+                    game_times = emit_game_row(
+                        sport,
+                        game,
+                        game_id, 
+                        row_idx, 
+                        table_idx,
+                        today,  # Use today as the section date for result sections
+                        teams_with_games_today,
+                        processed_game_ids,
+                        game_times
+                    )
+                except Exception as e:
+                    logger.warning("Error parsing game row in results section: %s", e)
+                    continue
+    
+    # Process each date and its tables
+    for section_date, tables in date_to_tables.items():
+        section_date_obj = section_date.date()
+        section_is_today = section_date_obj == today
         
-        # If no date headers found or no tables for any date, fall back to all tables
-        if not date_to_tables:
-            print("No date sections found, using all tables as fallback with today's date")
-            all_tables = soup.find_all('div', class_='ResponsiveTable')
-            fallback_date = datetime.now()
-            date_to_tables[fallback_date] = all_tables
-            
-            # Also try to find any tables with result columns
-            result_tables = []
-            tables = soup.find_all('table')
-            for table in tables:
-                headers = table.find_all('th')
-                for header in headers:
-                    if header.text.strip().upper() == "RESULT":
-                        result_tables.append(table)
-                        print(f"Found a table with RESULT header")
-                        break
-            
-            if result_tables:
-                fallback_date_result = datetime.now()
-                date_to_tables[fallback_date_result] = result_tables
+        # Check if this date is within our processing range
+        date_in_range = date_range_start <= section_date_obj <= date_range_end
         
-        # Track games processed
-        processed_games = 0
-        game_id = 0
+        logger.debug("Processing section for date: %s (is_today: %s, in_range: %s)", section_date.strftime('%Y-%m-%d'), section_is_today, date_in_range)
         
-        # Get date range: look at recent dates for completed games and upcoming dates for future games
-        # We'll look at dates from 7 days ago to 2 days in the future
-        date_range_start = today - timedelta(days=7)
-        date_range_end = today + timedelta(days=2)
+        # Only process games for dates within our range
+        if not date_in_range:
+            logger.debug("Skipping section for %s as it's outside our date range", section_date.strftime('%Y-%m-%d'))
+            continue
         
-        # Additional MLB-specific section to look for completed games with postponed results
-        if sport == 'MLB':
-            # Look for the "MATCHUP" and "RESULT" sections which usually contain completed games
-            matchup_result_sections = []
-            
-            # Try to find tables with both MATCHUP and RESULT headers
-            for table in soup.find_all('table'):
-                headers = [h.text.strip().upper() for h in table.find_all('th')]
-                if 'MATCHUP' in headers and 'RESULT' in headers:
-                    matchup_result_sections.append(table)
-                    print(f"Found table with MATCHUP and RESULT headers: {headers}")
-            
-            # Process each table with result information
-            for table_idx, table in enumerate(matchup_result_sections):
-                # Get all rows from the table
-                rows = table.find_all('tr')
-                
-                # Skip header row
-                for row_idx, row in enumerate(rows[1:], start=1):
-                    try:
-                        processed_games += 1
-                        game_id += 1
-                        
-                        # Extract all cells from the row
-                        cells = row.find_all('td')
-                        
-                        # Check if this is likely a POSTPONED game
-                        row_text = row.text.strip().upper()
-                        is_postponed = "POSTPONED" in row_text
-                        
-                        if is_postponed:
-                            print(f"Processing likely POSTPONED game in results section, row {row_idx}")
-                        
-                        # Process this game row and add to game_times if valid
-                        game_times = process_game_row(
-                            sport,
-                            row, 
-                            cells, 
-                            game_id, 
-                            row_idx, 
-                            table_idx,
-                            today,  # Use today as the section date for result sections
-                            teams_with_games_today,
-                            processed_game_ids,
-                            game_times
-                        )
-                    except Exception as e:
-                        print(f"Error parsing game row in results section: {e}")
-                        continue
+        # For dates before today, we're primarily interested in completed games
+        is_past_date = section_date_obj < today
+        if is_past_date:
+            logger.debug("Processing past date %s for completed games", section_date.strftime('%Y-%m-%d'))
         
-        # Process each date and its tables
-        for section_date, tables in date_to_tables.items():
-            section_date_obj = section_date.date()
-            section_is_today = section_date_obj == today
-            
-            # Check if this date is within our processing range
-            date_in_range = date_range_start <= section_date_obj <= date_range_end
-            
-            print(f"Processing section for date: {section_date.strftime('%Y-%m-%d')} (is_today: {section_is_today}, in_range: {date_in_range})")
-            
-            # Only process games for dates within our range
-            if not date_in_range:
-                print(f"Skipping section for {section_date.strftime('%Y-%m-%d')} as it's outside our date range")
-                continue
+        # Process each table for this date
+        for table_idx, table in enumerate(tables):
+            # Rows of unchanged sections are reused from the last refresh
+            records, reused = _table_records(sport, 'schedule_table', table, html, offsets, _extract_schedule_table)
+            if reused:
+                reused_sections += 1
             
-            # For dates before today, we're primarily interested in completed games
-            is_past_date = section_date_obj < today
-            if is_past_date:
-                print(f"Processing past date {section_date.strftime('%Y-%m-%d')} for completed games")
+            # Track position in each row
+            row_position = 0
             
-            # Process each table for this date
-            for table_idx, table in enumerate(tables):
-                # Get all game rows
-                game_rows = table.find_all('tr', class_=lambda x: x and 'Table__TR' in x)
+            for game in records:
+                processed_games += 1
+                row_position += 1
+                game_id += 1
+                if game is None:
+                    skipped_rows += 1
                 
-                # If no rows found with that class, try any tr
-                if not game_rows:
-                    game_rows = table.find_all('tr')
-                    print(f"No rows with Table__TR class, found {len(game_rows)} regular tr elements")
-                
-                # Track position in each row
-                row_position = 0
-                
-                for row in game_rows:
-                    try:
-                        # Skip header rows
-                        if row.find('th'):
-                            continue
-                            
-                        processed_games += 1
-                        row_position += 1
-                        game_id += 1
-                        
-                        # Extract all cells from the row
-                        team_cells = row.find_all('td', class_='Table__TD')
-                        
-                        # If no cells with that class, try any td
-                        if len(team_cells) < 2:
-                            team_cells = row.find_all('td')
-                            print(f"Found {len(team_cells)} regular td elements")
-                            
-                        if len(team_cells) < 2:
-                            continue
-                        
-                        # Process this game row and add to game_times if valid
-                        game_times = process_game_row(
-                            sport,
-                            row, 
-                            team_cells, 
-                            game_id, 
-                            row_position, 
-                            table_idx,
-                            section_date,
-                            teams_with_games_today,
-                            processed_game_ids,
-                            game_times
-                        )
-                    except Exception as e:
-                        print(f"Error parsing game row: {e}")
-                        print(f"--- SKIPPED PROCESSING: General processing error ---\n")
-                        continue
-        
-        # Add a timestamp indicating when the game times were fetched
-        game_times['_meta'] = {
-            'date': today_date,
-            'timestamp': datetime.now().isoformat(),
-            'game_count': len(game_times) - (2 if 'team_games' in game_times and '_meta' in game_times else 1 if 'team_games' in game_times or '_meta' in game_times else 0)
-        }
-        
-        print(f"Processed {processed_games} rows, found {len(game_times) - 2 if 'team_games' in game_times and '_meta' in game_times else len(game_times) - 1 if 'team_games' in game_times or '_meta' in game_times else len(game_times)} game times for {sport} on {today_date}")
-        return game_times
-    except Exception as e:
-        print(f"Error fetching {sport} schedule: {e}")
-        return {} 
\ No newline at end of file
+                sample_row()
+                try:
+                    # Add this game to game_times if valid
+                    game_times = emit_game_row(
+                        sport,
+                        game,
+                        game_id, 
+                        row_position, 
+                        table_idx,
+                        section_date,
+                        teams_with_games_today,
+                        processed_game_ids,
+                        game_times
+                    )
+                except Exception as e:
+                    logger.warning("Error parsing game row: %s", e)
+                    logger.debug("--- SKIPPED PROCESSING: General processing error ---")
+                    continue
+    
+    # Tear the tree down now rather than leaving its reference cycles to the garbage collector -
+    # nothing in game_times or the section cache points into it
+    release_soup(soup)
+    
+    # Add a timestamp indicating when the game times were fetched
+    game_times['_meta'] = {
+        'date': today_date,
+        'timestamp': datetime.now().isoformat(),
+        'game_count': len(game_times) - (2 if 'team_games' in game_times and '_meta' in game_times else 1 if 'team_games' in game_times or '_meta' in game_times else 0)
+    }
+    
+    observe('ssa_stage_seconds', time.perf_counter() - rows_started, stage='rows', sport=sport)
+    stage_finished(rows_memory, 'rows', sport)
+    inc('ssa_rows_total', processed_games - skipped_rows, sport=sport, outcome='extracted')
+    inc('ssa_rows_total', skipped_rows, sport=sport, outcome='skipped')
+    inc('ssa_games_found_total', game_times['_meta']['game_count'], sport=sport)
+    
+    logger.info("Processed %s rows, found %s game times for %s on %s (%s unchanged sections reused)", processed_games, game_times['_meta']['game_count'], sport, today_date, reused_sections)
+    return game_times
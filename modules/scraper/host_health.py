@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+import requests
+from .. import config
+from ..utils.metrics import inc
+
+logger = logging.getLogger(__name__)
+
+# Per-host health for the fetch layer: recent latencies and failures, a circuit breaker that
+# fails fast for hosts that keep erroring, and a timeout derived from each host's observed p99.
+#
+# Circuit states: 'closed' (requests go through), 'open' (requests fail immediately until
+# SSA_HOST_OPEN_SECONDS have passed) and 'half_open' (a background probe is checking the host;
+# requests keep failing fast until it answers, so no user waits on a dead host).
+
+# host -> state dict, least recently used first (stream URLs come from users, so the number of hosts is capped)
+_hosts = OrderedDict()
+_lock = threading.Lock()
+
+class HostUnavailable(requests.ConnectionError):
+    """The host's circuit is open after repeated failures."""
+
+def _new_state():
+    return {
+        'state': 'closed',
+        'consecutive_failures': 0,
+        'failures': 0,
+        'successes': 0,
+        'opened_at': None,
+        'last_error': None,
+        'latencies': deque(maxlen=config.HOST_LATENCY_WINDOW)
+    }
+
+def _get_state(host):
+    """Return a host's state, creating it; call with the lock held."""
+    state = _hosts.get(host)
+    if state is None:
+        state = _hosts[host] = _new_state()
+        while len(_hosts) > config.HOST_HEALTH_MAX_HOSTS:
+            _hosts.popitem(last=False)
+    else:
+        _hosts.move_to_end(host)
+    return state
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+def check_host(host, url):
+    """Raise HostUnavailable if the host's circuit is open, starting a probe once it has cooled down."""
+    if not config.HOST_BREAKER:
+        return
+    start_probe = False
+    with _lock:
+        state = _get_state(host)
+        if state['state'] == 'closed':
+            return
+        if state['state'] == 'open' and time.monotonic() - state['opened_at'] >= config.HOST_OPEN_SECONDS:
+            state['state'] = 'half_open'
+            start_probe = True
+        last_error = state['last_error']
+
+    if start_probe:
+        threading.Thread(target=_probe, args=(host, url), name=f"probe-{host}", daemon=True).start()
+    inc('ssa_host_circuit_total', event='rejected')
+    raise HostUnavailable(f"{host} is unavailable after repeated failures (last error: {last_error})")
+
+def _probe(host, url):
+    """Check whether a host is back with one short request, closing or re-opening its circuit."""
+    # fetch.py imports this module, so its headers are looked up here rather than at import time
+    from .fetch import DEFAULT_HEADERS
+    started = time.perf_counter()
+    try:
+        # The same headers as real fetches - some hosts turn away clients without a browser User-Agent
+        with requests.get(url, headers=DEFAULT_HEADERS, timeout=config.HOST_PROBE_TIMEOUT, stream=True) as response:
+            healthy = response.status_code < 500
+            error = f"HTTP {response.status_code}"
+    except requests.RequestException as e:
+        healthy = False
+        error = str(e)
+
+    with _lock:
+        state = _get_state(host)
+        if healthy:
+            state.update(state='closed', consecutive_failures=0, opened_at=None)
+            state['latencies'].append(time.perf_counter() - started)
+        else:
+            state.update(state='open', opened_at=time.monotonic(), last_error=error)
+    inc('ssa_host_circuit_total', event='probe_ok' if healthy else 'probe_failed')
+    logger.info("Probe of %s %s", host, 'succeeded, closing circuit' if healthy else f"failed: {error}")
+
+def host_timeout(host, default):
+    """Timeout for a request to a host: a multiple of its recent p99, within [SSA_HOST_TIMEOUT_MIN, default]."""
+    if not config.HOST_BREAKER:
+        return default
+    with _lock:
+        state = _hosts.get(host)
+        latencies = sorted(state['latencies']) if state else []
+    if len(latencies) < config.HOST_TIMEOUT_MIN_SAMPLES:
+        return default
+    return min(default, max(config.HOST_TIMEOUT_MIN, _percentile(latencies, 99) * config.HOST_TIMEOUT_MULTIPLIER))
+
+def record_success(host, seconds):
+    """Note a completed request and its latency."""
+    if not config.HOST_BREAKER:
+        return
+    with _lock:
+        state = _get_state(host)
+        state['successes'] += 1
+        state['consecutive_failures'] = 0
+        state['latencies'].append(seconds)
+
+def record_failure(host, error):
+    """Note a failed request, opening the host's circuit after SSA_HOST_FAILURE_THRESHOLD in a row."""
+    if not config.HOST_BREAKER:
+        return
+    with _lock:
+        state = _get_state(host)
+        state['failures'] += 1
+        state['consecutive_failures'] += 1
+        state['last_error'] = str(error)
+        opened = state['state'] == 'closed' and state['consecutive_failures'] >= config.HOST_FAILURE_THRESHOLD
+        if opened:
+            state.update(state='open', opened_at=time.monotonic())
+    if opened:
+        inc('ssa_host_circuit_total', event='opened')
+        logger.warning("Opening circuit for %s after %s consecutive failures: %s",
+                       host, config.HOST_FAILURE_THRESHOLD, error)
+
+def host_health_report():
+    """Describe every tracked host: circuit state, failure counts, latency percentiles and current timeout."""
+    with _lock:
+        snapshot = {host: dict(state, latencies=sorted(state['latencies'])) for host, state in _hosts.items()}
+
+    report = {}
+    now = time.monotonic()
+    for host, state in snapshot.items():
+        latencies = state['latencies']
+        report[host] = {
+            'state': state['state'],
+            'consecutive_failures': state['consecutive_failures'],
+            'failures': state['failures'],
+            'successes': state['successes'],
+            'last_error': state['last_error'],
+            'open_for_seconds': round(now - state['opened_at'], 1) if state['opened_at'] is not None else None,
+            'latency_ms': {
+                f"p{pct}": round(_percentile(latencies, pct) * 1000, 1) if latencies else None
+                for pct in (50, 95, 99)
+            },
+            'samples': len(latencies),
+            'timeout_seconds': round(host_timeout(host, config.FETCH_TIMEOUT_SECONDS), 2)
+        }
+    return report
+
+def reset_host_health():
+    """Forget every host's history (used by the test scripts)."""
+    with _lock:
+        _hosts.clear()
@@ -0,0 +1,92 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from .. import config
+from .url_scraper import get_all_urls
+from .game_matcher import title_pair, split_title, match_titles
+
+logger = logging.getLogger(__name__)
+
+# Merging the (href, title) lists of several stream sources into one group per game
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'igshid', 'si'}
+TRACKING_PREFIXES = ('utm_',)
+
+_source_pool = ThreadPoolExecutor(max_workers=config.SOURCE_FETCH_WORKERS, thread_name_prefix='source')
+
+def _is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def clean_url(href):
+    """Drop tracking parameters and the fragment from a link, keeping everything else as is."""
+    parts = urlsplit(href)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking_param(k)]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+def canonical_url(href):
+    """Key under which two links count as the same stream: scheme, host case, trailing slash,
+    default port, query order and tracking parameters don't matter."""
+    parts = urlsplit(href)
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip('/') or '/'
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking_param(k))
+    return f"{host}{path}" + (f"?{urlencode(query)}" if query else '')
+
+def group_links(results, matchups=None, sport=None):
+    """Merge per-source (href, title) lists into one group per game.
+
+    `results` is a list of (source URL, [(href, title), ...]) in source order. Links are deduplicated
+    across sources by canonical_url(), and each group points at its schedule entry (schedule_key)
+    when the sport's team-pair index (game_matcher.build_matchup_index) has the game.
+    """
+    groups = {}
+    seen_links = set()
+
+    for source, urls in results:
+        for href, title in urls:
+            parsed = title_pair(title)
+            if parsed is None or (sport and parsed[0] != sport):
+                continue
+
+            canonical = canonical_url(href)
+            if canonical in seen_links:
+                continue
+            seen_links.add(canonical)
+
+            # Groups are only made for a link they keep, so none ends up empty
+            key = f"{parsed[0]}:{parsed[1]}"
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    'key': key,
+                    'sport': parsed[0],
+                    'teams': sorted(team.strip() for team in split_title(title)[1]),
+                    'title': title,
+                    'links': [],
+                    'sources': [],
+                    'schedule_key': None
+                }
+            group['links'].append(clean_url(href))
+            if source not in group['sources']:
+                group['sources'].append(source)
+
+    matches = match_titles([group['title'] for group in groups.values()], matchups or {})
+    for group in groups.values():
+        group['schedule_key'] = matches[group['title']]
+    return [groups[key] for key in sorted(groups)]
+
+def scrape_sources(sources):
+    """Run get_all_urls for several source pages concurrently; returns [(source, urls or error dict)]."""
+    futures = [(source, _source_pool.submit(get_all_urls, source)) for source in sources]
+    results = []
+    for source, future in futures:
+        try:
+            results.append((source, future.result()))
+        except Exception as e:
+            logger.warning("Error scraping %s: %s", source, e)
+            results.append((source, {"error": f"An error occurred: {str(e)}"}))
+    return results
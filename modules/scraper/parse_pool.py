@@ -0,0 +1,118 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .. import config
+from ..utils.logging_utils import configure_logging
+from ..utils.metrics import observe
+from .fetch import decode_page
+
+logger = logging.getLogger(__name__)
+
+# Optional pool of worker processes for the CPU-bound parsing (SSA_PROCESS_POOL).
+# Workers get the raw page bytes and their encoding (see fetch.py) and send back compact records, so only small results cross
+# the process boundary. Each worker keeps its own section cache, and metrics recorded inside
+# a worker stay there - the main process only records the pool_parse and pool_ipc stages.
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# A tiny page parsed by each worker on start-up so the first real request doesn't pay for imports
+_WARMUP_HTML = b'<html><body><table><tr><td><a href="/x">A vs B</a></td></tr></table></body></html>'
+
+def _init_worker():
+    """Set up logging in a new worker and load the parsers before the first page arrives."""
+    configure_logging()
+    if config.PROCESS_POOL_WARMUP:
+        from .url_scraper import extract_event_urls
+        extract_event_urls('https://warmup.invalid/', decode_page(_WARMUP_HTML, 'utf-8'))
+
+def _parse_schedule_worker(sport, html_bytes, encoding):
+    """Worker side of parse_schedule_in_pool; returns (compact game records, seconds spent)."""
+    from .game_time_scraper import parse_game_times
+    from .game_records import compact_game_times
+    started = time.perf_counter()
+    compact = compact_game_times(parse_game_times(sport, decode_page(html_bytes, encoding)))
+    return compact, time.perf_counter() - started
+
+def _extract_urls_worker(url, html_bytes, encoding):
+    """Worker side of extract_urls_in_pool; returns ((url, title) pairs, seconds spent)."""
+    from .url_scraper import extract_event_urls
+    started = time.perf_counter()
+    urls = extract_event_urls(url, decode_page(html_bytes, encoding))
+    return urls, time.perf_counter() - started
+
+def _noop():
+    return None
+
+def _get_pool():
+    """Create the pool on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context(config.PROCESS_POOL_START_METHOD)
+            _pool = ProcessPoolExecutor(max_workers=max(config.PROCESS_POOL_SIZE, 1),
+                                        mp_context=context, initializer=_init_worker)
+            logger.info("Started parse pool with %s %s workers",
+                        config.PROCESS_POOL_SIZE, config.PROCESS_POOL_START_METHOD)
+        return _pool
+
+def start_pool():
+    """Start the pool and its workers up front when SSA_PROCESS_POOL and SSA_PROCESS_POOL_WARMUP are set."""
+    if not config.PROCESS_POOL or not config.PROCESS_POOL_WARMUP:
+        return
+    pool = _get_pool()
+    try:
+        # One task per worker makes the executor start all of them now
+        for future in [pool.submit(_noop) for _ in range(max(config.PROCESS_POOL_SIZE, 1))]:
+            future.result()
+    except (BrokenProcessPool, OSError) as e:
+        # Requests will still be served, retrying the pool and parsing in-process if it keeps failing
+        logger.warning("Parse pool failed to start: %s", e)
+        shutdown_pool()
+
+def shutdown_pool():
+    """Stop the workers; the next parse starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+atexit.register(shutdown_pool)
+
+def _run_in_pool(metric, labels, worker, *args):
+    """Run a parse in the pool, returning its result, or None if the pool is unavailable."""
+    started = time.perf_counter()
+    try:
+        result, worker_seconds = _get_pool().submit(worker, *args).result()
+    except (BrokenProcessPool, OSError) as e:
+        # A worker died or the pool couldn't start - drop it and parse in this process instead
+        logger.warning("Parse pool unavailable, parsing in-process: %s", e)
+        shutdown_pool()
+        return None
+
+    # Time inside the worker vs. the rest of the round trip (queueing, pickling, transfer)
+    observe(metric, worker_seconds, stage='pool_parse', **labels)
+    observe(metric, max(time.perf_counter() - started - worker_seconds, 0), stage='pool_ipc', **labels)
+    return result
+
+def parse_schedule_in_pool(sport, html_bytes, encoding):
+    """Parse a schedule page in a worker process, falling back to this process if the pool fails."""
+    from .game_time_scraper import parse_game_times
+    from .game_records import expand_game_times
+    compact = _run_in_pool('ssa_stage_seconds', {'sport': sport}, _parse_schedule_worker, sport, html_bytes, encoding)
+    if compact is None:
+        return parse_game_times(sport, decode_page(html_bytes, encoding))
+    return expand_game_times(compact)
+
+def extract_urls_in_pool(url, html_bytes, encoding):
+    """Find event URLs in a page in a worker process, falling back to this process if the pool fails."""
+    from .url_scraper import extract_event_urls
+    urls = _run_in_pool('ssa_url_scrape_seconds', {}, _extract_urls_worker, url, html_bytes, encoding)
+    if urls is None:
+        return extract_event_urls(url, decode_page(html_bytes, encoding))
+    return urls
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from .. import config
+
+# Parsed rows from earlier refreshes, keyed by (sport, kind, fingerprint of the raw HTML); row keys also carry the table strategy
+# Most schedule sections are identical from one refresh to the next, so their rows can be reused
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+def line_offsets(html):
+    """Return the character offset at which each line of the page starts."""
+    offsets = [0]
+    position = html.find('\n')
+    while position != -1:
+        offsets.append(position + 1)
+        position = html.find('\n', position + 1)
+    return offsets
+
+def _source_offset(element, offsets):
+    """Convert a tag's parser position (line, column) to an offset in the page, if known."""
+    line = getattr(element, 'sourceline', None)
+    column = getattr(element, 'sourcepos', None)
+    if line is None or column is None or line > len(offsets):
+        return None
+    return offsets[line - 1] + column
+
+def fingerprint(element, html, offsets):
+    """Hash the raw HTML span of an element - from its start tag up to the next tag after it."""
+    start = _source_offset(element, offsets)
+
+    if start is not None:
+        # Walk to the element's last descendant; the next tag after that is outside the element
+        last = element
+        while getattr(last, 'contents', None):
+            last = last.contents[-1]
+        next_tag = last.find_next()
+
+        end = len(html) if next_tag is None else _source_offset(next_tag, offsets)
+        if end is not None and end > start:
+            return hashlib.blake2b(html[start:end].encode('utf-8'), digest_size=16).hexdigest()
+
+    # Positions aren't tracked by every parser - fall back to hashing the serialized element
+    return hashlib.blake2b(str(element).encode('utf-8'), digest_size=16).hexdigest()
+
+def get_cached_rows(key):
+    """Return the cached row records for a fingerprint key, or None."""
+    if not config.INCREMENTAL_PARSE:
+        return None
+    with _lock:
+        rows = _cache.get(key)
+        if rows is not None:
+            _cache.move_to_end(key)
+        return rows
+
+def store_rows(key, rows):
+    """Remember the row records parsed for a fingerprint key, evicting the oldest entries."""
+    if not config.INCREMENTAL_PARSE:
+        return
+    with _lock:
+        _cache[key] = rows
+        _cache.move_to_end(key)
+        while len(_cache) > config.PARSE_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+def clear_section_cache():
+    """Drop all cached row records."""
+    with _lock:
+        _cache.clear()
+
+def section_cache_info():
+    """Report how many row records are cached."""
+    with _lock:
+        return {
+            'entries': len(_cache),
+            'rows': sum(len(rows) for rows in _cache.values()),
+            'max_entries': config.PARSE_CACHE_MAX_ENTRIES
+        }
@@ -0,0 +1,52 @@
+import json
+import logging
+from urllib.parse import urlparse
+from .. import config
+
+logger = logging.getLogger(__name__)
+
+# Extraction profiles for known stream index pages, keyed by hostname.
+# A profile tells extract_event_urls where the events are, so it matches each event once
+# instead of every <li> and <a> on the page (navigation, footers and ads included):
+#   events - CSS selector for the nodes that each hold one event
+#   text   - CSS selector, inside an event node, for the element with the matchup text
+#            (default: the event's link)
+#   link   - CSS selector, inside an event node, for its link (default: the first a[href];
+#            an event node that is itself a link is used as is)
+# When a profile selects no event nodes (e.g. after a site redesign) the full scan is used.
+SITE_PROFILES = {}
+
+def register_site_profile(host, events, text=None, link='a[href]'):
+    """Add or replace the extraction profile for a hostname (subdomains included)."""
+    SITE_PROFILES[host.lower()] = {'events': events, 'text': text, 'link': link}
+
+def load_site_profiles(path):
+    """Register the profiles in a JSON file: {"host": {"events": ..., "text": ..., "link": ...}}."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            profiles = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Error loading site profiles from %s: %s", path, e)
+        return 0
+
+    for host, profile in profiles.items():
+        if not isinstance(profile, dict) or not profile.get('events'):
+            logger.warning("Skipping site profile for %s: no events selector", host)
+            continue
+        register_site_profile(host, profile['events'], profile.get('text'), profile.get('link') or 'a[href]')
+    return len(profiles)
+
+def get_site_profile(url):
+    """Return the profile for a page URL's host or its closest parent domain, or None."""
+    if not config.SITE_PROFILES or not SITE_PROFILES:
+        return None
+    host = (urlparse(url).hostname or '').lower()
+    parts = host.split('.')
+    for i in range(len(parts) - 1):
+        profile = SITE_PROFILES.get('.'.join(parts[i:]))
+        if profile is not None:
+            return profile
+    return None
+
+if config.SITE_PROFILES_FILE:
+    load_site_profiles(config.SITE_PROFILES_FILE)
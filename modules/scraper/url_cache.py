@@ -0,0 +1,149 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from .. import config
+from ..utils.metrics import inc
+from ..utils.shared_store import shared_get, shared_set, wait_for
+
+# Two layers in front of get_all_urls' parse and match:
+# - recent results per page URL, served without fetching for SSA_URL_CACHE_TTL seconds (and kept
+#   after that as the stale fallback when admission control sheds a request)
+# - extraction results keyed by (page URL, hash of the fetched body), so an unchanged page
+#   costs one hash instead of a parse and match once the TTL has passed
+# Stream index pages are often byte-identical across many consecutive requests.
+# With a shared cache (SSA_SHARED_CACHE) both layers are also written there, and a local miss is
+# looked up in it, so a page scraped by one worker process is served by all of them.
+_recent = OrderedDict()
+_extractions = OrderedDict()
+_lock = threading.Lock()
+
+def _remember(cache, key, value):
+    """Store a value in one of the LRU caches, evicting the oldest entries; call with the lock held."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > config.URL_CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
+
+def content_key(url, content, encoding):
+    """Key for a fetched page: links are resolved against the URL, so it is part of the key."""
+    return (url, encoding, hashlib.blake2b(content, digest_size=16).hexdigest())
+
+def _shared_recent(url):
+    """Read (URLs, age in seconds) for a page from the shared cache, or None."""
+    if not config.SHARED_CACHE:
+        return None
+    data = shared_get(f"urls:{url}")
+    if data is None:
+        return None
+    try:
+        # Stamped with wall-clock time, since monotonic clocks differ between processes
+        value = json.loads(data.decode('utf-8'))
+        age = max(time.time() - value['at'], 0)
+        urls = value['urls']
+    except (ValueError, KeyError, TypeError):
+        return None
+    # Keep it locally too, dated by its age, unless the local copy is newer
+    stored_at = time.monotonic() - age
+    with _lock:
+        entry = _recent.get(url)
+        if entry is None or entry[0] < stored_at:
+            _remember(_recent, url, (stored_at, list(urls)))
+    return urls, age
+
+def _shared_extraction_key(key):
+    url, encoding, digest = key
+    return f"extract:{digest}:{encoding}:{url}"
+
+def get_recent_urls(url):
+    """Return the URLs extracted from a page within the last SSA_URL_CACHE_TTL seconds, or None."""
+    if not config.URL_CACHE:
+        return None
+    with _lock:
+        entry = _recent.get(url)
+    # Expired entries stay until evicted, as the stale fallback for shed requests (peek_urls)
+    if entry is not None and time.monotonic() - entry[0] > config.URL_CACHE_TTL_SECONDS:
+        entry = None
+    inc('ssa_url_cache_total', layer='ttl', result='miss' if entry is None else 'hit')
+    if entry is not None:
+        return list(entry[1])
+
+    if not config.SHARED_CACHE:
+        return None
+    shared = _shared_recent(url)
+    if shared is not None and shared[1] > config.URL_CACHE_TTL_SECONDS:
+        shared = None
+    inc('ssa_url_cache_total', layer='shared', result='miss' if shared is None else 'hit')
+    return None if shared is None else list(shared[0])
+
+def wait_for_shared_urls(url, timeout):
+    """Wait up to timeout seconds for another process to store a page's URLs in the shared cache; return them or None."""
+    def lookup():
+        shared = _shared_recent(url)
+        return shared if shared is not None and shared[1] <= config.URL_CACHE_TTL_SECONDS else None
+
+    shared = wait_for(lookup, timeout)
+    inc('ssa_url_cache_total', layer='shared', result='miss' if shared is None else 'hit')
+    return None if shared is None else list(shared[0])
+
+def peek_urls(url):
+    """Return (URLs, age in seconds) of the last extraction from a page, however old, or None."""
+    if not config.URL_CACHE:
+        return None
+    with _lock:
+        entry = _recent.get(url)
+    if entry is None:
+        return _shared_recent(url)
+    return list(entry[1]), time.monotonic() - entry[0]
+
+def get_extracted_urls(key):
+    """Return the URLs extracted earlier from an identical page body, or None."""
+    if not config.URL_CACHE:
+        return None
+    with _lock:
+        urls = _extractions.get(key)
+        if urls is not None:
+            _extractions.move_to_end(key)
+    if urls is None and config.SHARED_CACHE:
+        data = shared_get(_shared_extraction_key(key))
+        try:
+            urls = json.loads(data.decode('utf-8')) if data is not None else None
+        except ValueError:
+            urls = None
+        if urls is not None:
+            with _lock:
+                _remember(_extractions, key, urls)
+    inc('ssa_url_cache_total', layer='content', result='miss' if urls is None else 'hit')
+    return None if urls is None else list(urls)
+
+def store_urls(url, key, urls):
+    """Remember the URLs extracted from a page, by URL and by content."""
+    if not config.URL_CACHE:
+        return
+    with _lock:
+        _remember(_recent, url, (time.monotonic(), list(urls)))
+        _remember(_extractions, key, list(urls))
+
+    if config.SHARED_CACHE:
+        # Kept past the URL TTL, as the stale fallback and for identical page bodies
+        shared_set(f"urls:{url}", json.dumps({'at': time.time(), 'urls': urls}).encode('utf-8'),
+                   config.SHARED_CACHE_TTL_SECONDS)
+        shared_set(_shared_extraction_key(key), json.dumps(urls).encode('utf-8'), config.SHARED_CACHE_TTL_SECONDS)
+
+def clear_url_cache(keep_extractions=False):
+    """Drop the cached results, optionally keeping the ones keyed by content."""
+    with _lock:
+        _recent.clear()
+        if not keep_extractions:
+            _extractions.clear()
+
+def url_cache_info():
+    """Report how many pages and extraction results are cached."""
+    with _lock:
+        return {
+            'recent_pages': len(_recent),
+            'extractions': len(_extractions),
+            'max_entries': config.URL_CACHE_MAX_ENTRIES,
+            'ttl_seconds': config.URL_CACHE_TTL_SECONDS
+        }
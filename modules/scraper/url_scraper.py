@@ -1,143 +1,256 @@
+import logging
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import re
+import time
+from .. import config
+from ..utils.metrics import inc, timed, observe
+from ..utils.memory import tracked, stage_started, stage_finished, release_soup
+from ..utils.profiling import is_capturing, record_upstream_page
+from ..utils.priority import parse_gate
+from ..utils.shared_store import acquire_lock, release_lock
+from .parse_pool import extract_urls_in_pool
+from .fetch import fetch_page, decode_page
+from .url_cache import content_key, get_recent_urls, get_extracted_urls, store_urls, wait_for_shared_urls
+from .site_profiles import get_site_profile
+
+logger = logging.getLogger(__name__)
+
+def _upstream_url(url):
+    """Apply the configured URL prefix overrides (SSA_URL_OVERRIDES) to the page we fetch."""
+    for prefix, replacement in config.URL_OVERRIDES:
+        if url.startswith(prefix):
+            return replacement + url[len(prefix):]
+    return url
 
 def get_all_urls(url):
     """Extracts all unique URLs from a given webpage and attempts to identify sports teams in them."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        urls = set()
-        
-        # Dictionary of sports and their teams
-        sports_teams = {
-            'NBA': {
-                'Boston Celtics', 'Brooklyn Nets', 'New York Knicks', 'Philadelphia 76ers', 'Toronto Raptors',
-                'Chicago Bulls', 'Cleveland Cavaliers', 'Detroit Pistons', 'Indiana Pacers', 'Milwaukee Bucks',
-                'Atlanta Hawks', 'Charlotte Hornets', 'Miami Heat', 'Orlando Magic', 'Washington Wizards',
-                'Denver Nuggets', 'Minnesota Timberwolves', 'Oklahoma City Thunder', 'Portland Trail Blazers', 'Utah Jazz',
-                'Golden State Warriors', 'Los Angeles Clippers', 'Los Angeles Lakers', 'Phoenix Suns', 'Sacramento Kings',
-                'Dallas Mavericks', 'Houston Rockets', 'Memphis Grizzlies', 'New Orleans Pelicans', 'San Antonio Spurs'
-            },
-            'NFL': {
-                'Arizona Cardinals', 'Atlanta Falcons', 'Baltimore Ravens', 'Buffalo Bills', 'Carolina Panthers',
-                'Chicago Bears', 'Cincinnati Bengals', 'Cleveland Browns', 'Dallas Cowboys', 'Denver Broncos',
-                'Detroit Lions', 'Green Bay Packers', 'Houston Texans', 'Indianapolis Colts', 'Jacksonville Jaguars',
-                'Kansas City Chiefs', 'Las Vegas Raiders', 'Los Angeles Chargers', 'Los Angeles Rams', 'Miami Dolphins',
-                'Minnesota Vikings', 'New England Patriots', 'New Orleans Saints', 'New York Giants', 'New York Jets',
-                'Philadelphia Eagles', 'Pittsburgh Steelers', 'San Francisco 49ers', 'Seattle Seahawks', 'Tampa Bay Buccaneers',
-                'Tennessee Titans', 'Washington Commanders'
-            },
-            'MLB': {
-                'Arizona Diamondbacks', 'Atlanta Braves', 'Baltimore Orioles', 'Boston Red Sox', 'Chicago Cubs',
-                'Chicago White Sox', 'Cincinnati Reds', 'Cleveland Guardians', 'Colorado Rockies', 'Detroit Tigers',
-                'Houston Astros', 'Kansas City Royals', 'Los Angeles Angels', 'Los Angeles Dodgers', 'Miami Marlins',
-                'Milwaukee Brewers', 'Minnesota Twins', 'New York Mets', 'New York Yankees', 'Oakland Athletics',
-                'Philadelphia Phillies', 'Pittsburgh Pirates', 'San Diego Padres', 'San Francisco Giants', 'Seattle Mariners',
-                'St. Louis Cardinals', 'Tampa Bay Rays', 'Texas Rangers', 'Toronto Blue Jays', 'Washington Nationals'
-            },
-            'NHL': {
-                'Anaheim Ducks', 'Arizona Coyotes', 'Boston Bruins', 'Buffalo Sabres', 'Calgary Flames',
-                'Carolina Hurricanes', 'Chicago Blackhawks', 'Colorado Avalanche', 'Columbus Blue Jackets', 'Dallas Stars',
-                'Detroit Red Wings', 'Edmonton Oilers', 'Florida Panthers', 'Los Angeles Kings', 'Minnesota Wild',
-                'Montreal Canadiens', 'Nashville Predators', 'New Jersey Devils', 'New York Islanders', 'New York Rangers',
-                'Ottawa Senators', 'Philadelphia Flyers', 'Pittsburgh Penguins', 'San Jose Sharks', 'Seattle Kraken',
-                'St. Louis Blues', 'Tampa Bay Lightning', 'Toronto Maple Leafs', 'Vancouver Canucks', 'Vegas Golden Knights',
-                'Washington Capitals', 'Winnipeg Jets'
-            }
-        }
+        # Profiled requests always fetch and parse, so the profile shows the real work
+        capturing = is_capturing()
+        urls = None if capturing else get_recent_urls(url)
+        if urls is None:
+            urls = _fetch_event_urls_once(url, capturing)
+        inc('ssa_urls_found_total', len(urls))
+        return urls
+    except requests.RequestException as e:
+        return {"error": f"Error fetching the URL: {str(e)}"}
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"} 
 
-        # Create a dictionary of team variations for each sport
-        team_variations_by_sport = {}
-        for sport, teams in sports_teams.items():
-            team_variations_by_sport[sport] = {}
-            for team in teams:
-                # Split into parts and get city and nickname
-                parts = team.split()
-                if len(parts) >= 2:
-                    city = parts[0].lower()
-                    nickname = ' '.join(parts[1:]).lower()
-                    full_name = team.lower()
-                    
-                    # Add to sport-specific variations
-                    team_variations_by_sport[sport][full_name] = team
-                    team_variations_by_sport[sport][nickname] = team
-                    
-                    # Only add city if it's unique to this sport
-                    is_city_unique = True
-                    for other_sport, other_teams in sports_teams.items():
-                        if other_sport != sport:
-                            for other_team in other_teams:
-                                other_parts = other_team.split()
-                                if other_parts and other_parts[0].lower() == city:
-                                    is_city_unique = False
-                                    break
-                        if not is_city_unique:
-                            break
-                            
-                    # Only add city as a variation if it's unique to this sport
-                    if is_city_unique:
-                        team_variations_by_sport[sport][city] = team
+def _fetch_event_urls_once(url, capturing):
+    """Fetch a page's event URLs, with a shared cache letting one worker or node at a time fetch a page."""
+    # Results only reach the shared cache through the URL cache
+    if capturing or not config.SHARED_CACHE or not config.URL_CACHE:
+        return _fetch_event_urls(url, capturing)
 
-        # Process all list items and links
-        for element in soup.find_all(['li', 'a']):
-            text = element.get_text().strip()
-            href = element.get('href', '')
+    lock_name = f"urls:{url}"
+    token = acquire_lock(lock_name)
+    if token is None:
+        # Another process is fetching this page - use its result if it arrives in time
+        urls = wait_for_shared_urls(url, config.SHARED_LOCK_WAIT_SECONDS)
+        return urls if urls is not None else _fetch_event_urls(url, capturing)
+    try:
+        # The previous holder may have stored it between our lookup and taking the lease
+        urls = wait_for_shared_urls(url, 0)
+        return urls if urls is not None else _fetch_event_urls(url, capturing)
+    finally:
+        release_lock(lock_name, token)
+
+def _fetch_event_urls(url, capturing):
+    """Download a page and find its event URLs, reusing the results for a byte-identical page."""
+    with timed('ssa_url_scrape_seconds', stage='download'):
+        # Links are still resolved against the original URL, only the download is redirected
+        content, encoding = fetch_page(_upstream_url(url))
+
+    key = content_key(url, content, encoding)
+    urls = None if capturing else get_extracted_urls(key)
+    if urls is None:
+        with parse_gate.slot():
+            if config.PROCESS_POOL and not capturing:
+                # Parse and match in a worker process, sending it the raw bytes
+                urls = extract_urls_in_pool(url, content, encoding)
+            else:
+                html = decode_page(content, encoding)
+                record_upstream_page(url, html)
+                urls = extract_event_urls(url, html)
+    store_urls(url, key, urls)
+    return urls
+
+def _absolute_href(href, url):
+    """Make a link absolute, or return None if it isn't an http(s) link."""
+    if href.startswith('//'):
+        href = 'https:' + href
+    elif href.startswith('/'):
+        href = urljoin(url, href)
+    return href if href.startswith(('http://', 'https://')) else None
+
+def _scan_candidates(soup, url):
+    """Yield (element, text, absolute href or '') for every list item and link on the page."""
+    inc('ssa_url_extractions_total', mode='scan')
+    for element in soup.find_all(['li', 'a']):
+        text = element.get_text().strip()
+        href = element.get('href', '')
+        
+        # Skip empty elements
+        if not text and not href:
+            continue
             
-            # Skip empty elements
-            if not text and not href:
+        # Make URL absolute
+        if href:
+            href = _absolute_href(href, url)
+            if href is None:
                 continue
+        yield element, text, href
+
+def _profile_candidates(soup, url, profile):
+    """List (element, text, absolute href) for each event node a site profile selects, or None to fall back to the scan."""
+    if profile is None:
+        return None
+    events = soup.select(profile['events'])
+    if not events:
+        logger.warning("Site profile for %s matched no events, falling back to the full scan", url)
+        inc('ssa_url_extractions_total', mode='profile_fallback')
+        return None
+
+    inc('ssa_url_extractions_total', mode='profile')
+    candidates = []
+    for event in events:
+        link = event if event.name == 'a' and event.get('href') else event.select_one(profile['link'])
+        if link is None:
+            continue
+        href = _absolute_href(link.get('href', ''), url)
+        if href is None:
+            continue
+        text_element = event.select_one(profile['text']) if profile['text'] else link
+        text = (text_element or link).get_text().strip()
+        candidates.append((link, text, href))
+    return candidates
+
+def extract_event_urls(url, html):
+    """Find links to sports events in a page, returned as sorted (url, title) pairs."""
+    with timed('ssa_url_scrape_seconds', stage='parse'), tracked('url_parse'):
+        soup = BeautifulSoup(html, 'html.parser')
+    
+    # Everything from here on is team matching over the page's elements
+    extract_started = time.perf_counter()
+    extract_memory = stage_started()
+    urls = set()
+    
+    # Dictionary of sports and their teams
+    sports_teams = {
+        'NBA': {
+            'Boston Celtics', 'Brooklyn Nets', 'New York Knicks', 'Philadelphia 76ers', 'Toronto Raptors',
+            'Chicago Bulls', 'Cleveland Cavaliers', 'Detroit Pistons', 'Indiana Pacers', 'Milwaukee Bucks',
+            'Atlanta Hawks', 'Charlotte Hornets', 'Miami Heat', 'Orlando Magic', 'Washington Wizards',
+            'Denver Nuggets', 'Minnesota Timberwolves', 'Oklahoma City Thunder', 'Portland Trail Blazers', 'Utah Jazz',
+            'Golden State Warriors', 'Los Angeles Clippers', 'Los Angeles Lakers', 'Phoenix Suns', 'Sacramento Kings',
+            'Dallas Mavericks', 'Houston Rockets', 'Memphis Grizzlies', 'New Orleans Pelicans', 'San Antonio Spurs'
+        },
+        'NFL': {
+            'Arizona Cardinals', 'Atlanta Falcons', 'Baltimore Ravens', 'Buffalo Bills', 'Carolina Panthers',
+            'Chicago Bears', 'Cincinnati Bengals', 'Cleveland Browns', 'Dallas Cowboys', 'Denver Broncos',
+            'Detroit Lions', 'Green Bay Packers', 'Houston Texans', 'Indianapolis Colts', 'Jacksonville Jaguars',
+            'Kansas City Chiefs', 'Las Vegas Raiders', 'Los Angeles Chargers', 'Los Angeles Rams', 'Miami Dolphins',
+            'Minnesota Vikings', 'New England Patriots', 'New Orleans Saints', 'New York Giants', 'New York Jets',
+            'Philadelphia Eagles', 'Pittsburgh Steelers', 'San Francisco 49ers', 'Seattle Seahawks', 'Tampa Bay Buccaneers',
+            'Tennessee Titans', 'Washington Commanders'
+        },
+        'MLB': {
+            'Arizona Diamondbacks', 'Atlanta Braves', 'Baltimore Orioles', 'Boston Red Sox', 'Chicago Cubs',
+            'Chicago White Sox', 'Cincinnati Reds', 'Cleveland Guardians', 'Colorado Rockies', 'Detroit Tigers',
+            'Houston Astros', 'Kansas City Royals', 'Los Angeles Angels', 'Los Angeles Dodgers', 'Miami Marlins',
+            'Milwaukee Brewers', 'Minnesota Twins', 'New York Mets', 'New York Yankees', 'Oakland Athletics',
+            'Philadelphia Phillies', 'Pittsburgh Pirates', 'San Diego Padres', 'San Francisco Giants', 'Seattle Mariners',
+            'St. Louis Cardinals', 'Tampa Bay Rays', 'Texas Rangers', 'Toronto Blue Jays', 'Washington Nationals'
+        },
+        'NHL': {
+            'Anaheim Ducks', 'Arizona Coyotes', 'Boston Bruins', 'Buffalo Sabres', 'Calgary Flames',
+            'Carolina Hurricanes', 'Chicago Blackhawks', 'Colorado Avalanche', 'Columbus Blue Jackets', 'Dallas Stars',
+            'Detroit Red Wings', 'Edmonton Oilers', 'Florida Panthers', 'Los Angeles Kings', 'Minnesota Wild',
+            'Montreal Canadiens', 'Nashville Predators', 'New Jersey Devils', 'New York Islanders', 'New York Rangers',
+            'Ottawa Senators', 'Philadelphia Flyers', 'Pittsburgh Penguins', 'San Jose Sharks', 'Seattle Kraken',
+            'St. Louis Blues', 'Tampa Bay Lightning', 'Toronto Maple Leafs', 'Vancouver Canucks', 'Vegas Golden Knights',
+            'Washington Capitals', 'Winnipeg Jets'
+        }
+    }
+
+    # Create a dictionary of team variations for each sport
+    team_variations_by_sport = {}
+    for sport, teams in sports_teams.items():
+        team_variations_by_sport[sport] = {}
+        for team in teams:
+            # Split into parts and get city and nickname
+            parts = team.split()
+            if len(parts) >= 2:
+                city = parts[0].lower()
+                nickname = ' '.join(parts[1:]).lower()
+                full_name = team.lower()
                 
-            # Make URL absolute
-            if href:
-                if href.startswith('//'):
-                    href = 'https:' + href
-                elif href.startswith('/'):
-                    href = urljoin(url, href)
-                if not href.startswith(('http://', 'https://')):
-                    continue
-            
-            # Combine text for searching, converted to lowercase
-            search_text = (text + ' ' + href).lower()
-            
-            # Find teams in the text for each sport separately
-            for sport, variations in team_variations_by_sport.items():
-                found_teams = set()
-                
-                # Match teams in this sport only
-                for variation, team in variations.items():
-                    # Check if the team name appears as a whole word
-                    # Use word boundaries or space checks to ensure we're matching whole words
-                    pattern = r'\b' + re.escape(variation) + r'\b'
-                    if re.search(pattern, search_text):
-                        found_teams.add(team)
+                # Add to sport-specific variations
+                team_variations_by_sport[sport][full_name] = team
+                team_variations_by_sport[sport][nickname] = team
                 
-                # Only process if we found at least two teams from the same sport
-                if len(found_teams) >= 2:
-                    # Take the first two teams found
-                    teams_list = sorted(list(found_teams))[:2]
-                    title = f"{sport}: {teams_list[0]} vs {teams_list[1]}"
-                    if href:
-                        urls.add((href, title))
-                    else:
-                        # If no href, use the parent link if available
-                        parent_link = element.find_parent('a')
-                        if parent_link and parent_link.get('href'):
-                            parent_href = parent_link['href']
-                            if parent_href.startswith('//'):
-                                parent_href = 'https:' + parent_href
-                            elif parent_href.startswith('/'):
-                                parent_href = urljoin(url, parent_href)
-                            if parent_href.startswith(('http://', 'https://')):
-                                urls.add((parent_href, title))
+                # Only add city if it's unique to this sport
+                is_city_unique = True
+                for other_sport, other_teams in sports_teams.items():
+                    if other_sport != sport:
+                        for other_team in other_teams:
+                            other_parts = other_team.split()
+                            if other_parts and other_parts[0].lower() == city:
+                                is_city_unique = False
+                                break
+                    if not is_city_unique:
+                        break
+                        
+                # Only add city as a variation if it's unique to this sport
+                if is_city_unique:
+                    team_variations_by_sport[sport][city] = team
+
+    # Known sites are read through their profile's event nodes; anything else gets the full scan
+    candidates = _profile_candidates(soup, url, get_site_profile(url))
+    if candidates is None:
+        candidates = _scan_candidates(soup, url)
+
+    for element, text, href in candidates:
+        # Combine text for searching, converted to lowercase
+        search_text = (text + ' ' + href).lower()
         
-        return sorted(list(urls))
-    except requests.RequestException as e:
-        return {"error": f"Error fetching the URL: {str(e)}"}
-    except Exception as e:
-        return {"error": f"An error occurred: {str(e)}"} 
\ No newline at end of file
+        # Find teams in the text for each sport separately
+        for sport, variations in team_variations_by_sport.items():
+            found_teams = set()
+            
+            # Match teams in this sport only
+            for variation, team in variations.items():
+                # Check if the team name appears as a whole word
+                # Use word boundaries or space checks to ensure we're matching whole words
+                pattern = r'\b' + re.escape(variation) + r'\b'
+                if re.search(pattern, search_text):
+                    found_teams.add(team)
+            
+            # Only process if we found at least two teams from the same sport
+            if len(found_teams) >= 2:
+                # Take the first two teams found
+                teams_list = sorted(list(found_teams))[:2]
+                title = f"{sport}: {teams_list[0]} vs {teams_list[1]}"
+                if href:
+                    urls.add((href, title))
+                else:
+                    # If no href, use the parent link if available
+                    parent_link = element.find_parent('a')
+                    if parent_link and parent_link.get('href'):
+                        parent_href = parent_link['href']
+                        if parent_href.startswith('//'):
+                            parent_href = 'https:' + parent_href
+                        elif parent_href.startswith('/'):
+                            parent_href = urljoin(url, parent_href)
+                        if parent_href.startswith(('http://', 'https://')):
+                            urls.add((parent_href, title))
+    
+    # Free the tree right away instead of waiting for the garbage collector
+    release_soup(soup)
+    
+    observe('ssa_url_scrape_seconds', time.perf_counter() - extract_started, stage='extract')
+    stage_finished(extract_memory, 'url_extract')
+    return sorted(list(urls))
@@ -0,0 +1,69 @@
+import threading
+import time
+from contextlib import contextmanager
+from .. import config
+from .metrics import inc, observe, set_gauge
+
+# Admission control for requests that have to go upstream.
+# Each (sport, source host) pair may have SSA_ADMISSION_MAX_CONCURRENT such requests in flight.
+# A request over the cap waits up to SSA_ADMISSION_WAIT seconds for one to finish, and is then
+# shed: the route answers from whatever is cached (marked stale) or with a fast 503, instead of
+# piling another blocked thread onto a slow upstream.
+
+# (sport, source) -> requests in flight
+_in_flight = {}
+_condition = threading.Condition()
+
+class Overloaded(Exception):
+    """Too many requests for this sport and source are already waiting on the upstream."""
+
+def _key_label(sport, source):
+    return f"{sport or '-'}:{source}"
+
+@contextmanager
+def admission(endpoint, sport, source):
+    """Hold an in-flight slot for (sport, source) around an upstream-bound request, or raise Overloaded."""
+    if not config.ADMISSION_CONTROL:
+        yield
+        return
+
+    key = (sport or '', source)
+    started = time.perf_counter()
+    deadline = time.monotonic() + config.ADMISSION_WAIT_SECONDS
+    with _condition:
+        while _in_flight.get(key, 0) >= config.ADMISSION_MAX_CONCURRENT:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                observe('ssa_admission_wait_seconds', time.perf_counter() - started, endpoint=endpoint, result='shed')
+                raise Overloaded(f"Too many requests in flight for {_key_label(sport, source)}")
+            _condition.wait(remaining)
+        _in_flight[key] = _in_flight.get(key, 0) + 1
+        set_gauge('ssa_admission_in_flight', sum(_in_flight.values()))
+    observe('ssa_admission_wait_seconds', time.perf_counter() - started, endpoint=endpoint, result='admitted')
+
+    try:
+        yield
+    finally:
+        with _condition:
+            _in_flight[key] -= 1
+            if not _in_flight[key]:
+                del _in_flight[key]
+            set_gauge('ssa_admission_in_flight', sum(_in_flight.values()))
+            _condition.notify_all()
+
+def record_shed(endpoint, result):
+    """Count a shed request by how it was answered: 'stale' (cached data) or 'rejected' (503)."""
+    inc('ssa_admission_shed_total', endpoint=endpoint, result=result)
+
+def retry_after():
+    """Retry-After header value for 503 responses."""
+    return str(max(int(config.RETRY_AFTER_SECONDS), 1))
+
+def admission_info():
+    """Report the requests in flight per sport and source."""
+    with _condition:
+        return {
+            'in_flight': {_key_label(*key): count for key, count in sorted(_in_flight.items())},
+            'max_concurrent': config.ADMISSION_MAX_CONCURRENT,
+            'wait_seconds': config.ADMISSION_WAIT_SECONDS
+        }
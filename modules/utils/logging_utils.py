@@ -0,0 +1,44 @@
+import logging
+import random
+import threading
+from .. import config
+
+# Per-thread sampling decision for the row currently being processed
+_row_state = threading.local()
+
+# Loggers that write debug output for every schedule row
+ROW_LOGGERS = (
+    'modules.scraper.game_time_scraper',
+    'modules.scraper.game_processors',
+    'modules.utils.team_utils'
+)
+
+class RowSampleFilter(logging.Filter):
+    """Drop per-row debug records for rows that weren't picked by the row sampling rate."""
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or not record.name.startswith(ROW_LOGGERS):
+            return True
+        return getattr(_row_state, 'sampled', True)
+
+def sample_row():
+    """Decide whether the debug logs of the row about to be processed are kept (SSA_LOG_ROW_SAMPLE_RATE)."""
+    # With sampling off (the default) this is a single comparison per row
+    if config.LOG_ROW_SAMPLE_RATE < 1.0:
+        _row_state.sampled = random.random() < config.LOG_ROW_SAMPLE_RATE
+
+def configure_logging():
+    """Set up the root handler and the per-module log levels from the config."""
+    logging.basicConfig(
+        level=config.LOG_LEVEL,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+
+    for name, level in config.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+
+    # Logger filters don't apply to child loggers, so sample at the handlers
+    if config.LOG_ROW_SAMPLE_RATE < 1.0:
+        row_filter = RowSampleFilter()
+        for handler in logging.getLogger().handlers:
+            handler.addFilter(row_filter)
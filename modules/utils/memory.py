@@ -0,0 +1,111 @@
+import gc
+import os
+import resource
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from .. import config
+from .metrics import observe
+
+# Per-stage memory accounting with tracemalloc (SSA_MEMORY_TRACKING)
+# tracemalloc's peak is process-wide, so under concurrent requests a stage's peak
+# includes whatever the other threads allocated at the same time
+
+def start_tracking():
+    """Start tracemalloc if memory tracking is enabled (called once at startup)."""
+    if config.MEMORY_TRACKING and not tracemalloc.is_tracing():
+        tracemalloc.start(config.MEMORY_TRACE_FRAMES)
+
+def stage_started():
+    """Note the traced memory at the start of a stage; returns None when tracking is off."""
+    if not config.MEMORY_TRACKING or not tracemalloc.is_tracing():
+        return None
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    return current
+
+def stage_finished(started, stage, sport=''):
+    """Record the peak and retained bytes of a stage begun with stage_started()."""
+    if started is None:
+        return
+    current, peak = tracemalloc.get_traced_memory()
+    observe('ssa_stage_peak_bytes', max(peak - started, 0), stage=stage, sport=sport)
+    observe('ssa_stage_retained_bytes', max(current - started, 0), stage=stage, sport=sport)
+
+@contextmanager
+def tracked(stage, sport=''):
+    """Record the peak and retained bytes of the enclosed block."""
+    started = stage_started()
+    try:
+        yield
+    finally:
+        stage_finished(started, stage, sport)
+
+def release_soup(soup):
+    """Tear down a parsed tree so it is freed right away instead of by the cyclic garbage collector."""
+    # BeautifulSoup.decompose() walks the tree from the root's next_element, which html.parser
+    # leaves unset, so decompose from the top-level nodes instead
+    for node in list(soup.contents):
+        if hasattr(node, 'decompose'):
+            node.decompose()
+        else:
+            node.extract()
+    soup.decompose()
+
+def _rss_bytes():
+    """Current resident set size, where /proc is available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _peak_rss_bytes():
+    """Peak resident set size of the process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def deep_size(obj, seen=None):
+    """Approximate the bytes held by a structure of dicts, lists and scalars."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    return size
+
+def object_counts(limit=20):
+    """Count live objects tracked by the garbage collector, by type."""
+    counts = {}
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        counts[name] = counts.get(name, 0) + 1
+    return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit])
+
+def memory_report(caches=None, top=10):
+    """Describe process memory, tracemalloc state, cache sizes and live object counts."""
+    report = {
+        'rss_bytes': _rss_bytes(),
+        'peak_rss_bytes': _peak_rss_bytes(),
+        'tracemalloc': {'tracing': tracemalloc.is_tracing()},
+        'caches': caches or {},
+        'objects': object_counts()
+    }
+
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        report['tracemalloc'].update({
+            'current_bytes': current,
+            'peak_bytes': peak,
+            'top_allocations': [
+                {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+                for stat in tracemalloc.take_snapshot().statistics('lineno')[:top]
+            ]
+        })
+    return report
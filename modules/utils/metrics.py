@@ -0,0 +1,246 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from .. import config
+
+# In-process metrics exported in the Prometheus text format on /metrics
+
+# Latency buckets in seconds - from sub-millisecond row work up to slow ESPN downloads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> {'type', 'help', 'labels', 'buckets'}
+_definitions = {}
+
+# name -> {label values tuple -> value}; for histograms the value is [bucket counts, sum, count]
+_values = {}
+_lock = threading.Lock()
+
+def _define(name, metric_type, help_text, labels=(), buckets=None):
+    """Declare a metric so it is listed on /metrics even before it is first recorded."""
+    _definitions[name] = {
+        'type': metric_type,
+        'help': help_text,
+        'labels': tuple(labels),
+        'buckets': tuple(buckets) if buckets else None
+    }
+    _values[name] = {}
+
+# Schedule scraping (game_time_scraper.py)
+_define('ssa_stage_seconds', 'histogram',
+        'Time spent in each schedule scraping stage (download, parse, rows, team_resolution, serialize, pool_parse, pool_ipc)',
+        labels=('stage', 'sport'), buckets=DEFAULT_BUCKETS)
+_define('ssa_schedule_fetches_total', 'counter',
+        'ESPN schedule downloads by outcome',
+        labels=('sport', 'result'))
+_define('ssa_rows_total', 'counter',
+        'Schedule rows walked, by whether they yielded a game record or were skipped',
+        labels=('sport', 'outcome'))
+_define('ssa_games_found_total', 'counter',
+        'Games found across all schedule parses',
+        labels=('sport',))
+
+# Memory per stage, recorded only with SSA_MEMORY_TRACKING (see memory.py)
+BYTE_BUCKETS = (64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2, 256 * 1024 ** 2)
+_define('ssa_stage_peak_bytes', 'histogram',
+        'Peak traced memory above the stage start, per scraping stage',
+        labels=('stage', 'sport'), buckets=BYTE_BUCKETS)
+_define('ssa_stage_retained_bytes', 'histogram',
+        'Traced memory still held when a scraping stage ends',
+        labels=('stage', 'sport'), buckets=BYTE_BUCKETS)
+
+# Caches
+_define('ssa_schedule_cache_total', 'counter',
+        'Schedule cache lookups by the source of the entry served (live, snapshot, shared or none) and result (hit, stale, miss)',
+        labels=('sport', 'source', 'result'))
+_define('ssa_section_cache_total', 'counter',
+        'Parsed section and row cache lookups',
+        labels=('sport', 'kind', 'result'))
+_define('ssa_url_cache_total', 'counter',
+        'get_all_urls cache lookups, per page URL within the TTL (ttl), in the shared cache (shared) and by page content (content)',
+        labels=('layer', 'result'))
+
+# Link-to-game matching (game_matcher.py)
+_define('ssa_game_matches_total', 'counter',
+        'Distinct link titles resolved to a schedule entry (matched) or not (unmatched)',
+        labels=('result',))
+
+# URL extraction (url_scraper.py)
+_define('ssa_url_scrape_seconds', 'histogram',
+        'Time spent in each get_all_urls stage (download, parse, extract, pool_parse, pool_ipc)',
+        labels=('stage',), buckets=DEFAULT_BUCKETS)
+_define('ssa_urls_found_total', 'counter',
+        'Event URLs returned by get_all_urls')
+_define('ssa_url_extractions_total', 'counter',
+        'Page extractions by how event nodes were found (profile, profile_fallback, scan)',
+        labels=('mode',))
+
+# Downloads (fetch.py)
+_define('ssa_page_encoding_total', 'counter',
+        'Where the encoding of each downloaded page came from (header, bom, meta, host_cache, detected)',
+        labels=('source',))
+_define('ssa_fetch_early_stops_total', 'counter',
+        'Downloads stopped once the part of the page the parser needs had arrived')
+_define('ssa_fetch_aborted_total', 'counter',
+        'Downloads abandoned for exceeding the size limit or the read deadline',
+        labels=('reason',))
+_define('ssa_host_circuit_total', 'counter',
+        'Per-host circuit breaker events (opened, rejected, probe_ok, probe_failed)',
+        labels=('event',))
+
+# Background jobs (jobs/job_queue.py)
+_define('ssa_jobs_total', 'counter',
+        'Background job events (submitted, deduplicated, rejected, done, error)',
+        labels=('kind', 'event'))
+_define('ssa_job_seconds', 'histogram',
+        'Time background jobs spent waiting in the queue (queued) and running (run)',
+        labels=('kind', 'stage'), buckets=DEFAULT_BUCKETS)
+
+# Priority classes for upstream fetches and parsing (priority.py)
+_define('ssa_priority_active', 'gauge',
+        'Work currently holding a slot, per gate (fetch, parse) and priority class',
+        labels=('gate', 'class'))
+_define('ssa_priority_waiting', 'gauge',
+        'Work queued for a slot, per gate (fetch, parse) and priority class',
+        labels=('gate', 'class'))
+_define('ssa_priority_wait_seconds', 'histogram',
+        'Time spent waiting for a slot, per gate and priority class',
+        labels=('gate', 'class'), buckets=DEFAULT_BUCKETS)
+
+# Admission control (admission.py)
+_define('ssa_admission_in_flight', 'gauge',
+        'Upstream-bound requests currently admitted')
+_define('ssa_admission_wait_seconds', 'histogram',
+        'Time requests waited for admission, by whether they were admitted or shed',
+        labels=('endpoint', 'result'), buckets=DEFAULT_BUCKETS)
+_define('ssa_admission_shed_total', 'counter',
+        'Requests shed by admission control, answered from stale cache (stale) or with a 503 (rejected)',
+        labels=('endpoint', 'result'))
+
+# Cache shared between worker processes (shared_store.py)
+_define('ssa_shared_cache_total', 'counter',
+        'Shared cache operations by operation (get, set, delete, cas, lock, renew, unlock) and result',
+        labels=('op', 'result'))
+
+# JSON encoding and compression (serialization.py)
+_define('ssa_json_fragment_cache_total', 'counter',
+        'Lookups of encoded schedules reused across responses',
+        labels=('result',))
+_define('ssa_response_compression_total', 'counter',
+        'Compressed responses by encoding, and whether the body was compressed or found already compressed (cached)',
+        labels=('encoding', 'result'))
+
+# Routes
+_define('ssa_http_request_seconds', 'histogram',
+        'End-to-end request latency by endpoint and status code',
+        labels=('endpoint', 'status'), buckets=DEFAULT_BUCKETS)
+
+def _label_key(name, labels):
+    """Order label values the way the metric declares them."""
+    return tuple(str(labels.get(label, '')) for label in _definitions[name]['labels'])
+
+def inc(name, amount=1, **labels):
+    """Add to a counter."""
+    if not config.METRICS_ENABLED:
+        return
+    key = _label_key(name, labels)
+    with _lock:
+        series = _values[name]
+        series[key] = series.get(key, 0) + amount
+
+def set_gauge(name, value, **labels):
+    """Set a gauge to its current value."""
+    if not config.METRICS_ENABLED:
+        return
+    key = _label_key(name, labels)
+    with _lock:
+        _values[name][key] = value
+
+def observe(name, value, **labels):
+    """Record one observation in a histogram."""
+    if not config.METRICS_ENABLED:
+        return
+    key = _label_key(name, labels)
+    buckets = _definitions[name]['buckets']
+    with _lock:
+        series = _values[name]
+        state = series.get(key)
+        if state is None:
+            state = series[key] = [[0] * len(buckets), 0.0, 0]
+        # Store per-bucket counts; they are made cumulative when rendered
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                state[0][i] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+@contextmanager
+def timed(name, **labels):
+    """Time the enclosed block into a histogram, including when it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+def _format_number(value):
+    """Format a sample value the way Prometheus expects."""
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+def _format_labels(names, values, extra=None):
+    """Render a {name="value",...} label set, escaping values."""
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = []
+    for label, value in pairs:
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{label}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+def render_metrics():
+    """Render every metric in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for name, definition in _definitions.items():
+            lines.append(f"# HELP {name} {definition['help']}")
+            lines.append(f"# TYPE {name} {definition['type']}")
+            label_names = definition['labels']
+
+            for key, value in sorted(_values[name].items()):
+                if definition['type'] != 'histogram':
+                    lines.append(f"{name}{_format_labels(label_names, key)} {_format_number(value)}")
+                    continue
+
+                bucket_counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(definition['buckets'], bucket_counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(label_names, key, ('le', _format_number(float(bound))))
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(label_names, key, ('le', '+Inf'))} {count}")
+                lines.append(f"{name}_sum{_format_labels(label_names, key)} {_format_number(total)}")
+                lines.append(f"{name}_count{_format_labels(label_names, key)} {count}")
+    return '\n'.join(lines) + '\n'
+
+def histogram_totals(name):
+    """Return (labels dict, sum, count) for every series of a histogram."""
+    label_names = _definitions[name]['labels']
+    with _lock:
+        return [
+            (dict(zip(label_names, key)), state[1], state[2])
+            for key, state in _values[name].items()
+        ]
+
+def reset_metrics():
+    """Clear all recorded values (used by the test scripts)."""
+    with _lock:
+        for series in _values.values():
+            series.clear()
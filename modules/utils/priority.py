@@ -0,0 +1,112 @@
+import threading
+import time
+from contextlib import contextmanager
+from .. import config
+from .metrics import set_gauge, observe
+
+# Priority classes for the shared upstream connections and parse capacity, highest first:
+#   interactive - work a user is waiting on (requests, jobs); the default for every thread
+#   refresh     - background revalidation of cached schedules
+#   backfill    - speculative work that should only use idle capacity
+# Each gate gives every class its own concurrency limit. A class may only start while no higher
+# class is waiting for the same gate, so background work is deferred as soon as user requests
+# queue up, and backfill additionally waits until no higher class is running at all.
+PRIORITY_CLASSES = ('interactive', 'refresh', 'backfill')
+
+# The class of the work running on this thread
+_current = threading.local()
+
+def current_priority():
+    """The priority class of the current thread's work."""
+    return getattr(_current, 'name', 'interactive')
+
+@contextmanager
+def priority(name):
+    """Run the enclosed block in a priority class (threads started inside it don't inherit it)."""
+    if name not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority class: {name}")
+    previous = current_priority()
+    _current.name = name
+    try:
+        yield
+    finally:
+        _current.name = previous
+
+class PriorityGate:
+    """Per-class concurrency limits for one kind of work, with higher classes served first."""
+
+    def __init__(self, name, limits):
+        self.name = name
+        # Read through a function so limits changed in config (e.g. by test scripts) apply at once
+        self._limits = limits
+        self._condition = threading.Condition()
+        self._active = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self._waiting = dict.fromkeys(PRIORITY_CLASSES, 0)
+
+    def _may_start(self, name):
+        """Whether work of a class can take a slot now; call with the condition held."""
+        if self._active[name] >= max(self._limits()[name], 1):
+            return False
+        higher = PRIORITY_CLASSES[:PRIORITY_CLASSES.index(name)]
+        if any(self._waiting[c] for c in higher):
+            return False
+        if name == 'backfill' and any(self._active[c] for c in higher):
+            return False
+        return True
+
+    def _report(self, name):
+        """Publish a class's active and waiting counts; call with the condition held."""
+        set_gauge('ssa_priority_active', self._active[name], gate=self.name, **{'class': name})
+        set_gauge('ssa_priority_waiting', self._waiting[name], gate=self.name, **{'class': name})
+
+    @contextmanager
+    def slot(self, name=None):
+        """Hold one of the gate's slots for the enclosed block, waiting for the class's turn."""
+        name = name or current_priority()
+        started = time.perf_counter()
+        with self._condition:
+            self._waiting[name] += 1
+            self._report(name)
+            try:
+                while not self._may_start(name):
+                    self._condition.wait()
+            finally:
+                self._waiting[name] -= 1
+                # Lower classes may have been held back by this waiter
+                self._condition.notify_all()
+            self._active[name] += 1
+            self._report(name)
+        observe('ssa_priority_wait_seconds', time.perf_counter() - started, gate=self.name, **{'class': name})
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active[name] -= 1
+                self._report(name)
+                self._condition.notify_all()
+
+    def info(self):
+        """Report the active and waiting work and the limit per class."""
+        with self._condition:
+            limits = self._limits()
+            return {
+                name: {'active': self._active[name], 'waiting': self._waiting[name], 'limit': limits[name]}
+                for name in PRIORITY_CLASSES
+            }
+
+# Upstream downloads (fetch_page) and page parsing (schedules and stream index pages)
+fetch_gate = PriorityGate('fetch', lambda: {
+    'interactive': config.FETCH_LIMIT_INTERACTIVE,
+    'refresh': config.FETCH_LIMIT_REFRESH,
+    'backfill': config.FETCH_LIMIT_BACKFILL
+})
+parse_gate = PriorityGate('parse', lambda: {
+    'interactive': config.PARSE_LIMIT_INTERACTIVE,
+    'refresh': config.PARSE_LIMIT_REFRESH,
+    'backfill': config.PARSE_LIMIT_BACKFILL
+})
+
+def priority_info():
+    """Report the active and waiting work per class for both gates."""
+    return {'fetch': fetch_gate.info(), 'parse': parse_gate.info()}
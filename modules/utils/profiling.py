@@ -0,0 +1,83 @@
+import cProfile
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from urllib.parse import urlparse
+from .. import config
+
+logger = logging.getLogger(__name__)
+
+# Upstream pages downloaded by the request currently being profiled on this thread
+_capture = threading.local()
+
+def is_profile_token(token):
+    """Check a request's profiling token against SSA_PROFILE_TOKEN."""
+    if not config.PROFILE_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode('utf-8'), config.PROFILE_TOKEN.encode('utf-8'))
+
+def is_capturing():
+    """Whether the current request is being profiled, so callers can skip building page copies otherwise."""
+    return getattr(_capture, 'pages', None) is not None
+
+def record_upstream_page(url, html, sport=None):
+    """Keep a copy of a downloaded page when the current request is being profiled."""
+    pages = getattr(_capture, 'pages', None)
+    if pages is not None:
+        pages.append({'url': url, 'sport': sport, 'html': html})
+
+def _slug(text):
+    """Make text safe to use in a file name."""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', text).strip('-') or 'page'
+
+def _save_profile(name, profiler, pages, elapsed, context):
+    """Write the profile, a text summary and the captured pages to a new directory under SSA_PROFILE_DIR."""
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{_slug(name)}-{int(time.time() * 1000) % 1000:03d}"
+    profile_dir = os.path.join(config.PROFILE_DIR, profile_id)
+    os.makedirs(os.path.join(profile_dir, 'pages'))
+
+    # Binary stats for pstats/snakeviz, plus the top functions as text
+    profiler.dump_stats(os.path.join(profile_dir, 'profile.prof'))
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(60)
+    with open(os.path.join(profile_dir, 'profile.txt'), 'w', encoding='utf-8') as f:
+        f.write(summary.getvalue())
+
+    # Raw upstream HTML, so the slow case can be replayed offline (TestScripts/benchmark.py --capture)
+    manifest_pages = []
+    for i, page in enumerate(pages, start=1):
+        file_name = f"{i:02d}-{_slug(urlparse(page['url']).netloc + urlparse(page['url']).path)}.html"
+        with open(os.path.join(profile_dir, 'pages', file_name), 'w', encoding='utf-8') as f:
+            f.write(page['html'])
+        manifest_pages.append({'url': page['url'], 'sport': page['sport'], 'file': f"pages/{file_name}"})
+
+    manifest = dict(context, name=name, elapsed_seconds=round(elapsed, 4),
+                    captured_at=time.strftime('%Y-%m-%dT%H:%M:%S'), pages=manifest_pages)
+    with open(os.path.join(profile_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return profile_id
+
+def run_profiled(name, func, **context):
+    """Run func under cProfile, capturing its upstream pages; returns (result, profile id)."""
+    profiler = cProfile.Profile()
+    _capture.pages = []
+    started = time.perf_counter()
+    try:
+        result = profiler.runcall(func)
+    finally:
+        elapsed = time.perf_counter() - started
+        pages, _capture.pages = _capture.pages, None
+
+    profile_id = None
+    try:
+        profile_id = _save_profile(name, profiler, pages, elapsed, context)
+        logger.info("Saved profile %s (%.3fs, %s upstream pages)", profile_id, elapsed, len(pages))
+    except Exception as e:
+        logger.warning("Error saving profile for %s: %s", name, e)
+    return result, profile_id
@@ -0,0 +1,180 @@
+import gzip
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from .. import config
+from .metrics import inc
+
+# JSON encoding and response compression for large payloads (full game_times run to hundreds of KB).
+# - dumps() uses orjson when it is installed (SSA_FAST_JSON), else the standard library, with
+#   sorted keys and compact separators either way, like Flask's jsonify
+# - JSONFragment holds already-encoded JSON that dumps() splices in verbatim, so a schedule is
+#   encoded once per version (cached_fragment) and reused by every response that includes it
+# - compress() gzip- or brotli-encodes a body, caching the result by body digest, so identical
+#   responses are compressed once
+#
+# orjson and brotli are optional; without them everything still works, only slower or with gzip only.
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class JSONFragment:
+    """Pre-encoded JSON bytes to be written as-is wherever this object appears in a payload."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+# Placeholders for fragments while the rest of a payload is encoded; the random part keeps them from
+# colliding with real strings
+_PLACEHOLDER = f"ssa-fragment-{uuid.uuid4().hex}-"
+
+# (key) -> JSONFragment, most recently used last
+_fragments = OrderedDict()
+
+# (body digest, encoding) -> compressed body, most recently used last
+_compressed = OrderedDict()
+_lock = threading.Lock()
+
+def fast_json_available():
+    """Whether dumps() is using orjson."""
+    return orjson is not None and config.FAST_JSON
+
+def available_encodings():
+    """Content codings compress() supports here, preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def dumps(obj, default=None):
+    """Encode obj as compact JSON bytes with sorted keys, splicing in any JSONFragment values.
+
+    `default` converts other unsupported types, as for json.dumps (Flask passes its own).
+    """
+    fragments = []
+
+    def convert(value):
+        if isinstance(value, JSONFragment):
+            fragments.append(value.data)
+            return f"{_PLACEHOLDER}{len(fragments) - 1}"
+        if default is not None:
+            return default(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    data = None
+    if fast_json_available():
+        try:
+            # Datetimes go through `default` too, so they come out as they would from the standard library path
+            data = orjson.dumps(obj, default=convert, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            # e.g. integers over 64 bits - let the standard library have a go
+            fragments.clear()
+    if data is None:
+        data = json.dumps(obj, default=convert, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    for i, fragment in enumerate(fragments):
+        data = data.replace(f'"{_PLACEHOLDER}{i}"'.encode('ascii'), fragment, 1)
+    return data
+
+def fragment_default(default=None):
+    """A json.dumps `default` that decodes JSONFragment values, for output dumps() can't produce (indented JSON)."""
+    def convert(value):
+        if isinstance(value, JSONFragment):
+            return json.loads(value.data)
+        if default is not None:
+            return default(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return convert
+
+def cached_fragment(key, build):
+    """Return the JSONFragment for key, encoding build() on first use.
+
+    Keys must change whenever the data does - e.g. include the schedule version (its fetch time).
+    """
+    with _lock:
+        fragment = _fragments.get(key)
+        if fragment is not None:
+            _fragments.move_to_end(key)
+    inc('ssa_json_fragment_cache_total', result='miss' if fragment is None else 'hit')
+    if fragment is not None:
+        return fragment
+
+    fragment = JSONFragment(dumps(build()))
+    with _lock:
+        _fragments[key] = fragment
+        while len(_fragments) > config.JSON_FRAGMENT_CACHE_MAX_ENTRIES:
+            _fragments.popitem(last=False)
+    return fragment
+
+def choose_encoding(accept_encoding):
+    """Pick the content coding to use for an Accept-Encoding header, or None for the identity."""
+    offered = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        offered[name] = quality
+
+    best = None
+    for encoding in available_encodings():
+        quality = offered.get(encoding, offered.get('*', 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+def compress(body, encoding):
+    """Compress a response body with 'gzip' or 'br', reusing the result for an identical body."""
+    key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+    with _lock:
+        data = _compressed.get(key)
+        if data is not None:
+            _compressed.move_to_end(key)
+    inc('ssa_response_compression_total', encoding=encoding, result='cached' if data is not None else 'compressed')
+    if data is not None:
+        return data
+
+    if encoding == 'br':
+        data = brotli.compress(body, quality=config.BROTLI_QUALITY)
+    else:
+        # mtime=0 so the same body always compresses to the same bytes
+        data = gzip.compress(body, compresslevel=config.GZIP_LEVEL, mtime=0)
+    with _lock:
+        _compressed[key] = data
+        while len(_compressed) > config.COMPRESS_CACHE_MAX_ENTRIES:
+            _compressed.popitem(last=False)
+    return data
+
+def clear_serialization_caches():
+    """Drop the cached fragments and compressed bodies (used by the test scripts)."""
+    with _lock:
+        _fragments.clear()
+        _compressed.clear()
+
+def serialization_info():
+    """Report the JSON library and encodings in use and the sizes of the caches."""
+    with _lock:
+        return {
+            'json': 'orjson' if fast_json_available() else 'json',
+            'encodings': list(available_encodings()) if config.COMPRESSION else [],
+            'fragments': len(_fragments),
+            'fragment_bytes': sum(len(fragment.data) for fragment in _fragments.values()),
+            'compressed_bodies': len(_compressed),
+            'compressed_bytes': sum(len(data) for data in _compressed.values())
+        }
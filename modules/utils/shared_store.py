@@ -0,0 +1,431 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import urlparse, unquote
+from .. import config
+from .metrics import inc
+
+logger = logging.getLogger(__name__)
+
+# Cache shared by all worker processes (and, with Redis, all nodes), so schedules and stream page
+# extractions are fetched once rather than once per worker or node. Values are bytes; callers
+# serialize. SSA_SHARED_CACHE picks the backend: '' (off, each process keeps its own caches),
+# 'memory' (this process only, for tests), 'sqlite' (a database file on local disk) or 'redis'
+# (any server speaking the Redis protocol). Other backends can be added with register_backend().
+#
+# Besides TTLs, backends provide compare-and-set, which callers use to publish a new version only
+# over the one they started from, and leases: locks with a TTL, renewable by their holder and
+# released only with the holder's token, so one process refreshes a key while the others wait.
+#
+# Backend errors never fail a request: reads become misses, writes are skipped and locks are
+# granted, so each process carries on with its own in-memory caches as if sharing were off.
+
+class SharedStoreError(Exception):
+    """The shared cache backend could not be reached or answered with an error."""
+
+class SharedBackend:
+    """What a shared cache backend provides. Keys are strings, values bytes, TTLs seconds (None: no expiry).
+
+    Locks are leases built on compare-and-set: a lock is the key 'lock:<name>' holding the holder's
+    token, so backends only implement the five key operations.
+    """
+
+    def get(self, key):
+        """Return a key's value, or None when it is missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        """Set a key only if it holds `expected` (None: only if missing), returning whether it was set."""
+        raise NotImplementedError
+
+    def compare_and_delete(self, key, expected):
+        """Delete a key only if it holds `expected`, returning whether it was deleted."""
+        raise NotImplementedError
+
+    def acquire_lock(self, name, ttl):
+        """Take a lease on a lock for ttl seconds, returning its token, or None if someone else holds it."""
+        token = uuid.uuid4().hex.encode('ascii')
+        return token if self.compare_and_set(f"lock:{name}", None, token, ttl) else None
+
+    def renew_lock(self, name, token, ttl):
+        """Extend a lease to ttl seconds from now, returning False if it has expired or passed to someone else."""
+        return self.compare_and_set(f"lock:{name}", token, token, ttl)
+
+    def release_lock(self, name, token):
+        """Release a lease, unless it has already passed to someone else."""
+        self.compare_and_delete(f"lock:{name}", token)
+
+class MemoryBackend(SharedBackend):
+    """Shared cache in this process's memory - for a single process and the test scripts."""
+
+    def __init__(self):
+        # key -> (value, expires_at or None)
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _current(self, key):
+        """A key's live value; call with the lock held."""
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self._data[key]
+            entry = None
+        return None if entry is None else entry[0]
+
+    def get(self, key):
+        with self._lock:
+            return self._current(key)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        with self._lock:
+            if self._current(key) != expected:
+                return False
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+            return True
+
+    def compare_and_delete(self, key, expected):
+        with self._lock:
+            if self._current(key) != expected:
+                return False
+            del self._data[key]
+            return True
+
+class SQLiteBackend(SharedBackend):
+    """Shared cache in a SQLite database file, for worker processes on one machine."""
+
+    def __init__(self, path):
+        self.path = path
+        # sqlite3 connections can't cross threads or forks, so each thread of each process opens its own
+        self._local = threading.local()
+        self._purged_at = time.monotonic()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._run("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)")
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=config.SHARED_CACHE_TIMEOUT_SECONDS, isolation_level=None)
+            # WAL lets readers in other processes carry on while one process writes
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _run(self, sql, params=()):
+        try:
+            return self._connect().execute(sql, params)
+        except sqlite3.Error as e:
+            raise SharedStoreError(str(e)) from e
+
+    def _select(self, db, key):
+        row = db.execute("SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                         (key, time.time())).fetchone()
+        return bytes(row[0]) if row else None
+
+    def _compare(self, key, expected, write):
+        """Run write(db) if key holds expected, in one transaction, returning whether it ran."""
+        try:
+            db = self._connect()
+            # IMMEDIATE takes the write lock up front, so the read and the write are atomic across processes
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                matched = self._select(db, key) == expected
+                if matched:
+                    write(db)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            raise SharedStoreError(str(e)) from e
+        return matched
+
+    def get(self, key):
+        try:
+            return self._select(self._connect(), key)
+        except sqlite3.Error as e:
+            raise SharedStoreError(str(e)) from e
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        self._run("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at))
+        self._maybe_purge()
+
+    def delete(self, key):
+        self._run("DELETE FROM cache WHERE key = ?", (key,))
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        written = self._compare(key, expected, lambda db: db.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at)))
+        self._maybe_purge()
+        return written
+
+    def compare_and_delete(self, key, expected):
+        return self._compare(key, expected, lambda db: db.execute("DELETE FROM cache WHERE key = ?", (key,)))
+
+    def purge_expired(self):
+        """Delete expired keys (reads already skip them)."""
+        self._purged_at = time.monotonic()
+        self._run("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def _maybe_purge(self):
+        """Purge expired keys after a write, at most once every SSA_SHARED_CACHE_PURGE_INTERVAL seconds."""
+        if time.monotonic() - self._purged_at < config.SHARED_CACHE_PURGE_INTERVAL_SECONDS:
+            return
+        try:
+            self.purge_expired()
+        except SharedStoreError as e:
+            # The write itself went through; the next one tries again
+            logger.debug("Purging the shared cache failed: %s", e)
+
+# Lua scripts run atomically by the Redis server. ARGV[1] is '1' when the key must be missing
+COMPARE_AND_SET_SCRIPT = """local current = redis.call('get', KEYS[1])
+if ARGV[1] == '1' then if current then return 0 end elseif current ~= ARGV[2] then return 0 end
+if tonumber(ARGV[4]) > 0 then redis.call('set', KEYS[1], ARGV[3], 'PX', ARGV[4]) else redis.call('set', KEYS[1], ARGV[3]) end
+return 1"""
+COMPARE_AND_DELETE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+class RedisBackend(SharedBackend):
+    """Shared cache on a Redis-protocol server (redis://[:password@]host[:port][/db]), for several nodes."""
+
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            sock = socket.create_connection((self.host, self.port), timeout=config.SHARED_CACHE_TIMEOUT_SECONDS)
+            conn = (sock, sock.makefile('rb'))
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            if self.password:
+                self._call('AUTH', self.password)
+            if self.db:
+                self._call('SELECT', self.db)
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn[0].close()
+            except OSError:
+                pass
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise SharedStoreError("Connection closed by the Redis server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b'+':
+            return body.decode('utf-8')
+        if kind == b'-':
+            raise SharedStoreError(body.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(body)
+        if kind == b'$':
+            length = int(body)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(body)
+            return None if count < 0 else [self._read_reply(reader) for _ in range(count)]
+        raise SharedStoreError(f"Unexpected reply from the Redis server: {line[:40]!r}")
+
+    def _call(self, *args):
+        """Send one command and return its reply."""
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        try:
+            sock, reader = self._connection()
+            sock.sendall(b''.join(parts))
+            return self._read_reply(reader)
+        except OSError as e:
+            # The connection may be half-used now - start a new one next time
+            self._reset()
+            raise SharedStoreError(str(e)) from e
+
+    def get(self, key):
+        return self._call('GET', key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self._call('SET', key, value, 'PX', int(ttl * 1000))
+        else:
+            self._call('SET', key, value)
+
+    def delete(self, key):
+        self._call('DEL', key)
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        missing = b'1' if expected is None else b'0'
+        ttl_ms = int(ttl * 1000) if ttl else 0
+        return self._call('EVAL', COMPARE_AND_SET_SCRIPT, 1, key, missing, expected or b'', value, ttl_ms) == 1
+
+    def compare_and_delete(self, key, expected):
+        return self._call('EVAL', COMPARE_AND_DELETE_SCRIPT, 1, key, expected) == 1
+
+    def acquire_lock(self, name, ttl):
+        # SET NX is a single round trip, no script needed
+        token = uuid.uuid4().hex.encode('ascii')
+        acquired = self._call('SET', f"lock:{name}", token, 'NX', 'PX', int(ttl * 1000))
+        return token if acquired == 'OK' else None
+
+# Token for locks granted without asking a backend
+LOCAL_TOKEN = 'local'
+
+# SSA_SHARED_CACHE name -> function building that backend from config (see register_backend)
+BACKENDS = {
+    'memory': lambda: MemoryBackend(),
+    'sqlite': lambda: SQLiteBackend(config.SHARED_CACHE_PATH),
+    'redis': lambda: RedisBackend(config.REDIS_URL)
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def register_backend(name, factory):
+    """Make another SharedBackend implementation selectable with SSA_SHARED_CACHE=<name>."""
+    BACKENDS[name] = factory
+
+def get_backend():
+    """Return the configured backend, creating it on first use, or None when sharing is off."""
+    global _backend
+    if not config.SHARED_CACHE:
+        return None
+    with _backend_lock:
+        if _backend is None:
+            factory = BACKENDS.get(config.SHARED_CACHE)
+            if factory is None:
+                raise ValueError(f"Unknown SSA_SHARED_CACHE backend: {config.SHARED_CACHE}")
+            _backend = factory()
+            logger.info("Using the %s shared cache", config.SHARED_CACHE)
+        return _backend
+
+def _call(op, func, *args):
+    """Run a backend operation, returning (ok, result); failures are logged and counted, never raised."""
+    try:
+        # Building the backend can fail too (an unwritable directory, an unknown backend name)
+        backend = get_backend()
+        if backend is None:
+            return False, None
+        result = getattr(backend, func)(*args)
+    except (SharedStoreError, OSError, ValueError) as e:
+        inc('ssa_shared_cache_total', op=op, result='error')
+        logger.warning("Shared cache %s failed: %s", op, e)
+        return False, None
+    return True, result
+
+def shared_get(key):
+    """Read a value from the shared cache, or None."""
+    ok, value = _call('get', 'get', key)
+    if ok:
+        inc('ssa_shared_cache_total', op='get', result='hit' if value is not None else 'miss')
+    return value
+
+def shared_set(key, value, ttl=None):
+    """Write a value to the shared cache, expiring after ttl seconds if given."""
+    ok, _ = _call('set', 'set', key, value, ttl)
+    if ok:
+        inc('ssa_shared_cache_total', op='set', result='ok')
+    return ok
+
+def shared_delete(key):
+    """Remove a value from the shared cache."""
+    _call('delete', 'delete', key)
+
+def compare_and_set(key, expected, value, ttl=None):
+    """Write a value only if the key still holds `expected` (None: only if missing); return whether it was written."""
+    ok, written = _call('cas', 'compare_and_set', key, expected, value, ttl)
+    if ok:
+        inc('ssa_shared_cache_total', op='cas', result='ok' if written else 'conflict')
+    return bool(written)
+
+def acquire_lock(name, ttl=None):
+    """Take a lease on a cross-process lock, returning its token, or None if another process holds it.
+
+    Without a shared cache (or when it can't be reached) every caller gets a token, since there is
+    no other process to agree with. Leases expire after ttl seconds (default SSA_SHARED_LOCK_TTL)
+    so a crashed holder can't block the others.
+    """
+    if not config.SHARED_CACHE:
+        return LOCAL_TOKEN
+    ok, token = _call('lock', 'acquire_lock', name, ttl or config.SHARED_LOCK_TTL_SECONDS)
+    if not ok:
+        return LOCAL_TOKEN
+    inc('ssa_shared_cache_total', op='lock', result='acquired' if token else 'busy')
+    return token
+
+def renew_lock(name, token, ttl=None):
+    """Extend a lease, returning False if it expired and another process may have taken the lock."""
+    if not config.SHARED_CACHE or token == LOCAL_TOKEN:
+        return True
+    ok, renewed = _call('renew', 'renew_lock', name, token, ttl or config.SHARED_LOCK_TTL_SECONDS)
+    if not ok:
+        return True
+    inc('ssa_shared_cache_total', op='renew', result='ok' if renewed else 'lost')
+    return renewed
+
+def release_lock(name, token):
+    """Release a lease taken with acquire_lock (a no-op if it has already passed to someone else)."""
+    if not config.SHARED_CACHE or token in (None, LOCAL_TOKEN):
+        return
+    _call('unlock', 'release_lock', name, token)
+
+def wait_for(lookup, timeout, interval=0.1):
+    """Call lookup() until it returns something other than None or timeout seconds pass; return its last result."""
+    deadline = time.monotonic() + timeout
+    while True:
+        result = lookup()
+        if result is not None or time.monotonic() >= deadline:
+            return result
+        time.sleep(interval)
+
+def reset_backend():
+    """Forget the backend instance so the next call builds it from config again (used by the test scripts)."""
+    global _backend
+    with _backend_lock:
+        _backend = None
+
+def shared_cache_info():
+    """Report which shared cache backend this process uses, and where."""
+    info = {'backend': config.SHARED_CACHE or None, 'pid': os.getpid()}
+    if config.SHARED_CACHE == 'redis':
+        # Without the password
+        parsed = urlparse(config.REDIS_URL)
+        info['location'] = f"redis://{parsed.hostname or '127.0.0.1'}:{parsed.port or 6379}{parsed.path or ''}"
+    elif config.SHARED_CACHE == 'sqlite':
+        info['location'] = config.SHARED_CACHE_PATH
+    return info
@@ -1,3 +1,7 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
 # Dictionary of sports and their teams
 SPORTS_TEAMS = {
     'NBA': {
@@ -139,7 +143,7 @@ def get_official_team_name(sport, team_name):
         # Check for direct abbreviation matches (case insensitive)
         for abbr, full_name in ESPN_ABBREVIATIONS['MLB'].items():
             if team_name_clean.upper() == abbr:
-                print(f"Matched MLB abbreviation: {abbr} -> {full_name}")
+                logger.debug("Matched MLB abbreviation: %s -> %s", abbr, full_name)
                 return full_name
         
         # Special handling for Toronto Blue Jays
@@ -156,7 +160,7 @@ def get_official_team_name(sport, team_name):
         
         # Special handling for New York teams (Yankees/Mets)
         if sport == 'MLB' and team_name_lower in ['new york', 'ny']:
-            print(f"Handling New York MLB team: '{team_name}'")
+            logger.debug("Handling New York MLB team: '%s'", team_name)
             # Try to use more context to determine which NY team
             if 'yankee' in team_name_lower or 'nyy' in team_name_lower or 'yanks' in team_name_lower:
                 return 'New York Yankees'
@@ -167,7 +171,7 @@ def get_official_team_name(sport, team_name):
             
         # Special handling for Los Angeles teams (Angels/Dodgers)
         if sport == 'MLB' and team_name_lower in ['los angeles', 'la']:
-            print(f"Handling Los Angeles MLB team: '{team_name}'")
+            logger.debug("Handling Los Angeles MLB team: '%s'", team_name)
             # Try to use context clues
             if 'angel' in team_name_lower or 'ana' in team_name_lower or 'laa' in team_name_lower:
                 return 'Los Angeles Angels'
@@ -178,7 +182,7 @@ def get_official_team_name(sport, team_name):
             
         # Special handling for Chicago teams (Cubs/White Sox)
         if sport == 'MLB' and team_name_lower in ['chicago', 'chi']:
-            print(f"Handling Chicago MLB team: '{team_name}'")
+            logger.debug("Handling Chicago MLB team: '%s'", team_name)
             # Try to determine which Chicago team
             if 'cub' in team_name_lower or 'chc' in team_name_lower:
                 return 'Chicago Cubs'
@@ -0,0 +1,106 @@
+"""Production entry point: serve the app from several worker processes sharing one listening socket.
+
+    python serve.py --workers 4 --port 5000
+
+Each worker is a threaded WSGI server. With more than one worker the schedule and stream page
+caches are shared through SSA_SHARED_CACHE (SQLite on local disk unless set to 'redis'), and a
+cross-process lock lets only one worker refresh a sport's schedule at a time. The parent process
+restarts workers that die and stops them all on SIGTERM or Ctrl+C. Where fork() isn't available
+(Windows) a single worker is run.
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run Sports Stream Aggregator with several worker processes.")
+    parser.add_argument('--host', default=os.environ.get('SSA_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('SSA_PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SSA_WORKERS', os.cpu_count() or 1)))
+    return parser.parse_args()
+
+def run_worker(host, port, sock=None):
+    """Serve requests in this process until it is told to stop."""
+    # Imported here so every worker builds its own app, caches and threads after the fork
+    from werkzeug.serving import make_server
+    from app import app
+
+    # Exit through SystemExit so atexit handlers (schedule snapshots) still run
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno() if sock else None)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def spawn_worker(host, port, sock):
+    """Fork a worker process, returning its pid."""
+    pid = os.fork()
+    if pid == 0:
+        # Drop the parent's handlers - Ctrl+C just stops this worker
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        run_worker(host, port, sock)
+        # Leave through the normal interpreter exit so atexit handlers run, never back into the parent's loop
+        sys.exit(0)
+    return pid
+
+def main():
+    args = parse_args()
+    workers = max(args.workers, 1)
+    if workers == 1 or not hasattr(os, 'fork'):
+        run_worker(args.host, args.port)
+        return
+
+    # Workers can't see each other's memory - share the caches on disk unless told otherwise
+    os.environ.setdefault('SSA_SHARED_CACHE', 'sqlite')
+
+    family = socket.AF_INET6 if ':' in args.host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    children = set()
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        children.add(spawn_worker(args.host, args.port, sock))
+    print(f"Serving on http://{args.host}:{args.port} with {workers} workers "
+          f"(shared cache: {os.environ['SSA_SHARED_CACHE']})", flush=True)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {status}, starting a new one", file=sys.stderr, flush=True)
+            # Don't spin if workers die straight away (e.g. a broken import)
+            time.sleep(1)
+            if not stopping:
+                children.add(spawn_worker(args.host, args.port, sock))
+    sock.close()
+
+if __name__ == '__main__':
+    main()